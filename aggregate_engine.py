@@ -0,0 +1,489 @@
+"""
+Moteur AGRÉGÉ - Cohortes d'individus identiques, transitions tirées par sauts de plusieurs ticks
+
+Plus d'individus : chaque ligne des tableaux est une cohorte (réplique,
+espèce, âge, niveau d'énergie, état) avec son effectif. Un saut de
+Config.AGGREGATE_LEAP ticks (tau-leaping) tire en bloc, par cohorte, les
+repas, reproductions, morts de faim, par épidémie et de vieillesse, avec
+des lois binomiales / hypergéométriques et les mêmes paramètres Config que
+VectorEngine (seuils, hystérésis de faim, sécheresse, MAX_PREDATORS /
+MAX_PREYS...). Les cohortes identiques sont fusionnées à chaque saut : le
+coût dépend du nombre d'états distincts, pas du nombre d'individus.
+
+Approximations :
+    - l'énergie est comptée en niveaux de ENERGY_DECAY (la perte d'un tick) ;
+      les gains et coûts sont arrondis au niveau, au hasard et sans biais ;
+    - au sein d'un saut : au plus une reproduction par individu, et un repas
+      (plus un second si la reproduction le fait repasser sous le seuil de
+      faim), avec pour chances le nombre de ticks du saut passés sous le
+      seuil de faim / au-dessus du seuil de reproduction ; l'herbe et les
+      proies sont partagées à l'échelle du saut ;
+    - une sécheresse ou une épidémie terminée pendant un saut ne redémarre
+      pas avant le saut suivant.
+Avec AGGREGATE_LEAP = 1 on retrouve le tick de VectorEngine (en loi) ;
+validate_aggregate.py compare les deux moteurs.
+
+Le moteur fait avancer d'un coup de nombreuses répliques indépendantes (même
+Config, tirages différents) : c'est là qu'il atteint des millions de ticks
+par seconde (répliques x ticks), pour estimer par exemple une probabilité
+d'extinction. status() décrit la première réplique, comme les autres moteurs.
+
+Exemples :
+    python aggregate_engine.py --replicates 10000 --ticks 10000
+    python headless.py --engine aggregate --ticks 800
+"""
+
+import argparse
+import json
+import sys
+import time
+import numpy as np
+from config import Config
+from species import require_predator_prey
+from vector_engine import PREDATOR, PREY, SPECIES_NAMES
+
+# Colonnes d'une cohorte
+COHORT_FIELDS = {
+    'replicate': np.int64, 'species': np.int8, 'age': np.int64, 'level': np.int64, 'active': bool,
+    'headcount': np.int64,
+    'window': np.int64,      # derniers ticks du saut où la reproduction est possible (depuis le repas), leap sinon
+}
+
+
+def thin(rng, counts, replicate, k):
+    """Tire sans remise k[r] individus parmi les cohortes de la réplique r ; renvoie les tirés par cohorte
+
+    Les cohortes doivent être triées par réplique. Loi hypergéométrique
+    multivariée, par dichotomie : chaque tranche de cohortes est coupée en
+    deux et le tirage réparti entre les moitiés, toutes les tranches en même
+    temps (log2 du nombre de cohortes d'une réplique passes vectorisées).
+    """
+    taken = np.zeros_like(counts)
+    replicates = np.arange(len(k))
+    starts = np.searchsorted(replicate, replicates)
+    ends = np.searchsorted(replicate, replicates, side='right')
+    total = np.concatenate(([0], np.cumsum(counts)))
+    k = np.minimum(k, total[ends] - total[starts])
+    todo = k > 0
+    starts, ends, k = starts[todo], ends[todo], k[todo]
+    while len(k):
+        last = ends - starts == 1
+        taken[starts[last]] = k[last]
+        starts, ends, k = starts[~last], ends[~last], k[~last]
+        middle = (starts + ends) // 2
+        left = rng.hypergeometric(total[middle] - total[starts], total[ends] - total[middle], k)
+        starts = np.concatenate((starts, middle))
+        ends = np.concatenate((middle, ends))
+        k = np.concatenate((left, k - left))
+        todo = k > 0
+        starts, ends, k = starts[todo], ends[todo], k[todo]
+    return taken
+
+
+def at_least_once(probability, ticks):
+    """Chance de réussir au moins une fois en `ticks` essais"""
+    return 1 - (1 - probability) ** ticks
+
+
+class AggregateEngine:
+    """Simulation par cohortes de `replicates` répliques indépendantes
+
+    Même constructeur et même interface (step / run / status) que VectorEngine ;
+    step() avance d'un saut de `leap` ticks. Les cohortes sont triées par
+    (espèce, réplique, âge, niveau, état) après chaque saut.
+    """
+
+    def __init__(self, config, nb_predators=0, nb_preys=0, grass=0, seed=None, replicates=1, leap=None):
+        require_predator_prey(config, 'aggregate')
+        self.config = config
+        self.rng = np.random.default_rng(seed)
+        self.replicates = replicates
+        self.leap = leap or config.AGGREGATE_LEAP
+
+        # Etat de l'environnement, par réplique
+        self.tick_count = 0
+        self.grass = np.full(replicates, int(grass), dtype=np.int64)
+        self.drought_active = np.zeros(replicates, dtype=bool)
+        self.drought_end_tick = np.zeros(replicates, dtype=np.int64)
+        self.epidemy_active = np.zeros(replicates, dtype=bool)
+        self.epidemy_end_tick = np.zeros(replicates, dtype=np.int64)
+
+        # Statistiques
+        self.total_births = np.zeros(replicates, dtype=np.int64)
+        self.total_deaths = np.zeros(replicates, dtype=np.int64)
+
+        # Paramètres par espèce, indexés par PREDATOR / PREY ; énergie = niveau x decay + offset,
+        # l'énergie initiale tombant sur un niveau, et niveau <= 0 <=> énergie <= 0 (mort de faim)
+        c = config
+        self.energy_decay = np.array([c.PREDATOR_ENERGY_DECAY, c.PREY_ENERGY_DECAY])
+        initial_energy = np.array([c.PREDATOR_INITIAL_ENERGY, c.PREY_INITIAL_ENERGY])
+        self.initial_level = np.ceil(initial_energy / self.energy_decay).astype(np.int64)
+        self.offset = initial_energy - self.initial_level * self.energy_decay
+        hunger = np.array([c.PREDATOR_HUNGER_THRESHOLD, c.PREY_HUNGER_THRESHOLD], dtype=float)
+        reproduction_threshold = np.array([c.PREDATOR_REPRODUCTION_THRESHOLD, c.PREY_REPRODUCTION_THRESHOLD], dtype=float)
+        gain = np.array([c.PREDATOR_ENERGY_GAIN, c.PREY_ENERGY_GAIN])
+        self.hunger_level = self.to_level(hunger)
+        self.sated_level = self.to_level(hunger + 20)   # hystérésis comme update_state
+        self.reproduction_level = self.to_level(reproduction_threshold)
+        self.gain_levels = gain / self.energy_decay
+        self.cost_levels = np.array([c.PREDATOR_REPRODUCTION_COST, c.PREY_REPRODUCTION_COST]) / self.energy_decay
+        self.max_level = np.ceil(np.maximum(initial_energy, np.maximum(hunger + 20, reproduction_threshold) + gain)
+                                 / self.energy_decay).astype(np.int64) + self.leap
+        self.reproduction_probability = np.array([c.PREDATOR_REPRODUCTION_PROBABILITY, c.PREY_REPRODUCTION_PROBABILITY])
+        self.max_age = np.array([c.AGE_PREDATORS, c.AGE_PROIES])
+        self.max_population = np.array([c.MAX_PREDATORS, c.MAX_PREYS])
+
+        for name, dtype in COHORT_FIELDS.items():
+            setattr(self, name, np.empty(0, dtype=dtype))
+        self.add_individuals(PREDATOR, nb_predators)
+        self.add_individuals(PREY, nb_preys)
+
+    def to_level(self, energy):
+        """Seuil d'énergie (par espèce) exprimé en niveaux"""
+        return np.round((energy - self.offset) / self.energy_decay, 9)
+
+    # ------------------------------------------------------------------
+    # Population
+    # ------------------------------------------------------------------
+
+    def append(self, rows, **changes):
+        """Ajoute une copie des cohortes `rows`, avec les colonnes modifiées de changes"""
+        for name in COHORT_FIELDS:
+            values = changes.get(name, getattr(self, name)[rows])
+            column = getattr(self, name)
+            setattr(self, name, np.concatenate((column, np.broadcast_to(values, len(rows)).astype(column.dtype))))
+
+    def add_births(self, species, replicate, births, age=0):
+        """births individus neufs (énergie initiale, passifs) nés il y a `age` ticks, dans les répliques replicate"""
+        for name, value in (('replicate', replicate), ('species', species), ('age', age),
+                            ('level', self.initial_level[species] - age), ('active', False), ('headcount', births),
+                            ('window', self.leap)):
+            column = getattr(self, name)
+            setattr(self, name, np.concatenate((column, np.broadcast_to(value, len(replicate)).astype(column.dtype))))
+
+    def add_individuals(self, species, count):
+        """Ajoute count individus neufs dans chaque réplique"""
+        if count > 0:
+            self.add_births(species, np.arange(self.replicates), count)
+            self.merge()
+
+    def merge(self):
+        """Retire les cohortes vides, fusionne les cohortes identiques et les trie"""
+        keep = self.headcount > 0
+        for name in COHORT_FIELDS:
+            setattr(self, name, getattr(self, name)[keep])
+        ages = int(self.age.max()) + 1 if len(self.age) else 1
+        levels = int(self.max_level.max()) + 1
+        key = (((self.species.astype(np.int64) * self.replicates + self.replicate) * ages
+                + self.age) * levels + self.level) * 2 + self.active
+        order = np.argsort(key, kind='stable')
+        key = key[order]
+        first = np.flatnonzero(np.concatenate((key[:1] == key[:1], key[1:] != key[:-1])))
+        counts = np.add.reduceat(self.headcount[order], first) if len(first) else self.headcount[:0]
+        for name in COHORT_FIELDS:
+            setattr(self, name, getattr(self, name)[order[first]])
+        self.headcount = counts
+        self.window[:] = self.leap
+
+    def per_replicate(self, rows, values=None):
+        """Somme par réplique de values (effectifs par défaut) sur les cohortes `rows`"""
+        values = self.headcount[rows] if values is None else values
+        return np.bincount(self.replicate[rows], weights=values, minlength=self.replicates).astype(np.int64)
+
+    def counts(self, species):
+        """Effectif d'une espèce, par réplique"""
+        return self.per_replicate(np.flatnonzero(self.species == species))
+
+    def count(self, species):
+        """Effectif d'une espèce dans la première réplique"""
+        return int(self.counts(species)[0])
+
+    def split(self, rows, moving, levels, window=None):
+        """`moving` individus des cohortes `rows` (répétables) changent de niveau de `levels` (réel, arrondi au hasard)"""
+        low = int(np.floor(levels))
+        up = self.rng.binomial(moving, levels - low)
+        np.subtract.at(self.headcount, rows, moving)
+        window = self.window[rows] if window is None else window
+        for shift, count in ((low, moving - up), (low + 1, up)):
+            selected = count > 0
+            if selected.any():
+                moved = rows[selected]
+                level = np.minimum(self.level[moved] + shift, self.max_level[self.species[moved]])
+                self.append(moved, level=level, headcount=count[selected], window=window[selected])
+
+    def first_successes(self, rows, tries, probability):
+        """Premier succès des individus des cohortes rows, en tries[i] essais de probabilité probability
+
+        Renvoie (cohortes, essai du succès, effectifs), triés par réplique ;
+        une cohorte apparaît une fois par essai où certains de ses individus
+        réussissent pour la première fois.
+        """
+        remaining = self.headcount[rows].copy()
+        probability = np.broadcast_to(probability, len(rows))
+        found = []
+        for attempt in range(self.leap):
+            trying = np.flatnonzero((tries > attempt) & (remaining > 0))
+            if not len(trying):
+                break
+            success = self.rng.binomial(remaining[trying], probability[trying])
+            remaining[trying] -= success
+            selected = success > 0
+            found.append((rows[trying[selected]], np.full(np.count_nonzero(selected), attempt), success[selected]))
+        if not found:
+            return rows[:0], rows[:0], rows[:0]
+        rows, attempt, count = (np.concatenate(x) for x in zip(*found))
+        order = np.argsort(self.replicate[rows], kind='stable')
+        return rows[order], attempt[order], count[order]
+
+    def hungry_ticks(self, rows, became_hungry):
+        """Ticks du saut passés sous le seuil de faim : les derniers, pour un individu devenu affamé pendant le saut"""
+        below = np.ceil(self.hunger_level[self.species[rows]] - self.level[rows])
+        return np.where(became_hungry[rows], np.clip(below, 0, self.leap), self.leap).astype(np.int64)
+
+    def feed(self, hungry, tries, eaters):
+        """Chasse puis broutage des cohortes affamées `hungry`, tries[i] essais pour la cohorte i
+
+        Les cohortes ajoutées à partir de l'indice `eaters` sont celles qui ont
+        mangé : elles redeviennent passives si le repas les a fait passer
+        au-dessus du seuil. Renvoie les proies mangées par réplique.
+        """
+        sp = self.species
+        eaten = self.hunt(hungry[sp[hungry] == PREDATOR], tries)
+        self.graze(hungry[sp[hungry] == PREY], tries)
+        sp = self.species
+        fed = np.arange(eaters, len(sp))
+        self.active[fed] &= self.level[fed] + self.window[fed] - 1 <= self.sated_level[sp[fed]]
+        return eaten
+
+    def hunt(self, hunters, tries):
+        """Au plus une proie par prédateur et par saut, au plus autant que de proies ; renvoie les proies mangées"""
+        rows, attempt, fed = self.first_successes(hunters, tries[hunters], self.config.PREDATOR_FEED_PROBABILITY)
+        preys = np.flatnonzero((self.species == PREY) & (self.headcount > 0))
+        excess = np.maximum(self.per_replicate(rows, fed) - self.per_replicate(preys), 0)
+        if excess.any():
+            fed -= thin(self.rng, fed, self.replicate[rows], excess)
+        eaten = self.per_replicate(rows, fed)
+        self.headcount[preys] -= thin(self.rng, self.headcount[preys], self.replicate[preys], eaten)
+        self.split(rows, fed, self.gain_levels[PREDATOR], tries[rows] - attempt)
+        return eaten
+
+    def graze(self, grazers, tries):
+        """Les proies affamées mangent dès leur premier tick affamé, tant qu'il reste de l'herbe"""
+        fed = thin(self.rng, self.headcount[grazers], self.replicate[grazers], self.grass)
+        self.grass -= self.per_replicate(grazers, fed)
+        self.split(grazers, fed, self.gain_levels[PREY], tries[grazers])
+
+    # ------------------------------------------------------------------
+    # Environnement
+    # ------------------------------------------------------------------
+
+    def leap_events(self, active, end_tick, probability, min_duration, max_duration, delay=0):
+        """Sécheresse ou épidémie sur le saut (ticks tick_count + 1 .. tick_count + leap)
+
+        Mêmes règles que check_drought / check_epidemy : l'événement dure de son
+        tick de départ à end_tick exclu, ses effets étant décalés de `delay`
+        ticks (1 pour l'herbe : update_grass passe avant check_drought). Un
+        événement qui se termine pendant le saut ne redémarre pas avant le saut
+        suivant. Met à jour active et end_tick ; renvoie le nombre de ticks du
+        saut touchés, par réplique.
+        """
+        first, last = self.tick_count + 1, self.tick_count + self.leap
+        ticks = np.where(active, np.clip(end_tick + delay - first, 0, self.leap), 0)
+        if probability > 0:
+            start = first - 1 + self.rng.geometric(min(probability, 1.0), self.replicates)
+            started = ~active & (start <= last)
+            duration = self.rng.integers(min_duration, max_duration + 1, self.replicates)
+            end_tick[started] = start[started] + duration[started]
+            ticks[started] = np.clip(last - start[started] - delay + 1, 0, duration[started])
+        active[:] = end_tick > last
+        return ticks
+
+    def trigger(self, active, end_tick, min_duration, max_duration):
+        active[:] = True
+        end_tick[:] = self.tick_count + self.rng.integers(min_duration, max_duration + 1, self.replicates)
+
+    def trigger_drought(self):
+        """Déclenche une sécheresse dans toutes les répliques"""
+        self.trigger(self.drought_active, self.drought_end_tick,
+                     self.config.DROUGHT_MIN_DURATION, self.config.DROUGHT_MAX_DURATION)
+
+    def trigger_epidemy(self):
+        """Démarre une épidémie dans toutes les répliques"""
+        self.trigger(self.epidemy_active, self.epidemy_end_tick,
+                     self.config.EPIDEMY_MIN_DURATION, self.config.EPIDEMY_MAX_DURATION)
+
+    def update_grass(self, drought_ticks):
+        """Croissance de l'herbe hors sécheresse, puis déclin pendant les ticks de sécheresse"""
+        cfg = self.config
+        grown = np.minimum(self.grass + cfg.GRASS_GROWTH_RATE * (self.leap - drought_ticks), cfg.GRASS_MAX)
+        self.grass = np.maximum(grown - cfg.GRASS_DECREASE_RATE * drought_ticks, 0).astype(np.int64)
+
+    # ------------------------------------------------------------------
+    # Saut
+    # ------------------------------------------------------------------
+
+    def step(self, leap=None):
+        """Avance toutes les répliques d'un saut de `leap` ticks (self.leap par défaut, moins pour finir sur un tick)"""
+        if leap is not None and leap != self.leap:
+            full, self.leap = self.leap, leap
+            self.window[:] = leap   # fenêtres de reproduction : tout le saut, comme après merge()
+            try:
+                self.step()
+            finally:
+                self.leap = full
+                self.window[:] = full
+            return
+        cfg = self.config
+        leap = self.leap
+
+        # Environnement
+        drought_ticks = self.leap_events(self.drought_active, self.drought_end_tick, cfg.DROUGHT_PROBABILITY,
+                                         cfg.DROUGHT_MIN_DURATION, cfg.DROUGHT_MAX_DURATION, delay=1)
+        epidemy_ticks = self.leap_events(self.epidemy_active, self.epidemy_end_tick, cfg.EPIDEMY_PROBABILITY,
+                                         cfg.EPIDEMY_MIN_DURATION, cfg.EPIDEMY_MAX_DURATION)
+        self.tick_count += leap
+        self.update_grass(drought_ticks)
+
+        # Perte d'énergie du saut, puis mise à jour de l'état sur l'énergie de fin de saut
+        sp = self.species
+        self.level -= leap
+        hungry = self.level < self.hunger_level[sp]
+        became_hungry = hungry & ~self.active
+        self.active = hungry | (self.active & ~(self.level > self.sated_level[sp]))
+
+        # Repas : un essai par tick passé sous le seuil de faim ; le tick du repas compte pour la reproduction
+        eaters = len(sp)   # les cohortes ajoutées à partir d'ici sont celles qui ont mangé
+        tries = np.zeros(len(sp), dtype=np.int64)
+        hungry = np.flatnonzero(self.active)
+        tries[hungry] = self.hungry_ticks(hungry, became_hungry)
+        deaths = self.feed(hungry, tries, eaters)
+
+        # Reproduction : un essai par tick passé au-dessus du seuil (après le repas s'il y en a eu un) ;
+        # le nouveau-né a, en fin de saut, l'âge et l'énergie correspondant au tick de sa naissance
+        sp = self.species
+        populations = [self.counts(PREDATOR), self.counts(PREY)]
+        first_fertile = np.maximum(np.floor(self.reproduction_level[sp] - self.level) + 1, 0)
+        tries = np.clip(self.window - first_fertile, 0, leap).astype(np.int64)
+        candidates = np.flatnonzero(tries)
+        rows, attempt, parents = self.first_successes(candidates, tries[candidates],
+                                                      self.reproduction_probability[sp[candidates]])
+        born = [(rows[sp[rows] == species], (self.window[rows] - 1 - attempt)[sp[rows] == species],
+                 parents[sp[rows] == species]) for species in (PREDATOR, PREY)]
+        first = len(sp)
+        for species, (selected, age, count) in enumerate(born):
+            self.split(selected, count, -self.cost_levels[species], window=age)
+
+        # Parents repassés sous le seuil de faim par la reproduction : second repas dans les ticks suivants
+        parents = np.arange(first, len(self.species))
+        below = np.ceil(self.hunger_level[self.species[parents]] - self.level[parents])
+        tries = np.zeros(len(self.species), dtype=np.int64)
+        tries[parents] = np.clip(below, 0, self.window[parents])
+        hungry = parents[tries[parents] > 0]
+        self.active[hungry] = True
+        deaths = deaths + self.feed(hungry, tries, len(self.species))
+
+        # Mort de faim, épidémie puis vieillesse
+        sp = self.species
+        self.age += leap
+        dead = (self.level <= 0) | (self.age >= self.max_age[sp])
+        deaths = deaths + self.per_replicate(np.flatnonzero(dead))
+        self.headcount[dead] = 0
+        if epidemy_ticks.any():
+            victims = self.rng.binomial(self.headcount, at_least_once(cfg.EPIDEMY_DEATH_RATE, epidemy_ticks)[self.replicate])
+            self.headcount -= victims
+            deaths = deaths + self.per_replicate(np.arange(len(victims)), victims)
+        self.total_deaths += deaths
+
+        # Naissances, limitées par MAX_PREDATORS / MAX_PREYS ; une espèce éteinte ne renaît pas
+        for species, (rows, age, count) in enumerate(born):
+            room = np.where(populations[species] > 0, np.maximum(0, self.max_population[species] - populations[species]), 0)
+            count = thin(self.rng, count, self.replicate[rows], room)
+            self.add_births(species, self.replicate[rows], count, age)
+            self.total_births += self.per_replicate(rows, count)
+        self.merge()
+
+    def run(self, ticks):
+        """Enchaîne des sauts jusqu'à avoir avancé d'au moins `ticks` ticks"""
+        for _ in range(-(-ticks // self.leap)):
+            self.step()
+
+    def populations(self):
+        """(prédateurs, proies, herbe) de toutes les répliques"""
+        return self.counts(PREDATOR), self.counts(PREY), self.grass.copy()
+
+    def status(self, replicate=0):
+        """Etat d'une réplique, au même format que GET_STATUS"""
+        return {
+            'predators': int(self.counts(PREDATOR)[replicate]),
+            'preys': int(self.counts(PREY)[replicate]),
+            'grass': int(self.grass[replicate]),
+            'tick': self.tick_count,
+            'births': int(self.total_births[replicate]),
+            'deaths': int(self.total_deaths[replicate]),
+            'drought_active': bool(self.drought_active[replicate]),
+            'epidemy_active': bool(self.epidemy_active[replicate])
+        }
+
+    def checkpoint(self, path):
+        raise ValueError("Pas de checkpoint en mode agrégé (il n'y a pas d'individus à sauvegarder)")
+
+    def restore(self, path):
+        raise ValueError("Pas de reprise de checkpoint en mode agrégé")
+
+
+def extinction_summary(config, replicates, ticks, seed=None, leap=None):
+    """Lance `replicates` répliques pendant `ticks` ticks ; probabilités d'extinction et débit"""
+    engine = AggregateEngine(config, config.INITIAL_PREDATORS, config.INITIAL_PREYS, config.INITIAL_GRASS,
+                             seed=seed, replicates=replicates, leap=leap)
+    extinct_tick = [np.full(replicates, -1, dtype=np.int64) for _ in SPECIES_NAMES]
+    start = time.perf_counter()
+    while engine.tick_count < ticks:
+        engine.step()
+        for species, first in enumerate(extinct_tick):
+            first[(first < 0) & (engine.counts(species) == 0)] = engine.tick_count
+    elapsed = time.perf_counter() - start
+
+    predators, preys, grass = engine.populations()
+    result = {'replicates': replicates, 'ticks': engine.tick_count, 'leap': engine.leap, 'seed': seed}
+    for species, name in enumerate(SPECIES_NAMES):
+        extinct = extinct_tick[species] >= 0
+        result[f'{name}s_extinct'] = float(extinct.mean())
+        result[f'{name}s_mean_extinction_tick'] = float(extinct_tick[species][extinct].mean()) if extinct.any() else None
+    result.update({
+        'predators_mean': float(predators.mean()),
+        'preys_mean': float(preys.mean()),
+        'grass_mean': float(grass.mean()),
+        'elapsed': elapsed,
+        'ticks_per_second': replicates * engine.tick_count / elapsed if elapsed > 0 else None,
+    })
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Moteur agrégé : nombreuses répliques, probabilités d'extinction")
+    parser.add_argument('--config', help="Fichier JSON de paramètres Config ({\"NOM\": valeur})")
+    parser.add_argument('--replicates', type=int, default=Config.AGGREGATE_REPLICATES, help="Répliques indépendantes")
+    parser.add_argument('--ticks', type=int, help="Nombre de ticks (Config.TICKS par défaut)")
+    parser.add_argument('--leap', type=int, help="Ticks par saut (Config.AGGREGATE_LEAP par défaut)")
+    parser.add_argument('--seed', type=int, help="Graine aléatoire")
+    parser.add_argument('--set', action='append', default=[], metavar='NOM=VALEUR',
+                        help="Surcharge d'un paramètre Config (valeur JSON), répétable")
+    parser.add_argument('--output', help="Fichier JSON du résultat (stdout par défaut)")
+    args = parser.parse_args(argv)
+
+    overrides = {}
+    for item in args.set:
+        name, _, value = item.partition('=')
+        overrides[name] = json.loads(value)
+    config = Config(args.config, **overrides)
+    result = extinction_summary(config, args.replicates, args.ticks or config.TICKS, seed=args.seed, leap=args.leap)
+    text = json.dumps(result, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,396 @@
+"""
+BENCHMARKS - Débit de ticks, débit et latence des messages (par transport), latence des naissances, attente sur verrous, RSS
+
+Exemple :
+    python benchmark.py --sizes 10,100,1000,10000 --output bench.json
+
+Les résultats sont écrits en JSON (avec le commit courant) pour être comparés d'un commit à l'autre.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import multiprocessing as mp
+from config import Config
+from counters import ShardedCounters
+from env_process import EnvironmentManager
+import protocol
+import transport
+from vector_engine import VectorEngine
+from event_engine import EventEngine
+from spatial_engine import SpatialEngine
+from teardown import stop_processes
+from worker_pool import WorkerPool
+
+
+# ----------------------------------------------------------------------
+# Outils de mesure
+# ----------------------------------------------------------------------
+
+def percentiles(values):
+    """Résumé d'une série de mesures (en microsecondes)"""
+    if not values:
+        return None
+    values = sorted(values)
+    pick = lambda q: values[min(len(values) - 1, int(q * len(values)))]
+    return {
+        'count': len(values),
+        'mean_us': round(statistics.fmean(values) * 1e6, 2),
+        'p50_us': round(pick(0.50) * 1e6, 2),
+        'p95_us': round(pick(0.95) * 1e6, 2),
+        'p99_us': round(pick(0.99) * 1e6, 2),
+        'max_us': round(values[-1] * 1e6, 2)
+    }
+
+
+def tree_rss(pid):
+    """RSS (octets) d'un processus et de tous ses descendants, lue dans /proc"""
+    children = {}
+    rss = {}
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat') as f:
+                fields = f.read().rsplit(')', 1)[1].split()
+            children.setdefault(int(fields[1]), []).append(int(entry))
+            rss[int(entry)] = int(fields[21]) * os.sysconf('SC_PAGE_SIZE')
+        except (OSError, IndexError, ValueError):
+            continue
+    total, todo = 0, [pid]
+    while todo:
+        p = todo.pop()
+        total += rss.get(p, 0)
+        todo.extend(children.get(p, []))
+    return total
+
+
+class RssSampler(threading.Thread):
+    """Relève périodiquement le RSS de l'arbre de processus et garde le maximum"""
+
+    def __init__(self, interval=0.1):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.peak = 0
+        self.running = True
+
+    def run(self):
+        while self.running:
+            self.peak = max(self.peak, tree_rss(os.getpid()))
+            time.sleep(self.interval)
+
+    def stop(self):
+        self.running = False
+        self.join()
+        return self.peak
+
+
+def bench_config(n, port, tick):
+    """Config sans plafonds de population gênants pour n animaux"""
+    return Config(
+        SOCKET_PORT=port,
+        SIMULATION_TICK=tick,
+        MAX_PREDATORS=max(Config.MAX_PREDATORS, 2 * n),
+        MAX_PREYS=max(Config.MAX_PREYS, 2 * n),
+        GRASS_MAX=max(Config.GRASS_MAX, 10 * n)
+    )
+
+
+# ----------------------------------------------------------------------
+# Benchmarks
+# ----------------------------------------------------------------------
+
+def bench_vector(n, duration, max_ticks=100, engine_class=VectorEngine):
+    """Ticks par seconde du moteur vectorisé (ou à événements, spatial) avec n animaux (avant que la population ne change trop)"""
+    config = bench_config(n, 0, 0)
+    engine = engine_class(config, n // 5, n - n // 5, 10 * n, seed=0)
+    ticks = 0
+    start = time.perf_counter()
+    while ticks < max_ticks and time.perf_counter() - start < duration:
+        engine.step()
+        ticks += 1
+    elapsed = time.perf_counter() - start
+    status = engine.status()
+    return {'ticks_per_second': round(ticks / elapsed, 1), 'final_population': status['predators'] + status['preys']}
+
+
+def bench_env(n, duration, port, tick, use_pool, births=20, scheduler='free'):
+    """ENV réel + n animaux : démarrage, ticks/s d'ENV, latence REPRODUCE -> JOIN, RSS max
+
+    En lockstep, un tick mesuré comprend le step de tous les animaux.
+    """
+    config = bench_config(n, port, tick)
+    config.WORKER_POOL = use_pool
+    config.SCHEDULER = scheduler
+    env = EnvironmentManager(mp.Queue(), mp.Queue(), config)
+    counters = env.shared_mem['counters']
+    counters.set('grass', 10 * n)
+
+    # Horodatage des naissances (spawn_animal) puis de leur JOIN
+    spawned, latencies = {}, []
+    spawn_animal = env.spawn_animal
+    def timed_spawn(entity, animal_id=None, state=None):
+        animal_id = env.registry.allocate() if animal_id is None else animal_id
+        spawned[animal_id] = time.perf_counter()
+        return spawn_animal(entity, animal_id, state)
+    env.spawn_animal = timed_spawn
+    process_message = env.process_message
+    def timed_message(msg, client=None):
+        if msg.get('type') == 'JOIN' and msg.get('id') in spawned:
+            latencies.append(time.perf_counter() - spawned.pop(msg['id']))
+        process_message(msg, client)
+    env.server.on_message = timed_message
+
+    def wait(pause):
+        # En lockstep, les workers ne traitent naissances et messages qu'au tick suivant : on en fait un
+        if scheduler == 'lockstep':
+            env.tick()
+            env.wait_next_tick()
+        else:
+            time.sleep(pause)
+
+    sampler = RssSampler()
+    sampler.start()
+    env.start_server()
+    start = time.perf_counter()
+    if use_pool:
+        env.pool = WorkerPool(env.shared_mem, config, ctx=env.ctx)
+        env.processes.extend(env.pool.start())
+    nb_predators = n // 5
+    for i in range(n):
+        p = spawn_animal('predator' if i < nb_predators else 'prey', i)
+        if p:
+            env.processes.append(p)
+    spawned.clear()
+    while counters.total('predator') + counters.total('prey') < n and time.perf_counter() - start < 60:
+        wait(0.001)
+    startup = time.perf_counter() - start
+
+    # Ticks d'ENV enchaînés sans attente pendant que les animaux vivent
+    ticks = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < duration:
+        env.tick()
+        if scheduler == 'lockstep':
+            env.wait_next_tick()
+        ticks += 1
+    elapsed = time.perf_counter() - start
+
+    # Naissances : REPRODUCE traité par ENV -> JOIN du nouvel animal
+    for _ in range(births):
+        process_message({'type': 'REPRODUCE', 'entity': 'prey', 'id': 0})
+        deadline = time.perf_counter() + 5
+        while spawned and time.perf_counter() < deadline:
+            wait(0.0005)
+    env.processes.extend(p for p in mp.active_children() if p not in env.processes)
+
+    # Arrêt
+    env.shared_mem['shutdown'].value = 1
+    if env.pool:
+        env.pool.stop()
+    stop_processes(env.processes, grace=10)
+    env.running = False
+    env.socket_thread.join(timeout=2)
+    env.server.close()
+    counters.close()
+    peak = sampler.stop()
+
+    return {
+        'mode': ('pool' if use_pool else 'process') + ('-lockstep' if scheduler == 'lockstep' else ''),
+        'startup_seconds': round(startup, 3),
+        'env_ticks_per_second': round(ticks / elapsed, 1),
+        'reproduce_to_join': percentiles(latencies),
+        'peak_rss_mb': round(peak / 2**20, 1)  # somme des RSS : pages partagées comptées par processus
+    }
+
+
+def message_sender(config, shared_memory, connections, payload, probes, ready, go, probe):
+    """Processus émetteur : ouvre les connexions, envoie tous les messages, puis des messages isolés horodatés"""
+    import resource
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+    socks = [transport.connect(config, shared_memory, i) for i in range(connections)]
+    ready.set()
+    go.wait()
+    for sock in socks:
+        sock.sendall(payload)
+
+    # Latence : un message à la fois, id = instant d'envoi (perf_counter_ns, même horloge dans les deux processus)
+    probe.wait()
+    for _ in range(probes):
+        socks[0].sendall(protocol.encode([{'type': 'FEED', 'entity': 'prey', 'id': time.perf_counter_ns()}],
+                                         config.PROTOCOL))
+        time.sleep(0.0005)
+    time.sleep(0.5)
+    for sock in socks:
+        sock.close()
+
+
+def bench_messages(n, port, kind, proto, total=200000, probes=1000):
+    """Débit et latence des messages à travers le transport choisi et process_message d'ENV"""
+    config = bench_config(n, port, 0.1)
+    config.TRANSPORT = kind
+    config.PROTOCOL = proto
+    env = EnvironmentManager(mp.Queue(), mp.Queue(), config)
+    received = [0]
+    latencies = []
+    process_message = env.process_message
+    def counting(msg, client=None):
+        if msg.get('type') == 'FEED':
+            latencies.append((time.perf_counter_ns() - msg['id']) / 1e9)
+            return
+        process_message(msg, client)
+        received[0] += 1
+    env.server.on_message = counting
+    env.start_server()
+
+    connections = n
+    per_conn = max(2, total // connections) // 2 * 2
+    messages = []
+    for i in range(per_conn // 2):
+        messages.append({'type': 'JOIN', 'entity': 'prey', 'id': i})
+        messages.append({'type': 'DEATH', 'entity': 'prey', 'id': i})
+    payload = protocol.encode(messages, proto)
+    expected = per_conn * connections
+
+    ready, go, probe = mp.Event(), mp.Event(), mp.Event()
+    sender = mp.Process(target=message_sender,
+                        args=(config, env.shared_mem, connections, payload, probes, ready, go, probe))
+    sender.start()
+    ready.wait(60)
+    start = time.perf_counter()
+    go.set()
+    while received[0] < expected and time.perf_counter() - start < 60:
+        time.sleep(0.001)
+    elapsed = time.perf_counter() - start
+    threads = threading.active_count()
+    probe.set()
+    deadline = time.perf_counter() + 10
+    while len(latencies) < probes and time.perf_counter() < deadline:
+        time.sleep(0.01)
+    sender.join(10)
+    env.running = False
+    env.socket_thread.join(timeout=2)
+    env.server.close()
+    env.shared_mem['counters'].close()
+    return {
+        'transport': kind,
+        'protocol': proto,
+        'connections': connections,
+        'messages': received[0],
+        'messages_per_second': round(received[0] / elapsed, 1),
+        'latency': percentiles(latencies),
+        'threads': threads
+    }
+
+
+def lock_worker(kind, counters, lock, value, shard, ops, results):
+    """Processus qui prend une proie puis une herbe ops fois, en mesurant chaque attente"""
+    waits = {'prey': [], 'grass': []}
+    for _ in range(ops):
+        for field in ('prey', 'grass'):
+            start = time.perf_counter()
+            if kind == 'global':
+                with lock:  # comme l'ancien count_lock / grass_lock
+                    if value[field].value > 0:
+                        value[field].value -= 1
+            else:
+                counters.claim(shard, field)
+            waits[field].append(time.perf_counter() - start)
+    results.put(waits)
+
+
+def bench_locks(n, ops=2000):
+    """Attente sur les compteurs partagés : un verrou global (ancien) contre les shards (actuel)"""
+    writers = min(n, 2 * (os.cpu_count() or 1))
+    out = {}
+    for kind in ('global', 'sharded'):
+        counters = ShardedCounters()
+        counters.set('prey', writers * ops)
+        counters.set('grass', writers * ops)
+        lock = mp.Lock()
+        value = {'prey': mp.Value('i', writers * ops, lock=False), 'grass': mp.Value('i', writers * ops, lock=False)}
+        results = mp.Queue()
+        procs = [mp.Process(target=lock_worker,
+                            args=(kind, counters, lock, value, counters.shard_for(i), ops, results))
+                 for i in range(writers)]
+        for p in procs:
+            p.start()
+        waits = {'prey': [], 'grass': []}
+        for _ in procs:
+            r = results.get()
+            for field in waits:
+                waits[field].extend(r[field])
+        for p in procs:
+            p.join()
+        counters.close()
+        out[kind] = {'writers': writers, 'prey': percentiles(waits['prey']), 'grass': percentiles(waits['grass'])}
+    return out
+
+
+# ----------------------------------------------------------------------
+# Programme principal
+# ----------------------------------------------------------------------
+
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', 'HEAD'], cwd=os.path.dirname(os.path.abspath(__file__)),
+                                       stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks de la simulation")
+    parser.add_argument('--sizes', default='10,100,1000,10000', help="Nombres d'animaux, séparés par des virgules")
+    parser.add_argument('--duration', type=float, default=2.0, help="Durée de chaque mesure de débit (s)")
+    parser.add_argument('--tick', type=float, default=Config.SIMULATION_TICK, help="SIMULATION_TICK des animaux")
+    parser.add_argument('--max-processes', type=int, default=1000,
+                        help="Au-delà, ENV est mesuré seulement en mode pool")
+    parser.add_argument('--port', type=int, default=Config.SOCKET_PORT + 100)
+    parser.add_argument('--skip', default='', help="Sections à sauter : vector,env,messages,locks")
+    parser.add_argument('--output', default='benchmark_results.json')
+    args = parser.parse_args(argv)
+    skip = set(filter(None, args.skip.split(',')))
+
+    report = {
+        'commit': git_commit(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'cpu_count': os.cpu_count(),
+        'sizes': {}
+    }
+    for n in [int(s) for s in args.sizes.split(',')]:
+        print(f" {n} animaux...", flush=True)
+        result = {}
+        if 'vector' not in skip:
+            result['vector'] = bench_vector(n, args.duration)
+            result['event'] = bench_vector(n, args.duration, engine_class=EventEngine)
+            result['spatial'] = bench_vector(n, args.duration, engine_class=SpatialEngine)
+        if 'env' not in skip:
+            result['env'] = []
+            if n <= args.max_processes:
+                result['env'].append(bench_env(n, args.duration, args.port, args.tick, use_pool=False))
+            result['env'].append(bench_env(n, args.duration, args.port, args.tick, use_pool=True))
+            result['env'].append(bench_env(n, args.duration, args.port, args.tick, use_pool=True, scheduler='lockstep'))
+        if 'messages' not in skip:
+            result['messages'] = [bench_messages(n, args.port, kind, proto)
+                                  for kind in transport.TRANSPORTS for proto in ('json', 'binary')]
+        if 'locks' not in skip:
+            result['locks'] = bench_locks(n)
+        report['sizes'][str(n)] = result
+        print(json.dumps(result, indent=2))
+
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f" Résultats écrits dans {args.output}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
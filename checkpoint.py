@@ -0,0 +1,48 @@
+"""
+CHECKPOINT - Sauvegarde binaire de l'état d'une simulation, pour la reprendre plus tard
+
+Un fichier .npz (non compressé) :
+    meta                état de l'environnement en JSON (tick, herbe, populations, sécheresse, épidémie, RNG...)
+    ids, species,       une ligne par individu vivant (species : 0 prédateur, 1 proie)
+    energy, age, active
+    autres tableaux     propres à un moteur (moteur spatial : positions, champ d'herbe), ignorés par les autres
+
+Le même format sert aux deux moteurs : un checkpoint du mode processus peut
+être repris par le moteur vectorisé et inversement.
+"""
+
+import json
+import os
+import threading
+import numpy as np
+
+POPULATION_FIELDS = ('ids', 'species', 'energy', 'age', 'active')
+DTYPES = {'ids': np.int64, 'species': np.int8, 'energy': np.float64, 'age': np.int32, 'active': bool}
+
+
+def empty_population():
+    return {name: np.empty(0, dtype=DTYPES[name]) for name in POPULATION_FIELDS}
+
+
+def write_checkpoint(path, state, population):
+    """Écrit le fichier (via un fichier temporaire : jamais de checkpoint à moitié écrit)"""
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as f:
+        np.savez(f, meta=np.array(json.dumps(state)),
+                 **{name: np.asarray(values, dtype=DTYPES.get(name)) for name, values in population.items()})
+    os.replace(tmp, path)
+
+
+def save_in_background(path, state, population):
+    """Écriture dans un thread : l'appelant ne fait que copier ses tableaux"""
+    thread = threading.Thread(target=write_checkpoint, args=(path, state, population), name='checkpoint')
+    thread.start()
+    return thread
+
+
+def read_checkpoint(path):
+    """(état de l'environnement, population) d'un fichier écrit par write_checkpoint"""
+    with np.load(path) as data:
+        state = json.loads(str(data['meta']))
+        population = {name: data[name] for name in data.files if name != 'meta'}
+    return state, population
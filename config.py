@@ -2,6 +2,8 @@
 Configuration centralisée pour la simulation
 """
 
+import json
+
 # Générée par IA
 
 class Config:
@@ -28,6 +30,11 @@ class Config:
     # Reproduction
     PREDATOR_REPRODUCTION_COST = 60.0
     PREY_REPRODUCTION_COST = 50.0
+
+    # Probabilités par tick
+    PREDATOR_FEED_PROBABILITY = 0.7          # Chance d'attraper une proie
+    PREDATOR_REPRODUCTION_PROBABILITY = 0.3
+    PREY_REPRODUCTION_PROBABILITY = 0.4
     
     # Environnement
     GRASS_GROWTH_RATE = 2.0      # Herbe ajoutée par tick
@@ -46,8 +53,14 @@ class Config:
     EPIDEMY_MAX_DURATION = 100   # Ticks maximum
     
     # Communication
+    TRANSPORT = 'tcp'            # 'tcp', 'unix' (socket de domaine Unix) ou 'shm' (anneaux en mémoire partagée)
     SOCKET_HOST = 'localhost'
-    SOCKET_PORT = 9999
+    SOCKET_PORT = 9999           # 0 : port libre choisi par ENV (plusieurs simulations côte à côte)
+    SOCKET_PATH = None           # Fichier du socket Unix, None = propre au processus ENV
+    RING_SIZE = 1 << 20          # Octets par anneau ('shm')
+    RING_SHARDS = None           # Nombre d'anneaux ('shm'), None = un par cœur
+    SOCKET_BACKLOG = 1024        # File d'attente des connexions (démarrages en masse)
+    PROTOCOL = 'json'            # 'json' (lisible, pour déboguer) ou 'binary' (enregistrements de 24 octets)
     
     # Timing
     SIMULATION_TICK = 0.1        # Secondes entre chaque tick
@@ -60,9 +73,102 @@ class Config:
     # Age maximum
     AGE_PREDATORS = 300
     AGE_PROIES = 150
+
+    # Réseau trophique (species.py) : préréglage 'predator_prey' (paramètres ci-dessus) ou 'three_levels',
+    # ou table d'espèces [{"name": ..., "diet": [[nourriture, probabilité, gain]], ...}] ;
+    # seul le moteur 'vector' accepte un autre réseau que 'predator_prey'
+    SPECIES = 'predator_prey'
+
+    # Moteur de simulation
+    ENGINE = 'process'  # 'process' : un processus par individu, 'vector' : population en tableaux NumPy,
+                        # 'event' : tableaux NumPy, individus passifs sautant les ticks (event_engine.py),
+                        # 'distributed' : tableaux NumPy répartis sur plusieurs nœuds (coordinator.py),
+                        # 'spatial' : tableaux NumPy dans un monde en grille, repas locaux (spatial_engine.py)
+
+    # Alimentation : 'direct' (chaque animal prend sa proie / son herbe lui-même)
+    # ou 'batched' (ENV tranche tous les repas d'un tick en une passe et répond FED)
+    FEEDING = 'direct'
+
+    # Compteurs partagés (populations, herbe)
+    COUNTER_SHARDS = None     # None = un shard par cœur
+
+    # Pool de workers : plusieurs animaux par processus au lieu d'un processus par animal
+    WORKER_POOL = False
+    WORKER_POOL_SIZE = None   # None = un worker par cœur
+
+    # Ordonnancement des ticks : 'free' (chaque animal / worker suit sa propre horloge, sleep SIMULATION_TICK)
+    # ou 'lockstep' (pool de workers : un step par tick d'ENV, qui enchaîne dès que tous ont fini)
+    SCHEDULER = 'free'
+    LOCKSTEP_TIMEOUT = 10.0   # Secondes d'attente max à la barrière (worker bloqué ou mort) ou d'un nœud réparti
+
+    # Instrumentation (durées par étape, attentes de verrous), lue par la commande GET_STATS
+    INSTRUMENTATION = False
+    INSTRUMENTATION_CAPACITY = 4096   # Ticks gardés dans le tampon circulaire
+
+    # Enregistrement des séries temporelles par tick (recorder.py), None = désactivé
+    RECORD_DIR = None
+    RECORD_CAPACITY = 65536   # Lignes préallouées (doublé si dépassé)
+
+    # Journal des événements reçus par ENV (eventlog.py), None = désactivé
+    EVENT_LOG_DIR = None
+    EVENT_LOG_INDEX_INTERVAL = 16   # Une entrée d'index tous les N ticks
+
+    # Checkpoints (commande CHECKPOINT de cmd_queue, checkpoint.py)
+    CHECKPOINT_PATH = 'checkpoint.npz'   # Fichier par défaut de la commande CHECKPOINT
+    CHECKPOINT_WAIT_TICKS = 5            # Ticks laissés aux animaux pour envoyer leur état (mode processus)
+    RESUME = None                        # Checkpoint à reprendre au démarrage, None = nouvelle simulation
+
+    # Démarrage des animaux : 'fork' (copie d'ENV, modules déjà importés), 'forkserver' (copies d'un
+    # serveur qui a importé une fois les modules des animaux, sans les threads d'ENV) ou 'spawn'
+    START_METHOD = 'fork'
+    STARTUP_TIMEOUT = 30.0    # Secondes max d'attente des JOIN de la population initiale
+
+    # Registre des individus d'ENV (registry.py)
+    REAP_INTERVAL = 0.5       # Secondes max entre la fin d'un processus d'animal et sa récupération
+    DEATH_GRACE_TICKS = 5     # Ticks laissés au DEATH d'un animal dont le processus est terminé
+
+    # Arrêt (commande SHUTDOWN, teardown.py)
+    SHUTDOWN_GRACE = 0.0      # Secondes laissées aux processus pour sortir d'eux-mêmes avant SIGTERM au groupe
+                              # (0 : signal immédiat, le plus rapide ; les animaux n'ont rien à sauvegarder)
+    SHUTDOWN_DRAIN = 0.2      # Secondes max pour lire les derniers messages des sockets des processus arrêtés
+    SHUTDOWN_TIMEOUT = 2.0    # Secondes max d'attente d'ENV par l'affichage, avant SIGKILL à tout son groupe
+
+    # Simulation répartie (ENGINE = 'distributed', coordinator.py / node.py)
+    COORDINATOR_HOST = 'localhost'
+    COORDINATOR_PORT = 9998      # Port où les nœuds distants se connectent (nœuds locaux : port libre)
+    NODES = 2                    # Nœuds attendus avant le premier tick
+    NODES_LOCAL = True           # Lancer les nœuds sur cette machine (False : python node.py sur chaque machine)
+    NODE_WAIT_TIMEOUT = 60.0     # Secondes d'attente des nœuds
+    NODE_BALANCING = 'least_loaded'  # Placement des naissances : 'least_loaded' ou 'round_robin'
+
+    # Monde en grille (ENGINE = 'spatial', spatial_engine.py) : torique, une case = un pas de déplacement ;
+    # l'herbe (GRASS_*, herbe initiale) garde ses totaux pour tout le monde, répartis entre les cases
+    WORLD_WIDTH = 8
+    WORLD_HEIGHT = 8
+    WORLD_TILES = 1              # Bandes de lignes dont les repas sont tranchés en parallèle (threads)
+
+    # Moteur agrégé : cohortes, sauts de plusieurs ticks (mode batch : --engine aggregate)
+    AGGREGATE_LEAP = 5           # Ticks par saut (1 : au plus près de VectorEngine)
+    AGGREGATE_REPLICATES = 1000  # Répliques avancées ensemble (probabilités d'extinction)
+
+    # Mode batch (headless.py)
+    SEED = None       # Graine aléatoire (tirages clés des animaux et d'ENV, streams.py), None = tirée au démarrage
+    TICKS = 800       # Nombre de ticks d'un run
     
-    def __init__(self):
-        """Initialisation avec possibilité de charger depuis fichier"""
-        pass
+    def __init__(self, path=None, **overrides):
+        """Initialisation avec possibilité de charger depuis fichier (JSON {"NOM": valeur})"""
+        values = {}
+        if path:
+            with open(path) as f:
+                values.update(json.load(f))
+        values.update(overrides)
+        for name, value in values.items():
+            if not name.isupper() or not hasattr(Config, name):
+                raise ValueError(f"Paramètre de configuration inconnu : {name}")
+            setattr(self, name, value)
+
+    def as_dict(self):
+        """Tous les paramètres (valeurs de classe + surcharges)"""
+        return {name: getattr(self, name) for name in dir(self) if name.isupper()}
     
 
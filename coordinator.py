@@ -0,0 +1,399 @@
+"""
+COORDINATEUR - ENV d'une simulation répartie sur plusieurs nœuds (node.py)
+
+Exemples :
+    python headless.py --engine distributed --set NODES=4 --ticks 800      # 4 nœuds sur cette machine
+    python coordinator.py --nodes 3 --remote --host 0.0.0.0                # puis, sur chaque machine :
+    python node.py --host <adresse du coordinateur>
+
+Le coordinateur garde l'état global (herbe, sécheresse, épidémie, populations)
+et avance en pas synchronisés : à chaque tick il envoie un ordre TICK à
+chaque nœud puis attend tous les DELTA avant de fusionner. Les ressources
+partagées (herbe, proies à chasser) sont réparties entre les nœuds selon la
+faim qu'ils ont déclarée au tick précédent ; les proies mangées sont retirées
+au tick suivant, réparties selon la population de proies de chaque nœud ; les
+naissances demandées sont plafonnées globalement puis confiées aux nœuds
+selon Config.NODE_BALANCING.
+"""
+
+import argparse
+import json
+import signal
+import socket
+import sys
+import time
+import multiprocessing as mp
+from collections import deque
+import numpy as np
+import protocol
+from node import node_process
+from species import require_predator_prey
+from teardown import stop_processes
+from vector_engine import PREDATOR, PREY, VectorEngine
+
+BALANCING = ('least_loaded', 'round_robin')
+
+
+def split(total, weights):
+    """Répartit l'entier total selon des poids (plus forts restes) ; parts égales si tous les poids sont nuls"""
+    weights = np.asarray(weights, dtype=float)
+    shares = np.zeros(len(weights), dtype=np.int64)
+    if total <= 0 or not len(weights):
+        return shares
+    if weights.sum() <= 0:
+        weights = np.ones(len(weights))
+    exact = total * weights / weights.sum()
+    shares = np.floor(exact).astype(np.int64)
+    rest = int(total - shares.sum())
+    shares[np.argsort(shares - exact, kind='stable')[:rest]] += 1
+    return shares
+
+
+def least_loaded(count, loads):
+    """Confie count naissances aux nœuds les moins chargés (remplissage par niveau)"""
+    loads = np.asarray(loads, dtype=np.int64)
+    shares = np.zeros(len(loads), dtype=np.int64)
+    if count <= 0 or not len(loads):
+        return shares
+    # Plus petit niveau L tel que remonter tous les nœuds à L suffise
+    low, high = int(loads.min()), int(loads.min()) + count
+    while low < high:
+        level = (low + high) // 2
+        if np.maximum(0, level - loads).sum() >= count:
+            high = level
+        else:
+            low = level + 1
+    shares = np.maximum(0, low - 1 - loads)
+    rest = count - int(shares.sum())
+    shares[np.flatnonzero(loads < low)[:rest]] += 1
+    return shares
+
+
+class NodeLink:
+    """Connexion du coordinateur à un nœud, et dernier état déclaré par ce nœud"""
+
+    def __init__(self, sock, index):
+        self.socket = sock
+        self.index = index
+        self.buffer = bytearray()
+        self.messages = deque()
+        self.predators = 0
+        self.preys = 0
+        self.hungry_predators = 0
+        self.hungry_preys = 0
+        self.kills = 0          # proies à retirer au prochain tick
+
+    def send(self, msg):
+        """Envoie un message au nœud ; False si la connexion est perdue (ou bloquée)"""
+        try:
+            self.socket.sendall(protocol.encode_json([msg]))
+        except OSError:
+            return False
+        return True
+
+    def receive(self):
+        """Prochain message du nœud, None si la connexion est perdue ou muette (délai de la socket)"""
+        while not self.messages:
+            try:
+                data = self.socket.recv(65536)
+            except OSError:
+                data = b''
+            if not data:
+                return None
+            self.buffer += data
+            self.messages.extend(protocol.decode_json(self.buffer))
+        return self.messages.popleft()
+
+    def load(self):
+        return self.predators + self.preys
+
+
+class Coordinator:
+    """ENV réparti : état global et synchronisation des nœuds à chaque tick
+
+    Même constructeur, step() et status() que VectorEngine : utilisable par
+    headless.py (moteur 'distributed').
+    """
+
+    def __init__(self, config, nb_predators=0, nb_preys=0, grass=0, seed=None):
+        require_predator_prey(config, 'distributed')
+        self.config = config
+        self.seed = seed
+        self.rng = np.random.default_rng(seed)
+
+        # Etat de l'environnement (comme VectorEngine)
+        self.tick_count = 0
+        self.grass = int(grass)
+        self.drought_active = False
+        self.drought_end_tick = 0
+        self.epidemy_active = False
+        self.epidemy_end_tick = 0
+        self.total_births = 0
+        self.total_deaths = 0
+
+        # Individus à confier aux nœuds au prochain tick : population initiale, puis naissances
+        self.initial = [int(nb_predators), int(nb_preys)]
+        self.births = [0, 0]
+        self.rotation = 0     # prochain nœud en 'round_robin'
+
+        self.nodes = []
+        self.processes = []   # nœuds lancés sur cette machine
+        self.listener = None
+        self.start()
+
+    # Même environnement que le moteur vectorisé (herbe, sécheresse, épidémie)
+    update_grass = VectorEngine.update_grass
+    check_drought = VectorEngine.check_drought
+    trigger_drought = VectorEngine.trigger_drought
+    check_epidemy = VectorEngine.check_epidemy
+    trigger_epidemy = VectorEngine.trigger_epidemy
+
+    # ------------------------------------------------------------------
+    # Nœuds
+    # ------------------------------------------------------------------
+
+    def start(self):
+        """Ouvre le port des nœuds, lance les nœuds locaux si demandé, et attend Config.NODES nœuds"""
+        cfg = self.config
+        if cfg.NODE_BALANCING not in BALANCING:
+            raise ValueError(f"Répartition inconnue : {cfg.NODE_BALANCING} (choix : {', '.join(BALANCING)})")
+        self.listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        # Nœuds locaux : port libre choisi par le système (plusieurs runs en parallèle, sweep.py)
+        self.listener.bind((cfg.COORDINATOR_HOST, 0 if cfg.NODES_LOCAL else cfg.COORDINATOR_PORT))
+        self.listener.listen(cfg.NODES)
+        port = self.listener.getsockname()[1]
+        if cfg.NODES_LOCAL:
+            host = 'localhost' if cfg.COORDINATOR_HOST in ('', '0.0.0.0') else cfg.COORDINATOR_HOST
+            for i in range(cfg.NODES):
+                p = mp.Process(target=node_process, args=(host, port), name=f"node_{i}", daemon=True)
+                p.start()
+                self.processes.append(p)
+        else:
+            print(f" En attente de {cfg.NODES} nœuds sur le port {port}...")
+
+        self.listener.settimeout(cfg.NODE_WAIT_TIMEOUT)
+        while len(self.nodes) < cfg.NODES:
+            sock, _ = self.listener.accept()
+            sock.settimeout(cfg.LOCKSTEP_TIMEOUT) # un nœud bloqué sans fermer sa socket est perdu, comme à la barrière du pool
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            node = NodeLink(sock, len(self.nodes))
+            if node.receive() is None: # HELLO
+                continue
+            if not node.send({
+                'type': 'WELCOME',
+                'config': cfg.as_dict(),
+                'seed': None if self.seed is None else self.seed * 1000 + node.index + 1
+            }):
+                continue
+            self.nodes.append(node)
+
+    def assign(self, count):
+        """Répartition de count nouveaux individus entre les nœuds"""
+        if self.config.NODE_BALANCING == 'round_robin':
+            n = len(self.nodes)
+            shares = np.full(n, count // n, dtype=np.int64)
+            shares[(self.rotation + np.arange(count % n)) % n] += 1
+            self.rotation = (self.rotation + count) % n
+            return shares
+        return least_loaded(count, [node.load() for node in self.nodes])
+
+    def drop(self, node):
+        print(f"\n Nœud {node.index} perdu ({node.load()} individus)")
+        self.nodes.remove(node)
+        node.socket.close()
+
+    # ------------------------------------------------------------------
+    # Tick
+    # ------------------------------------------------------------------
+
+    def step(self):
+        """Un tick synchronisé de tous les nœuds"""
+        self.tick_count += 1
+        self.update_grass()
+        self.check_drought()
+        self.check_epidemy()
+        nodes = list(self.nodes)
+        if not nodes:
+            return
+
+        # Ressources partagées du tick, selon la faim déclarée au tick précédent
+        grass = split(self.grass, [node.hungry_preys for node in nodes])
+        preys = split(self.count(PREY), [node.hungry_predators for node in nodes])
+        new = [self.assign(self.initial[species] + self.births[species]) for species in (PREDATOR, PREY)]
+        self.total_births += sum(self.births)
+        self.initial = [0, 0]
+        self.births = [0, 0]
+        for i, node in enumerate(nodes):
+            if not node.send({
+                'type': 'TICK',
+                'tick': self.tick_count,
+                'grass': int(grass[i]),
+                'preys': int(preys[i]),
+                'kills': node.kills,
+                'births': [int(new[PREDATOR][i]), int(new[PREY][i])],
+                'drought': bool(self.drought_active),
+                'epidemy': bool(self.epidemy_active)
+            }):
+                self.drop(node)
+
+        # Fin du tick : tous les DELTA, puis fusion
+        deltas = []
+        for node in list(self.nodes):
+            delta = node.receive()
+            if delta is None:
+                self.drop(node)
+                continue
+            node.predators, node.preys = delta['predators'], delta['preys']
+            node.hungry_predators, node.hungry_preys = delta['hungry_predators'], delta['hungry_preys']
+            deltas.append(delta)
+        nodes = self.nodes
+        self.grass -= sum(d['grass_eaten'] for d in deltas)
+        self.total_deaths += sum(d['deaths'] for d in deltas)
+
+        # Proies mangées : comptées mortes tout de suite, retirées au prochain tick chez les nœuds qui ont des proies
+        eaten = min(sum(d['preys_eaten'] for d in deltas), sum(node.preys for node in nodes))
+        self.total_deaths += eaten
+        for node, kills in zip(nodes, split(eaten, [node.preys for node in nodes])):
+            node.kills = int(kills)
+
+        # Naissances demandées, plafonnées par MAX_PREDATORS / MAX_PREYS ; une espèce éteinte ne renaît pas
+        maximum = (self.config.MAX_PREDATORS, self.config.MAX_PREYS)
+        for species in (PREDATOR, PREY):
+            population = self.count(species)
+            requested = sum(d['births'][species] for d in deltas)
+            self.births[species] = min(requested, max(0, maximum[species] - population)) if population > 0 else 0
+
+    def run(self, ticks):
+        for _ in range(ticks):
+            self.step()
+
+    def count(self, species):
+        """Population d'une espèce, proies mangées déjà déduites"""
+        if species == PREDATOR:
+            return sum(node.predators for node in self.nodes)
+        return sum(node.preys - node.kills for node in self.nodes)
+
+    def status(self):
+        """Etat courant, au même format que GET_STATUS"""
+        return {
+            'predators': self.count(PREDATOR),
+            'preys': self.count(PREY),
+            'grass': int(self.grass),
+            'tick': self.tick_count,
+            'births': self.total_births,
+            'deaths': self.total_deaths,
+            'drought_active': bool(self.drought_active),
+            'epidemy_active': bool(self.epidemy_active),
+            'nodes': len(self.nodes)
+        }
+
+    def close(self):
+        """Arrête les nœuds"""
+        for node in self.nodes:
+            try:
+                node.send({'type': 'SHUTDOWN'})
+            except OSError:
+                pass
+            node.socket.close()
+        self.nodes = []
+        stop_processes(self.processes, grace=2) # tous les nœuds ensemble, puis SIGTERM / SIGKILL
+        if self.listener:
+            self.listener.close()
+            self.listener = None
+
+
+class CoordinatorEnvironment:
+    """Processus ENV du mode réparti : mêmes commandes et signaux qu'EnvironmentManager"""
+
+    def __init__(self, cmd_queue, data_queue, config, status_block=None):
+        self.cmd_queue = cmd_queue
+        self.data_queue = data_queue
+        self.config = config
+        self.status_block = status_block
+        self.coordinator = None
+        self.running = True
+        self.drought_dem = False
+        self.epidemy_dem = False
+
+    def handle_message_queue(self):
+        """Traite les messages de la file (depuis display)"""
+        while not self.cmd_queue.empty():
+            try:
+                msg = self.cmd_queue.get_nowait()
+                cmd_type = msg.get('type')
+                if cmd_type == 'GET_HERBE':
+                    self.coordinator.grass = int(msg['value'])
+                elif cmd_type == 'GET_PREY':
+                    self.coordinator.initial[PREY] += int(msg['value'])
+                elif cmd_type == 'GET_PREDATOR':
+                    self.coordinator.initial[PREDATOR] += int(msg['value'])
+                elif cmd_type == 'GET_STATUS':
+                    self.data_queue.put(self.coordinator.status())
+                elif cmd_type == 'SHUTDOWN':
+                    self.running = False
+            except Exception as e:
+                print(f" Erreur message queue: {e}")
+
+    def handle_signal(self, sig, frame):
+        if sig == signal.SIGUSR1:
+            self.drought_dem = True
+        if sig == signal.SIGUSR2:
+            self.epidemy_dem = True
+
+    def run(self):
+        signal.signal(signal.SIGUSR1, self.handle_signal)
+        signal.signal(signal.SIGUSR2, self.handle_signal)
+        self.coordinator = Coordinator(self.config, seed=self.config.SEED)
+        print(f"Démarrage (réparti sur {len(self.coordinator.nodes)} nœuds)...")
+        print("\n")
+        try:
+            while self.running:
+                self.handle_message_queue()
+                if self.drought_dem:
+                    self.coordinator.trigger_drought()
+                    self.drought_dem = False
+                if self.epidemy_dem:
+                    self.coordinator.trigger_epidemy()
+                    self.epidemy_dem = False
+                self.coordinator.step()
+                if self.status_block:
+                    self.status_block.publish(self.coordinator.status())
+                time.sleep(self.config.SIMULATION_TICK)
+        finally:
+            self.coordinator.close()
+
+
+def coordinator_process(cmd_queue, data_queue, config, status_block=None):
+    """Point d'entrée du processus environnement réparti"""
+    env = CoordinatorEnvironment(cmd_queue, data_queue, config, status_block)
+    env.run()
+
+
+def main(argv=None):
+    # Mêmes options que headless.py, plus le nombre de nœuds et leur emplacement
+    from headless import build_config, parse_args, run_headless
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument('--nodes', type=int)
+    parser.add_argument('--remote', action='store_true', help="Attendre des nœuds lancés à la main (node.py)")
+    parser.add_argument('--host')
+    parser.add_argument('--port', type=int)
+    extra, rest = parser.parse_known_args(argv)
+    args = parse_args(rest)
+    config = build_config(args)
+    for name, value in (('NODES', extra.nodes), ('COORDINATOR_HOST', extra.host), ('COORDINATOR_PORT', extra.port)):
+        if value is not None:
+            setattr(config, name, value)
+    if extra.remote:
+        config.NODES_LOCAL = False
+    stats = run_headless(config, engine='distributed')
+    text = json.dumps(stats, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
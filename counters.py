@@ -0,0 +1,128 @@
+"""
+Compteurs PARTAGÉS - Populations et herbe réparties en shards dans une mémoire partagée
+"""
+
+import os
+import multiprocessing as mp
+from multiprocessing.shared_memory import SharedMemory
+
+FIELDS = ('predator', 'prey', 'grass')
+
+
+class ShardedCounters:
+    """Compteurs répartis : une ligne par shard, la valeur d'un champ est la somme des lignes
+
+    La ligne 0 appartient à ENV, les lignes 1..shards aux animaux (shard_for)
+    ou aux workers du pool. Chaque écrivain ne modifie que sa ligne, sous le
+    verrou de cette seule ligne. Les lecteurs additionnent les lignes sans
+    verrou. Aucune ligne ne devient négative : prendre une ressource (manger la
+    dernière proie, la dernière herbe) se fait par claim(), qui consomme d'abord
+    la réserve de sa propre ligne et ne va "voler" la moitié d'une autre ligne
+    que lorsque la sienne est vide.
+    """
+
+    def __init__(self, fields=FIELDS, shards=None, ctx=None):
+        self.fields = tuple(fields)
+        self.field_index = {name: i for i, name in enumerate(self.fields)}
+        self.shards = shards or os.cpu_count() or 1
+        self.rows = self.shards + 1
+        self.shm = SharedMemory(create=True, size=self.rows * len(self.fields) * 8)
+        self.values = self.shm.buf.cast('q')
+        for i in range(len(self.values)):
+            self.values[i] = 0
+        self.locks = [(ctx or mp).Lock() for _ in range(self.rows)] # contexte des processus qui les partagent
+        self.owner = True
+
+    def __getstate__(self):
+        # Transmis à un processus lancé en 'spawn'/'forkserver' : on ne passe que le nom du segment
+        return {'fields': self.fields, 'shards': self.shards, 'name': self.shm.name, 'locks': self.locks}
+
+    def __setstate__(self, state):
+        self.fields = state['fields']
+        self.field_index = {name: i for i, name in enumerate(self.fields)}
+        self.shards = state['shards']
+        self.rows = self.shards + 1
+        self.shm = SharedMemory(name=state['name'])
+        # Le fils partage le resource_tracker d'ENV (qui détruit seul le segment) : rien à désinscrire
+        self.values = self.shm.buf.cast('q')
+        self.locks = state['locks']
+        self.owner = False
+
+    def shard_for(self, key):
+        """Shard d'un écrivain (id d'animal ou numéro de worker), jamais celui d'ENV"""
+        return 1 + key % self.shards
+
+    def slot(self, shard, field):
+        return shard * len(self.fields) + self.field_index[field]
+
+    def add(self, shard, field, delta):
+        """Ajoute delta (positif) dans la ligne de l'écrivain"""
+        i = self.slot(shard, field)
+        with self.locks[shard]:
+            self.values[i] += delta
+
+    def claim(self, shard, field, amount=1):
+        """Prend `amount` unités d'un champ si elles existent (sinon ne prend rien)"""
+        return self.take(shard, field, amount, partial=False) == amount
+
+    def take(self, shard, field, amount, partial=True):
+        """Prend jusqu'à `amount` unités, dans autant de lignes qu'il le faut ; renvoie la quantité réellement prise
+
+        Sans partial, prend `amount` unités d'une seule ligne, ou rien.
+        """
+        i = self.slot(shard, field)
+        taken = 0
+        with self.locks[shard]:
+            if self.values[i] >= amount or (partial and self.values[i] > 0):
+                taken = min(amount, self.values[i])
+                self.values[i] -= taken
+        if taken == amount:
+            return taken
+
+        # Réserve locale insuffisante : on récupère la moitié des autres lignes, une à une
+        for k in range(1, self.rows):
+            needed = amount - taken
+            other = (shard + k) % self.rows
+            j = self.slot(other, field)
+            with self.locks[other]:
+                available = self.values[j]
+                if available <= 0 or (available < needed and not partial):
+                    continue
+                batch = max(min(needed, available), (available + 1) // 2)
+                self.values[j] -= batch
+            taken += min(needed, batch)
+            if batch > needed:
+                with self.locks[shard]:
+                    self.values[i] += batch - needed
+            if taken == amount:
+                break
+        return taken
+
+    def total(self, field):
+        """Valeur d'un champ : somme des lignes, lue sans verrou"""
+        n = len(self.fields)
+        start = self.field_index[field]
+        return sum(self.values[start::n])
+
+    def snapshot(self):
+        """Toutes les valeurs agrégées"""
+        return {field: self.total(field) for field in self.fields}
+
+    def set(self, field, value):
+        """Remet un champ à value (initialisation), en vidant toutes les lignes"""
+        for lock in self.locks:
+            lock.acquire()
+        try:
+            for shard in range(self.rows):
+                self.values[self.slot(shard, field)] = 0
+            self.values[self.slot(0, field)] = value
+        finally:
+            for lock in self.locks:
+                lock.release()
+
+    def close(self):
+        """Libère le segment (détruit par le processus qui l'a créé)"""
+        self.values.release()
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
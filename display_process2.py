@@ -8,6 +8,11 @@ from config import Config
 from env_process import env_process
 from predator_process import predator_process
 from prey_process import prey_process
+from vector_engine import vector_env_process
+from coordinator import coordinator_process
+from event_engine import event_env_process
+from spatial_engine import spatial_env_process
+from status_block import StatusBlock
 
 class DisplayManager:
     """Gestionnaire de l'affichage de la simulation"""
@@ -15,13 +20,19 @@ class DisplayManager:
         self.config = config
         self.cmd_queue = mp.Queue()  # Pour envoyer des ordres à ENV
         self.data_queue = mp.Queue() # Pour recevoir les données de ENV
+        self.status_block = StatusBlock() # Etat publié par ENV à chaque tick, lu sans verrou
         self.processes = []
         self.running = True
     
     def start_simulation(self):
 
-        # Démarrer ENV
-        env_proc = mp.Process(target=env_process, args=(self.cmd_queue, self.data_queue, self.config))
+        # Démarrer ENV (un processus par individu, moteur vectorisé, ou coordinateur des nœuds)
+        targets = {'process': env_process, 'vector': vector_env_process, 'event': event_env_process,
+                   'distributed': coordinator_process, 'spatial': spatial_env_process}
+        if self.config.ENGINE not in targets: # 'aggregate' : mode batch seulement (headless.py)
+            raise ValueError(f"Moteur inconnu : {self.config.ENGINE}")
+        target = targets[self.config.ENGINE]
+        env_proc = mp.Process(target=target, args=(self.cmd_queue, self.data_queue, self.config, self.status_block))
         env_proc.start()
         self.processes.append(env_proc)
         time.sleep(0.5)
@@ -34,9 +45,15 @@ class DisplayManager:
             return
         print("\n La simulation est terminée !")
         self.cmd_queue.put({'type': 'SHUTDOWN'})
+        deadline = time.monotonic() + self.config.SHUTDOWN_TIMEOUT
         for p in self.processes:
-            if p.is_alive():
-                p.join(timeout=0.5)
+            p.join(timeout=max(0.0, deadline - time.monotonic()))
+            if p.is_alive(): # ENV bloqué : SIGKILL à tout son groupe (ENV, animaux, workers)
+                try:
+                    os.killpg(p.pid, signal.SIGKILL)
+                except ProcessLookupError: # moteur sans groupe de processus
+                    p.kill()
+                p.join()
         self.running = False
 
     # Gère les entrées de l'utilisateur dans le terminal : IA
@@ -49,6 +66,8 @@ class DisplayManager:
                 self.trigger_drought(env_pid)
             elif line == 'e' : 
                 self.trigger_epidemy(env_pid)
+            elif line == 'c': # sauvegarde dans Config.CHECKPOINT_PATH, sans arrêter la simulation
+                self.cmd_queue.put({'type': 'CHECKPOINT'})
         return None
 
     # Gère le déclenchement d'une sécheresse
@@ -71,36 +90,29 @@ class DisplayManager:
     def run_main_loop(self):
         print("\n" + "="*70)
         print(" 🌍 ​THE CIRCLE OF LIFE - Simulation Lancée 🐛​")
-        print(" Commandes: [q] Quitter | [s] Sécheresse | [e] Épidémie")
+        print(" Commandes: [q] Quitter | [s] Sécheresse | [e] Épidémie | [c] Checkpoint")
         print("="*70 + "\n")
 
-        nb_predateurs = input("🐯 ​Entrez le nombre de prédateurs : ")
-        nb_proies = input("🦓​ Entrez le nombre de proies : ")
-        nb_herbe = input("🌱​ Entrez la quantité d'herbe : ")
+        if self.config.RESUME: # les populations viennent du checkpoint
+            print(f" Reprise du checkpoint {self.config.RESUME}")
+        else:
+            nb_predateurs = input("🐯 ​Entrez le nombre de prédateurs : ")
+            nb_proies = input("🦓​ Entrez le nombre de proies : ")
+            nb_herbe = input("🌱​ Entrez la quantité d'herbe : ")
 
-        
-        # on initialise la quantité d'herbe indiquée par l'utilisateur
-        self.cmd_queue.put({'type': 'GET_HERBE', 'value': int(nb_herbe)})
-        self.cmd_queue.put({'type': 'GET_PREY', 'value': int(nb_proies)})
-        self.cmd_queue.put({'type': 'GET_PREDATOR', 'value': int(nb_predateurs)})
+            
+            # on initialise la quantité d'herbe indiquée par l'utilisateur
+            self.cmd_queue.put({'type': 'GET_HERBE', 'value': int(nb_herbe)})
+            self.cmd_queue.put({'type': 'GET_PREY', 'value': int(nb_proies)})
+            self.cmd_queue.put({'type': 'GET_PREDATOR', 'value': int(nb_predateurs)})
         
         env_pid = self.start_simulation()
 
 
         try:
             while self.running:
-                # On demande le statut à ENV via la queue
-                self.cmd_queue.put({'type': 'GET_STATUS'})
-                
-                # On lit la réponse (IA)
-                status = None
-                start_wait = time.time()
-                while time.time() - start_wait < 0.2:
-                    if not self.data_queue.empty():
-                        msg = self.data_queue.get()
-                        if isinstance(msg, dict) and 'predators' in msg:
-                            status = msg
-                            break
+                # On lit le dernier état publié par ENV (sans verrou ni aller-retour par la queue)
+                status = self.status_block.read()
                 
                 # 3. Affichage
                 if status:
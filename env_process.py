@@ -2,157 +2,373 @@
 Processus ENV - Gestion de l'environnement et des populations
 """
 
-import socket
 import signal
 import time
-import json
-import random
 import os
 import multiprocessing as mp
-from threading import Thread
+from collections import deque
+from threading import BrokenBarrierError, Thread
+import numpy as np
 from predator_process import predator_process as predator_process_wrapper
 from prey_process import prey_process as prey_process_wrapper
+from worker_pool import SCHEDULERS, WorkerPool
+from transport import make_server
+from counters import ShardedCounters
+from feeding import resolve_feeding
+from instrumentation import Instrumentation, STAGES
+from recorder import TimeSeriesRecorder
+from checkpoint import POPULATION_FIELDS, read_checkpoint, save_in_background
+from protocol import ENTITIES, ENTITY_CODES, TYPE_CODES
+from eventlog import EventLog
+from registry import EntityRegistry
+from streams import ENV, Streams, run_seed
+from species import require_predator_prey
+from teardown import stop_processes
+
+# Importés une fois par le serveur 'forkserver' : un animal ou un worker lancé n'a plus rien à importer
+PRELOAD = ['__main__', 'config', 'counters', 'transport', 'instrumentation', 'predator_process', 'prey_process', 'worker_pool']
+
+STAGE_MESSAGE_QUEUE, STAGE_FEEDING, STAGE_GRASS, STAGE_DROUGHT, STAGE_EPIDEMY = (
+    STAGES.index(name) for name in ('message_queue', 'feeding', 'grass', 'drought', 'epidemy')
+)
 
 class EnvironmentManager:
     """Gestionnaire de l'environnement de simulation"""
     
-    def __init__(self,cmd_queue, data_queue, config):
+    def __init__(self,cmd_queue, data_queue, config, status_block=None):
+        require_predator_prey(config, 'process') # un module par espèce (predator_process, prey_process)
+        # Contexte de lancement des animaux : tout ce qu'ils partagent avec ENV en vient
+        self.ctx = mp.get_context(config.START_METHOD)
+        if config.START_METHOD == 'forkserver':
+            self.ctx.set_forkserver_preload(PRELOAD)
         self.shared_mem =  {
-            'predator_count': mp.Value('i', 0),
-            'prey_count': mp.Value('i', 0),
-            'grass_count': mp.Value('i', 0),
-            'count_lock': mp.Lock(),# populations : lock pour accéder à la shared memory
-            'grass_lock': mp.Lock(), # herbe
-            'state_lock': mp.Lock(), # shutdown / epidemy 
-            'shutdown': mp.Value('i', 0), # pour arrêter les proies et prédateurs plus propremement 
-            'epidemy_active': mp.Value('i', 0)
+            # populations et herbe : compteurs répartis, chaque écrivain a sa ligne (ENV = ligne 0)
+            'counters': ShardedCounters(shards=config.COUNTER_SHARDS, ctx=self.ctx),
+            'state_lock': self.ctx.Lock(), # shutdown / epidemy 
+            'shutdown': self.ctx.Value('i', 0), # pour arrêter les proies et prédateurs plus propremement 
+            'epidemy_active': self.ctx.Value('i', 0),
+            'checkpoint': self.ctx.Value('i', 0) # incrémenté par ENV : les animaux envoient alors leur état (STATE)
         }
         self.cmd_queue = cmd_queue
         self.data_queue = data_queue
         self.config = config
+        self.status_block = status_block # état publié à chaque tick (lu sans verrou par display)
+        self.recorder = TimeSeriesRecorder(config.RECORD_DIR, config.RECORD_CAPACITY) if config.RECORD_DIR else None
+        self.event_log = EventLog(config.EVENT_LOG_DIR, config.EVENT_LOG_INDEX_INTERVAL) if config.EVENT_LOG_DIR else None
+        self.event_tick = 1 # tick dont l'état publié comptera les messages reçus maintenant (journal)
+        
+        # Instrumentation facultative : None = désactivée (un seul test par tick)
+        self.instrumentation = None
+        if config.INSTRUMENTATION:
+            counters = self.shared_mem['counters']
+            lock_names = ['state_lock'] + [f'counters[{i}]' for i in range(counters.rows)]
+            self.instrumentation = Instrumentation(lock_names, config.INSTRUMENTATION_CAPACITY)
+            self.shared_mem['state_lock'] = self.instrumentation.wrap_lock(self.shared_mem['state_lock'], 'state_lock')
+            counters.locks = [self.instrumentation.wrap_lock(lock, f'counters[{i}]') for i, lock in enumerate(counters.locks)]
+            self.shared_mem['overruns'] = self.instrumentation.overruns
         self.running = True
+        self.stopping = False                                  # arrêt en cours : messages lus mais ignorés
+        self.shutdown_report = None
         self.drought_active = False
         self.tick_count = 0
         self.drought_end_tick = 0
         self.epidemy_end_tick = 0
         self.epidemy_dem = False
-        self.processes = []
+        self.processes = [] # workers du pool (les processus d'animaux sont dans le registre)
+        self.registry = EntityRegistry()
+        self.pool = None # WorkerPool si config.WORKER_POOL
+        if config.SCHEDULER not in SCHEDULERS:
+            raise ValueError(f"Ordonnancement inconnu : {config.SCHEDULER} (choix : {', '.join(SCHEDULERS)})")
+        if config.SCHEDULER == 'lockstep' and not config.WORKER_POOL:
+            raise ValueError("SCHEDULER = 'lockstep' demande WORKER_POOL = True (un participant fixe par worker)")
         
-        # Socket serveur
-        self.server_socket = None
-        self.clients = []
+        # Serveur du transport choisi (boucle d'événements, process_message appelé pour chaque message)
+        self.server = make_server(config, self.process_message, self.instrumentation, self.ctx)
+        if config.TRANSPORT == 'shm':
+            self.shared_mem['ring'] = self.server.rings # les animaux y écrivent directement
+        self.socket_thread = None
+        
+        # Alimentation groupée (config.FEEDING == 'batched') : demandes HUNGRY du tick
+        self.feed_requests = deque()
+
+        # Tirages clés par (graine, id, tick) : une seule graine pour le run, transmise aux animaux avec config
+        config.SEED = run_seed(config.SEED)
+        self.streams = Streams(config.SEED)
+        self.birth_requests = deque() # lockstep : REPRODUCE du tick, traités ensemble par resolve_births
+        self.restored = set() # ids repris d'un checkpoint dont le JOIN ne compte pas (compteurs du fichier)
+
+        # Checkpoint en cours : état d'ENV figé à la demande, et états STATE reçus des animaux
+        self.pending_checkpoint = None
         
         # Statistiques
         self.total_births = 0
         self.total_deaths = 0
+        self.startup_seconds = None # du lancement d'ENV au JOIN de toute la population initiale
     
     def setup_socket(self):
         """Configure le socket serveur pour recevoir les messages"""
-        self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1) # Autorise la réutilisation de l’adresse et du port du socket immédiatement après sa fermeture
-        self.server_socket.bind((self.config.SOCKET_HOST, self.config.SOCKET_PORT))
-        self.server_socket.listen(10)
-        self.server_socket.settimeout(0.5)  # Non-bloquant
+        self.server.setup()
     
-    def handle_socket_connections(self): # IA un peu utilisée 
-        """Thread pour gérer les connexions socket"""
-        while self.running:
-            try:
-                client, addr = self.server_socket.accept()
-                self.clients.append(client)
-                # Thread pour gérer ce client
-                t = Thread(target=self.handle_client, args=(client,), daemon=True)
-                t.start()
-            except socket.timeout:
-                continue
-            except Exception as e:
-                if self.running:
-                    print(f" Erreur socket: {e}")
-                break
+    def start_server(self):
+        """Ouvre le socket serveur et lance le thread (unique) de réception"""
+        self.setup_socket()
+        self.socket_thread = Thread(target=self.handle_socket_connections, daemon=True)
+        self.socket_thread.start()
     
-    def handle_client(self, client):
-        """Gère les messages d'un client"""
-        buffer = ""
+    def handle_socket_connections(self):
+        """Thread unique de réception : une boucle d'événements pour toutes les connexions"""
         try:
-            while self.running:
-                data = client.recv(1024).decode('utf-8')
-                if not data:
-                    break
-                
-                buffer += data
-                while '\n' in buffer:
-                    line, buffer = buffer.split('\n', 1) # on récup ligne par ligne dans le buffer (IA)
-                    if line.strip(): # si la ligne n'est pas vide (IA)
-                        self.process_message(json.loads(line))
+            self.server.serve(lambda: self.running)
         except Exception as e:
-            pass
-        finally:
-            try:
-                client.close()
-            except:
-                pass
-            if client in self.clients:
-                self.clients.remove(client)
+            if self.running:
+                print(f" Erreur socket: {e}")
     
-    def process_message(self, msg):
-        """Traite un message reçu via socket"""
+    def process_message(self, msg, client=None):
+        """Traite un message reçu via socket (client : connexion d'origine, pour répondre)"""
+        if self.stopping: # les derniers messages ne font que vider les sockets
+            return
         try:
             msg_type = msg.get('type')
+            if self.instrumentation:
+                self.instrumentation.count_message(msg_type)
             
-            # Un predateur ou une proie est ajouté suite à sa création
+            # Un predateur ou une proie inscrit au registre rejoint la simulation
             if msg_type == 'JOIN':
                 entity = msg.get('entity')
-                with self.shared_mem['count_lock']:
-                    if entity == 'predator':
-                        self.shared_mem['predator_count'].value += 1
-                    elif entity == 'prey' :
-                        self.shared_mem['prey_count'].value += 1
+                if entity in ('predator', 'prey') and self.registry.seen(msg.get('id'), self.event_tick, joined=True):
+                    if not self.restored_once(msg.get('id')):
+                        self.shared_mem['counters'].add(0, entity, 1)
+                    self.log_event(msg_type, entity, msg.get('id'))
             
-            # Un predateur ou une proie est enlevé suite à sa mort
+            # Un predateur ou une proie est enlevé suite à sa mort (une seule fois, même s'il a été déclaré perdu)
             elif msg_type == 'DEATH':
-                entity = msg.get('entity')
-                with self.shared_mem['count_lock']:
-                    if entity == 'predator':
-                        self.shared_mem['predator_count'].value = max(0, self.shared_mem['predator_count'].value - 1)
-                    elif entity == 'prey':
-                        self.shared_mem['prey_count'].value = max(0, self.shared_mem['prey_count'].value - 1)
-                self.total_deaths += 1
+                removed = self.registry.remove(msg.get('id'))
+                if removed:
+                    entity, joined = removed
+                    if self.restored_once(msg.get('id')) or joined:
+                        self.shared_mem['counters'].claim(0, entity) # ne descend jamais sous 0
+                    self.total_deaths += 1
+                    self.log_event(msg_type, entity, msg.get('id'))
             
             # Un predateur ou une proie est ajouté suite à une reproduction
             elif msg_type == 'REPRODUCE':
-                entity = msg.get('entity')
-                with self.shared_mem['count_lock']:
-                    nb_preys = self.shared_mem['prey_count'].value
-                    nb_preds =  self.shared_mem['predator_count'].value
-                # Vérification : on ne reproduit pas une espèce éteinte
-                if entity == 'predator' and 0 < nb_preds < self.config.MAX_PREDATORS:
-                    # Lancer nouveau processus prédateur avec un id inutilisé
-                    new_id = self.tick_count * 1000 + random.randint(0, 999)
-                    p = mp.Process(
-                        target=predator_process_wrapper,
-                        args=(new_id, self.shared_mem, self.config),
-                        name=f"predator_{new_id}"
-                    )
-                    p.start()
-                    self.total_births += 1
-                elif entity == 'prey' and 0 < nb_preys < self.config.MAX_PREYS:
-                    # Lancer nouveau processus prédateur avec un id inutilisé
-                    new_id = self.tick_count * 1000 + random.randint(0, 999)
-                    p = mp.Process(
-                        target=prey_process_wrapper,
-                        args=(new_id, self.shared_mem, self.config),
-                        name=f"prey_{new_id}"
-                    )
-                    p.start()
-                    self.total_births += 1
+                if self.pool and self.pool.barrier is not None:
+                    self.birth_requests.append((msg.get('entity'), msg.get('id')))
+                else:
+                    self.give_birth(msg.get('entity'), msg.get('id'))
+                self.registry.seen(msg.get('id'), self.event_tick)
             
-            elif msg_type == 'FEED' : # On s'en occupe dans predator et prey
-                pass
+            elif msg_type == 'FEED' : # On s'en occupe dans predator et prey (seulement journalisé)
+                self.registry.seen(msg.get('id'), self.event_tick)
+                self.log_event(msg_type, msg.get('entity'), msg.get('id'))
+            
+            # Etat d'un animal pour le checkpoint en cours
+            elif msg_type == 'STATE':
+                self.log_event(msg_type, msg.get('entity'), msg.get('id'))
+                pending = self.pending_checkpoint
+                if pending is not None:
+                    pending['individuals'][(msg.get('entity'), msg.get('id'))] = \
+                        (msg.get('energy'), msg.get('tick'), msg.get('active'))
+            
+            # Un animal affamé attend la résolution groupée du tick (resolve_feeding)
+            elif msg_type == 'HUNGRY':
+                self.feed_requests.append((msg.get('entity'), msg.get('id'), client))
+                self.registry.seen(msg.get('id'), self.event_tick)
+                self.log_event(msg_type, msg.get('entity'), msg.get('id'))
                 
                 
         except Exception as e:
             print(f" Erreur process_message: {e}")
     
+    def log_event(self, msg_type, entity, animal_id, tick=None):
+        """Journalise un message accepté (au tick dont l'état publié le comptera, par défaut)"""
+        if self.event_log and msg_type in TYPE_CODES and entity in ENTITY_CODES:
+            self.event_log.append(self.event_tick if tick is None else tick, msg_type, entity, animal_id)
+
+    def restored_once(self, animal_id):
+        """Vrai, une seule fois, pour un individu repris d'un checkpoint : déjà compté par les compteurs sauvegardés"""
+        try:
+            self.restored.remove(animal_id)
+            return True
+        except KeyError:
+            return False
+
+    def give_birth(self, entity, parent_id):
+        """Fait naître un petit de l'espèce, sauf si elle est éteinte ou au maximum (REPRODUCE journalisé si accepté)"""
+        if entity not in ('predator', 'prey'):
+            return
+        alive = self.shared_mem['counters'].total(entity)
+        # Les naissances acceptées dont le JOIN n'est pas arrivé comptent déjà pour le plafond
+        unborn = self.registry.waiting(entity)
+        maximum = self.config.MAX_PREDATORS if entity == 'predator' else self.config.MAX_PREYS
+        # Vérification : on ne reproduit pas une espèce éteinte
+        if 0 < alive and alive + unborn < maximum:
+            # Lancer nouvel individu (id neuf attribué par le registre)
+            self.spawn_animal(entity)
+            self.total_births += 1
+            self.log_event('REPRODUCE', entity, parent_id)
+
+    def resolve_births(self):
+        """Lockstep : naissances du tick dans l'ordre des parents, et non d'arrivée (ids et plafonds reproductibles)"""
+        requests = []
+        while self.birth_requests:
+            requests.append(self.birth_requests.popleft())
+        for entity, parent_id in sorted(requests):
+            self.give_birth(entity, parent_id)
+
+    def resolve_feeding(self):
+        """Tranche en une passe tous les repas demandés depuis le tick précédent"""
+        requests = []
+        while self.feed_requests:
+            requests.append(self.feed_requests.popleft())
+        if not requests:
+            return
+        clients = {(entity, animal_id): client for entity, animal_id, client in requests}
+        hunters = [animal_id for entity, animal_id, _ in requests if entity == 'predator']
+        grazers = [animal_id for entity, animal_id, _ in requests if entity == 'prey']
+
+        counters = self.shared_mem['counters']
+        fed_hunters, fed_grazers = resolve_feeding(
+            self.streams, self.tick_count, hunters, grazers, counters.total('prey'), counters.total('grass'), self.config
+        )
+        # Seuls les premiers gagnants (ordre tiré) sont nourris si les compteurs ont baissé entre-temps
+        fed_hunters = fed_hunters[:counters.take(0, 'prey', len(fed_hunters))]
+        fed_grazers = fed_grazers[:counters.take(0, 'grass', len(fed_grazers))]
+
+        # Une seule réponse par connexion, avec tous ses animaux nourris
+        replies = {}
+        for entity, fed in (('predator', fed_hunters), ('prey', fed_grazers)):
+            for animal_id in fed.tolist():
+                client = clients[(entity, animal_id)]
+                self.log_event('FED', entity, animal_id, self.tick_count)
+                replies.setdefault(client, []).append({'type': 'FED', 'entity': entity, 'id': animal_id})
+        for client, messages in replies.items():
+            if client is not None:
+                self.server.send(client, messages)
+    
+    def spawn_animal(self, entity, animal_id=None, state=None):
+        """Fait naître un animal : objet dans un worker du pool, ou nouveau processus
+
+        Il est inscrit au registre (avec un id neuf si animal_id est None)
+        avant d'être lancé ; renvoie son processus (None dans un worker).
+        """
+        registry = self.registry
+        if animal_id is None:
+            animal_id = registry.allocate()
+        else:
+            registry.reserve(animal_id)
+        registry.add(animal_id, entity, self.tick_count - (state[1] if state else 0))
+        if self.pool:
+            registry.host(animal_id, worker=self.pool.spawn(entity, animal_id, state))
+            return None
+        target = predator_process_wrapper if entity == 'predator' else prey_process_wrapper
+        p = self.ctx.Process(
+            target=target,
+            args=(animal_id, self.shared_mem, self.config, state),
+            name=f"{entity}_{animal_id}"
+        )
+        p.start()
+        registry.host(animal_id, process=p)
+        return p
+
+    def collect_lost(self):
+        """Compte comme morts les animaux dont le processus (ou le worker) s'est arrêté sans DEATH"""
+        self.registry.tick = self.tick_count
+        for animal_id, entity, joined in self.registry.expire(self.tick_count, self.config.DEATH_GRACE_TICKS):
+            if self.restored_once(animal_id) or joined:
+                self.shared_mem['counters'].claim(0, entity)
+            self.total_deaths += 1
+            self.log_event('DEATH', entity, animal_id, self.tick_count)
+    
+    def request_checkpoint(self, path):
+        """Fige l'état d'ENV et demande aux animaux leur état, sans arrêter les ticks"""
+        if self.pending_checkpoint is not None:
+            print(f"\n Checkpoint déjà en cours, demande ignorée")
+            return
+        counters = self.shared_mem['counters']
+        self.pending_checkpoint = {
+            'path': path,
+            'state': {
+                'engine': 'process',
+                'tick_count': self.tick_count,
+                'grass': counters.total('grass'),
+                'predators': counters.total('predator'), # les compteurs font foi : une proie mangée
+                'preys': counters.total('prey'),         # garde son processus, et répond encore STATE
+                'drought_active': bool(self.drought_active),
+                'drought_end_tick': self.drought_end_tick,
+                'epidemy_active': bool(self.shared_mem['epidemy_active'].value),
+                'epidemy_end_tick': self.epidemy_end_tick,
+                'total_births': self.total_births,
+                'total_deaths': self.total_deaths,
+                'seed': self.streams.seed, # tirages clés : rien d'autre à sauvegarder
+            },
+            'expected': len(self.registry), # tous les inscrits répondent, proies mangées comprises
+            'deadline': self.tick_count + self.config.CHECKPOINT_WAIT_TICKS,
+            'individuals': {}
+        }
+        self.shared_mem['checkpoint'].value += 1
+
+    def collect_checkpoint(self):
+        """Termine le checkpoint quand tous les animaux ont répondu (ou au bout du délai)"""
+        pending = self.pending_checkpoint
+        received = len(pending['individuals'])
+        if received < pending['expected'] and self.tick_count < pending['deadline']:
+            return
+        self.pending_checkpoint = None
+        individuals = pending['individuals']
+        keys = list(individuals)
+        values = list(individuals.values())
+        population = {
+            'ids': np.array([animal_id for _, animal_id in keys], dtype=np.int64),
+            'species': np.array([ENTITY_CODES[entity] for entity, _ in keys], dtype=np.int8),
+            'energy': np.array([energy for energy, _, _ in values], dtype=np.float64),
+            'age': np.array([age for _, age, _ in values], dtype=np.int32),
+            'active': np.array([active for _, _, active in values], dtype=bool),
+        }
+        save_in_background(pending['path'], pending['state'], population)
+        self.data_queue.put({'type': 'CHECKPOINT', 'path': pending['path'], 'individuals': received})
+
+    def restore(self, path):
+        """Reprend l'état d'ENV d'un checkpoint (populations comprises) et fait renaître chaque individu"""
+        state, population = read_checkpoint(path)
+        counters = self.shared_mem['counters']
+        self.tick_count = state['tick_count']
+        self.event_tick = self.tick_count + 1
+        counters.set('grass', state['grass'])
+        counted = 'preys' in state # sinon (ancien checkpoint), recomptés par les JOIN des individus
+        counters.set('predator', state['predators'] if counted else 0)
+        counters.set('prey', state['preys'] if counted else 0)
+        self.drought_active = state['drought_active']
+        self.drought_end_tick = state['drought_end_tick']
+        self.shared_mem['epidemy_active'].value = int(state['epidemy_active'])
+        self.epidemy_end_tick = state['epidemy_end_tick']
+        self.total_births = state['total_births']
+        self.total_deaths = state['total_deaths']
+        if state.get('seed') not in (None, self.streams.seed):
+            print(f" Reprise avec la graine {self.streams.seed} (checkpoint : {state['seed']}), "
+                  f"--set SEED={state['seed']} pour continuer la même suite")
+
+        for animal_id, species, energy, age, active in zip(*(population[name].tolist() for name in POPULATION_FIELDS)):
+            if animal_id in self.registry: # ancien checkpoint : ids numérotés par espèce
+                animal_id = self.registry.allocate()
+            if counted:
+                self.restored.add(animal_id)
+            self.spawn_animal(ENTITIES[species], animal_id, (energy, age, active))
+
+    def status(self):
+        """Etat courant, sans verrou : compteurs agrégés, et drapeaux écrits par ENV seul"""
+        counts = self.shared_mem['counters'].snapshot()
+        return {
+            'predators': counts['predator'],
+            'preys': counts['prey'],
+            'grass': counts['grass'],
+            'tick': self.tick_count,
+            'births': self.total_births,
+            'deaths': self.total_deaths,
+            'drought_active': bool(self.drought_active),
+            'epidemy_active': bool(self.shared_mem['epidemy_active'].value)
+        }
+    
     def handle_message_queue(self):
         """Traite les messages de la file (depuis display)"""
         while not self.cmd_queue.empty():
@@ -161,44 +377,79 @@ class EnvironmentManager:
                 cmd_type = msg.get('type')
                 
                 if cmd_type == 'GET_HERBE': # on initialise la quantité d'herbe au départ
-                    with self.shared_mem['grass_lock']:
-                        self.shared_mem['grass_count'].value = msg["value"]
+                    self.shared_mem['counters'].set('grass', msg["value"])
 
                 elif cmd_type == 'GET_PREY': # on initialise la quantité de proies au départ
-                    with self.shared_mem['count_lock']:
-                        self.shared_mem['prey_count'].value = msg["value"]
+                    self.shared_mem['counters'].set('prey', msg["value"])
 
                 elif cmd_type == 'GET_PREDATOR': # on initialise la quantité de prédateurs au départ
-                    with self.shared_mem['count_lock']:
-                        self.shared_mem['predator_count'].value = msg["value"]
+                    self.shared_mem['counters'].set('predator', msg["value"])
 
                 elif cmd_type == 'GET_STATUS': # on récupère l'état des paramètres pour les transmettre au display
-                    with self.shared_mem['count_lock'], self.shared_mem['grass_lock'], self.shared_mem['state_lock']:
-                        status = {
-                            'predators': self.shared_mem['predator_count'].value,
-                            'preys': self.shared_mem['prey_count'].value,
-                            'grass': int(self.shared_mem['grass_count'].value),
-                            'tick': self.tick_count,
-                            'births': self.total_births,
-                            'deaths': self.total_deaths,
-                            'drought_active': bool(self.drought_active),
-                            'epidemy_active': bool(self.shared_mem['epidemy_active'].value)
-                        }
+                    status = self.status()
+                    status.update(self.server.stats()) # débit de messages et nombre de threads
+                    status.update(self.registry.stats()) # individus inscrits, récupérés, perdus
+                    status['startup_seconds'] = self.startup_seconds
                     self.data_queue.put(status)
+                
+                elif cmd_type == 'CHECKPOINT': # sauvegarde de la simulation (écrite en arrière-plan)
+                    self.request_checkpoint(msg.get('path') or self.config.CHECKPOINT_PATH)
+
+                elif cmd_type == 'GET_STATS': # mesures de l'instrumentation (si activée)
+                    report = self.instrumentation.report() if self.instrumentation else None
+                    self.data_queue.put({'type': 'STATS', 'stats': report})
                         
                 
                 elif cmd_type == 'SHUTDOWN': # On stoppe la simulation
-                    self.running = False
-                    with self.shared_mem['state_lock']:
-                        self.shared_mem['shutdown'].value = 1
-                    for p in self.processes:
-                        if p.is_alive():
-                            p.join(timeout=0.5) # Non bloquant, n'attend plus au bout de 0.5 s
+                    self.shutdown()
                 
                 
             except Exception as e:
                 print(f" Erreur message queue: {e}")
 
+    def raise_shutdown(self):
+        """Drapeau d'arrêt lu par les animaux et les workers"""
+        with self.shared_mem['state_lock']:
+            self.shared_mem['shutdown'].value = 1
+        if self.pool:
+            self.pool.stop() # workers en attente à la barrière (lockstep)
+
+    def shutdown(self):
+        """Arrête tous les processus de la simulation ensemble, avec une échéance globale
+
+        Avec SHUTDOWN_GRACE > 0, le drapeau shutdown prévient tout le monde
+        d'un coup et les sentinelles de tous les processus sont attendues à la
+        fois. Les retardataires (tous, sans délai de grâce : des milliers
+        d'animaux réveillés en même temps priveraient ENV du processeur)
+        reçoivent SIGTERM en un seul signal au groupe de processus d'ENV (voir
+        env_process), puis SIGKILL. Le thread socket vide les connexions
+        pendant ce temps. Le rapport est affiché et envoyé sur data_queue.
+
+        Après les signaux, ENV ne prend plus aucun verrou partagé : un
+        processus tué a pu le garder.
+        """
+        start = time.monotonic()
+        self.stopping = True
+        self.registry.stop_reaper() # avant l'attente : lui seul ferme les processus d'animaux
+        group = os.getpgrp() if os.getpgrp() == os.getpid() else None # ENV hébergé (benchmark) : un par un
+        if group is None or self.config.SHUTDOWN_GRACE > 0:
+            self.raise_shutdown()
+        report = stop_processes(self.processes + self.registry.live_processes(), self.config.SHUTDOWN_GRACE,
+                                group=group)
+        if self.socket_thread and self.socket_thread.is_alive():
+            self.server.sync(self.config.SHUTDOWN_DRAIN) # connexions fermées par les processus arrêtés
+        report['seconds'] = time.monotonic() - start
+        report['open_connections'] = self.server.connection_count()
+        self.running = False
+        self.server.wake() # la boucle d'événements voit running faux sans attendre son délai
+        self.shutdown_report = report
+        print(f" Arrêt en {report['seconds'] * 1000:.0f} ms : {report['processes']} processus, "
+              f"{report['exited']} sortis, {report['terminated']} SIGTERM, {report['killed']} SIGKILL")
+        if report['stragglers']:
+            shown = ', '.join(report['stragglers'][:10])
+            print(f" Retardataires (SIGKILL, {len(report['stragglers'])}) : {shown}")
+        self.data_queue.put({'type': 'SHUTDOWN', **report})
+
     def handle_signal(self, sig, frame):
         if sig == signal.SIGUSR1: # si on reçoit un signal, on déclenche une sécheresse
             self.trigger_drought()
@@ -207,23 +458,21 @@ class EnvironmentManager:
     
     def update_grass(self):
         """Met à jour la croissance de l'herbe"""
+        counters = self.shared_mem['counters']
         if not self.drought_active:
-            with self.shared_mem['grass_lock']:
-                current = self.shared_mem['grass_count'].value
-                new_value = min(current + self.config.GRASS_GROWTH_RATE, self.config.GRASS_MAX)
-                self.shared_mem['grass_count'].value = int(new_value)  # Convertir en int
+            current = counters.total('grass')
+            growth = int(min(current + self.config.GRASS_GROWTH_RATE, self.config.GRASS_MAX)) - current
+            if growth > 0:
+                counters.add(0, 'grass', growth)
         else : # Si la sécheresse est active
-            with self.shared_mem['grass_lock']:
-                current = self.shared_mem['grass_count'].value
-                new_value = max(current - self.config.GRASS_DECREASE_RATE, 0)
-                self.shared_mem['grass_count'].value = int(new_value)  # Convertir en int
+            counters.take(0, 'grass', int(self.config.GRASS_DECREASE_RATE)) # jamais sous 0
 
     
     def check_drought(self):
         """Vérifie et gère les sécheresses"""
         if not self.drought_active:
             # Démarrer sécheresse aléatoirement
-            if random.random() < self.config.DROUGHT_PROBABILITY:
+            if self.streams.random(ENV, self.tick_count, 'drought') < self.config.DROUGHT_PROBABILITY:
                 self.trigger_drought()
         else:
             # Vérifier fin de sécheresse
@@ -233,7 +482,8 @@ class EnvironmentManager:
     def trigger_drought(self):
         """Déclenche une sécheresse"""
         self.drought_active = True
-        duration = random.randint(self.config.DROUGHT_MIN_DURATION, self.config.DROUGHT_MAX_DURATION)
+        duration = self.streams.integers(self.config.DROUGHT_MIN_DURATION, self.config.DROUGHT_MAX_DURATION,
+                                         ENV, self.tick_count, 'drought_duration')
         self.drought_end_tick = self.tick_count + duration
         print(f"\n 🌞​ SÉCHERESSE déclenchée (durée: {duration} ticks)")
 
@@ -246,7 +496,7 @@ class EnvironmentManager:
     def check_epidemy(self):
         with self.shared_mem['state_lock']:
             if not self.shared_mem['epidemy_active'].value: 
-                if random.random() < self.config.EPIDEMY_PROBABILITY:
+                if self.streams.random(ENV, self.tick_count, 'epidemy') < self.config.EPIDEMY_PROBABILITY:
                     self.trigger_epidemy()
 
 
@@ -259,9 +509,10 @@ class EnvironmentManager:
         - Ca garantit que le déclenchement de l'événement ne bloque pas les nombreux 
           processus qui lisent cette valeur, ce qui créait des bugs auparavant"""
         self.shared_mem['epidemy_active'].value = 1
-        duree = random.randint(
+        duree = self.streams.integers(
             self.config.EPIDEMY_MIN_DURATION,
-            self.config.EPIDEMY_MAX_DURATION
+            self.config.EPIDEMY_MAX_DURATION,
+            ENV, self.tick_count, 'epidemy_duration'
         )
         self.epidemy_end_tick = self.tick_count + duree
         print(f"\n 🦠 ÉPIDÉMIE déclenchée pour {duree} ticks !")
@@ -278,15 +529,96 @@ class EnvironmentManager:
 
     
     
+    def tick(self):
+        """Un tick de l'environnement"""
+        self.tick_count += 1
+        instr = self.instrumentation
+        if instr:
+            instr.begin_tick()
+        
+        # Traiter la file de messages
+        self.handle_message_queue()
+        if not self.running: # arrêt : un processus tué a pu laisser un verrou partagé pris
+            return
+        if instr:
+            instr.lap(STAGE_MESSAGE_QUEUE)
+        
+        # Repas groupés du tick
+        if self.config.FEEDING == 'batched':
+            self.resolve_feeding()
+        if instr:
+            instr.lap(STAGE_FEEDING)
+        
+        # Mettre à jour l'herbe
+        self.update_grass()
+        if instr:
+            instr.lap(STAGE_GRASS)
+        
+        # Gérer les sécheresses
+        self.check_drought()
+        if instr:
+            instr.lap(STAGE_DROUGHT)
+
+        # Gérer les épidémies
+        if self.epidemy_dem : 
+            self.trigger_epidemy()
+            self.epidemy_dem = False
+        self.check_epidemy()
+        self.update_epidemy()
+        if instr:
+            instr.lap(STAGE_EPIDEMY)
+            instr.end_tick()
+        
+        # Animaux disparus sans DEATH
+        self.collect_lost()
+
+        # Checkpoint en attente des états des animaux
+        if self.pending_checkpoint is not None:
+            self.collect_checkpoint()
+        
+        # Publier (et enregistrer) l'état du tick
+        if self.status_block or self.recorder:
+            status = self.status()
+            if self.status_block:
+                self.status_block.publish(status)
+            if self.recorder:
+                self.recorder.append(status)
+        self.event_tick = self.tick_count + 1
+    
+    def wait_next_tick(self):
+        """Attente fixe, ou en lockstep : un step de tous les workers, tous leurs messages reçus, puis leurs naissances"""
+        if not self.pool or self.pool.barrier is None:
+            time.sleep(self.config.SIMULATION_TICK)
+            return
+        if not self.running:
+            return
+        try:
+            self.pool.advance()
+        except BrokenBarrierError:
+            print(f" Lockstep : un worker n'a pas fini son tick en {self.config.LOCKSTEP_TIMEOUT} s, arrêt")
+            self.running = False
+            return
+        self.server.sync(self.config.LOCKSTEP_TIMEOUT)
+        self.resolve_births()
+
+    def wait_population(self, start):
+        """Barrière de démarrage : attend le JOIN de toute la population initiale
+
+        En lockstep, les workers ne traitent leurs naissances qu'au départ du
+        premier tick, dont la fin attend déjà tous leurs messages.
+        """
+        if not (self.pool and self.pool.barrier is not None):
+            if not self.registry.wait_ready(self.config.STARTUP_TIMEOUT):
+                print(f" Démarrage : {self.registry.pending} individus sans JOIN après {self.config.STARTUP_TIMEOUT} s")
+        self.startup_seconds = time.perf_counter() - start
+        print(f" Population initiale prête en {self.startup_seconds:.2f} s ({len(self.registry)} individus)")
+
     def run(self):
         """Boucle principale de l'environnement"""
 
         try:
-            self.setup_socket()
-            
-            # Thread pour gérer les connexions socket
-            socket_thread = Thread(target=self.handle_socket_connections, daemon=True)
-            socket_thread.start()
+            start = time.perf_counter()
+            self.start_server()
             
             print("Démarrage...")
             print("\n")
@@ -297,62 +629,59 @@ class EnvironmentManager:
             self.handle_message_queue()
 
             # On récup le nb de prédateurs et proies
-            with self.shared_mem["count_lock"] : 
-                nb_predateurs = self.shared_mem["predator_count"].value
-                nb_proies = self.shared_mem["prey_count"].value
-            
-                self.shared_mem["predator_count"].value = 0 # On les remets à 0 car ils seront réinitialisé avec les bonnes
-                self.shared_mem["prey_count"].value = 0 # valeurs dans process_message
-
-            # Démarrer nb_predateurs prédateurs
-            for i in range(nb_predateurs):
-                p = mp.Process(target=predator_process_wrapper, args=(i, self.shared_mem, self.config))
-                p.start()
-                self.processes.append(p)
-            
-            time.sleep(0.5)
-                
-            # Démarrer nb_proies proies
-            for i in range(nb_proies):
-                p = mp.Process(target=prey_process_wrapper, args=(i, self.shared_mem, self.config))
-                p.start()
-                self.processes.append(p)
+            counters = self.shared_mem["counters"]
+            nb_predateurs = counters.total("predator")
+            nb_proies = counters.total("prey")
+        
+            counters.set("predator", 0) # On les remets à 0 car ils seront réinitialisé avec les bonnes
+            counters.set("prey", 0) # valeurs dans process_message
 
-            time.sleep(0.5)
+            # Pool de workers (taille fixe, quelle que soit la population)
+            if self.config.WORKER_POOL:
+                self.pool = WorkerPool(self.shared_mem, self.config, ctx=self.ctx)
+                self.processes.extend(self.pool.start())
+                for index, p in enumerate(self.pool.processes):
+                    self.registry.watch_worker(index, p)
+            self.registry.start_reaper(lambda: self.running, self.config.REAP_INTERVAL)
+
+            if self.config.RESUME:
+                # Reprise d'un checkpoint : l'état sauvegardé remplace les valeurs initiales
+                self.restore(self.config.RESUME)
+            else:
+                # Lancer toute la population d'un coup : chaque animal se connecte et envoie son JOIN
+                # pendant que les suivants démarrent
+                for i in range(nb_predateurs):
+                    self.spawn_animal('predator')
+                for i in range(nb_proies):
+                    self.spawn_animal('prey')
+            self.wait_population(start)
             
             while self.running:
-                self.tick_count += 1
-                
-                # Traiter la file de messages
-                self.handle_message_queue()
-                
-                # Mettre à jour l'herbe
-                self.update_grass()
-                
-                # Gérer les sécheresses
-                self.check_drought()
-
-                # Gérer les épidémies
-                if self.epidemy_dem : 
-                    self.trigger_epidemy()
-                    self.epidemy_dem = False
-                self.check_epidemy()
-                self.update_epidemy()
+                self.tick()
                 
                 # Attendre le prochain tick
-                time.sleep(self.config.SIMULATION_TICK)
+                self.wait_next_tick()
         
         except Exception as e:
             print(f" Erreur dans ENV: {e}")
             import traceback
             traceback.print_exc()
         finally:
-            # Nettoyage
-            if self.server_socket:
-                self.server_socket.close()
+            # Nettoyage (après l'arrêt de la boucle d'événements)
+            if self.shutdown_report is None: # sortie sur erreur : on n'abandonne aucun processus
+                self.shutdown()
+            if self.socket_thread:
+                self.socket_thread.join(timeout=1.0)
+            self.server.close()
+            self.shared_mem['counters'].close()
+            if self.recorder:
+                self.recorder.close()
+            if self.event_log:
+                self.event_log.close()
 
 
-def env_process(cmd_queue, data_queue, config):
+def env_process(cmd_queue, data_queue, config, status_block=None):
     """Point d'entrée du processus environnement"""
-    env = EnvironmentManager(cmd_queue, data_queue, config)
+    os.setpgrp() # ENV mène un groupe de processus : ses animaux et workers, arrêtés d'un seul signal
+    env = EnvironmentManager(cmd_queue, data_queue, config, status_block)
     env.run()
@@ -0,0 +1,395 @@
+"""
+Moteur À ÉVÉNEMENTS - Les individus passifs sautent les ticks où rien ne leur arrive
+
+Un individu passif (rassasié) ne fait que perdre de l'énergie et vieillir :
+son état à n'importe quel tick se calcule directement. On calcule donc le
+prochain tick où il se passe quelque chose pour lui, on le range dans un
+calendrier, et il « dort » jusque-là :
+    HUNGRY       l'énergie passe sous le seuil de faim (déterministe)
+    REPRODUCE    première reproduction réussie, tirée selon une loi géométrique
+                 parmi les ticks où l'énergie reste au-dessus du seuil
+    EPIDEMY      mort par épidémie, tirée de même sur les ticks de l'épidémie
+    OLD_AGE      âge limite (déterministe)
+
+Seuls les individus actifs (affamés) et ceux dont l'événement tombe ce tick
+passent dans le tick vectorisé habituel. Mêmes règles et même interface que
+VectorEngine ; les tirages aléatoires, eux, ne sont pas faits dans le même
+ordre : les résultats sont équivalents en loi, pas identiques tick à tick.
+
+Exemple :
+    python headless.py --engine event --preys 200000 --predators 20000 --grass 100000 \\
+        --set MAX_PREYS=400000 --set MAX_PREDATORS=40000 --set GRASS_MAX=200000
+"""
+
+import heapq
+import numpy as np
+from feeding import pick_winners
+from checkpoint import read_checkpoint, save_in_background
+from species import require_predator_prey
+from vector_engine import PREDATOR, PREY, VectorEngine, VectorEnvironment
+
+# Événements, dans l'ordre où ils sont traités au sein d'un tick (départage des égalités)
+HUNGRY, REPRODUCE, EPIDEMY, OLD_AGE = range(4)
+EVENT_NAMES = ('HUNGRY', 'REPRODUCE', 'EPIDEMY', 'OLD_AGE')
+
+NEVER = np.iinfo(np.int64).max
+
+# Tableaux indexés par emplacement (slot) ; un slot libéré est réutilisé par une naissance
+SLOT_FIELDS = {
+    'ids': np.int64, 'species': np.int8, 'energy': np.float64, 'age': np.int32, 'active': bool,
+    'alive': bool,
+    'awake_mask': bool,      # traité à chaque tick (actif, ou réveillé par son événement)
+    'ref_tick': np.int64,    # tick où energy et age sont à jour (individus endormis)
+    'version': np.int64,     # invalide les entrées périmées du calendrier
+    'event_tick': np.int64,
+    'event_kind': np.int8,
+    'epidemy_tick': np.int64,  # mort par épidémie tirée, même si un autre événement tombe au même tick
+}
+
+
+class EventEngine(VectorEngine):
+    """Simulation pilotée par les événements des individus passifs
+
+    Le calendrier est une file de priorité de ticks (heapq) ; chaque tick a
+    son seau d'entrées (slots, versions) ajoutées par paquets. Quand l'état
+    d'un individu change (repas, reproduction, mort, épidémie), sa version
+    augmente : ses anciennes entrées sont ignorées à leur sortie, sans avoir
+    à les retirer du tas.
+    """
+
+    def __init__(self, config, nb_predators=0, nb_preys=0, grass=0, seed=None):
+        require_predator_prey(config, 'event')
+        super().__init__(config, grass=grass, seed=seed)
+        self.epidemy_death_rate = config.EPIDEMY_DEATH_RATE
+        self.clear()
+        self.add_individuals(PREDATOR, nb_predators)
+        self.add_individuals(PREY, nb_preys)
+
+    def clear(self):
+        """Population vide, calendrier vide"""
+        for name, dtype in SLOT_FIELDS.items():
+            setattr(self, name, np.empty(0, dtype=dtype))
+        self.size = 0                                 # slots déjà utilisés (vivants ou libres)
+        self.free = np.empty(0, dtype=np.int64)       # slots libérés par les morts
+        self.population = [0, 0]
+        self.awake = np.empty(0, dtype=np.int64)      # slots des individus actifs
+        self.calendar = []                            # ticks ayant un seau (tas)
+        self.buckets = {}                             # tick -> [(slots, versions), ...]
+        self.epidemy_started = False
+        self.epidemy_sampled_until = 0                # morts par épidémie déjà tirées jusqu'à ce tick
+
+    # ------------------------------------------------------------------
+    # Population
+    # ------------------------------------------------------------------
+
+    def allocate(self, count):
+        """count slots : d'abord ceux des morts, puis de nouveaux (capacité doublée si besoin)"""
+        reused = min(count, len(self.free))
+        slots = self.free[len(self.free) - reused:]
+        self.free = self.free[:len(self.free) - reused]
+        extra = count - reused
+        if extra:
+            capacity = len(self.ids)
+            if self.size + extra > capacity:
+                capacity = max(2 * capacity, self.size + extra, 1024)
+                for name, dtype in SLOT_FIELDS.items():
+                    old = getattr(self, name)
+                    grown = np.zeros(capacity, dtype=dtype)
+                    grown[:len(old)] = old
+                    setattr(self, name, grown)
+            slots = np.concatenate((slots, np.arange(self.size, self.size + extra, dtype=np.int64)))
+            self.size += extra
+        return slots
+
+    def add_individuals(self, species, count):
+        """Ajoute count individus neufs (énergie initiale, âge 0, passifs) et planifie leur premier événement"""
+        if count <= 0:
+            return
+        slots = self.allocate(count)
+        self.ids[slots] = np.arange(self.next_id, self.next_id + count, dtype=np.int64)
+        self.next_id += count
+        self.species[slots] = species
+        self.energy[slots] = self.initial_energy[species]
+        self.age[slots] = 0
+        self.active[slots] = False
+        self.alive[slots] = True
+        self.awake_mask[slots] = False
+        self.ref_tick[slots] = self.tick_count
+        self.population[species] += count
+        self.schedule(slots)
+
+    def kill(self, slots):
+        """Morts : slots libérés, événements en attente invalidés"""
+        if not len(slots):
+            return
+        self.alive[slots] = False
+        self.awake_mask[slots] = False
+        self.version[slots] += 1
+        counts = np.bincount(self.species[slots], minlength=2)
+        self.population[PREDATOR] -= int(counts[PREDATOR])
+        self.population[PREY] -= int(counts[PREY])
+        self.total_deaths += len(slots)
+        self.free = np.concatenate((self.free, slots))
+
+    def count(self, species):
+        return self.population[species]
+
+    def populations(self):
+        return np.array(self.population)
+
+    def sample_alive(self, species, k):
+        """k individus vivants d'une espèce, tirés uniformément (sans parcourir tous les slots si possible)"""
+        n = self.population[species]
+        if k <= 0 or n == 0:
+            return np.empty(0, dtype=np.int64)
+        if k >= n or n < self.size // 4:
+            candidates = np.flatnonzero(self.alive[:self.size] & (self.species[:self.size] == species))
+            return self.rng.choice(candidates, size=min(k, len(candidates)), replace=False)
+        # Tirage avec rejet : les slots sont majoritairement de la bonne espèce
+        chosen = np.empty(0, dtype=np.int64)
+        while len(chosen) < k:
+            draw = self.rng.integers(0, self.size, 2 * (k - len(chosen)) + 16)
+            chosen = np.concatenate((chosen, draw[self.alive[draw] & (self.species[draw] == species)]))
+            _, first = np.unique(chosen, return_index=True)
+            chosen = chosen[np.sort(first)]  # doublons retirés, ordre du tirage conservé
+        return chosen[:k]
+
+    # ------------------------------------------------------------------
+    # Calendrier
+    # ------------------------------------------------------------------
+
+    def schedule(self, slots):
+        """Prochain événement d'individus passifs dont l'état est à jour au tick courant"""
+        if not len(slots):
+            return
+        t = self.tick_count
+        sp = self.species[slots]
+        energy = self.energy[slots]
+        decay = self.energy_decay[sp]
+        times = np.full((4, len(slots)), NEVER, dtype=np.int64)
+
+        # Faim : premier tick où l'énergie (après la perte du tick) passe sous le seuil
+        positive = decay > 0
+        safe_decay = np.where(positive, decay, 1.0)
+        ticks = np.floor((energy - self.hunger_threshold[sp]) / safe_decay) + 1
+        times[HUNGRY] = np.where(positive, t + np.maximum(ticks, 1).astype(np.int64), NEVER)
+
+        # Reproduction : premier succès d'une suite d'essais, s'il tombe pendant que l'énergie dépasse le seuil
+        probability = self.reproduction_probability[sp]
+        k = self.rng.geometric(np.where(probability > 0, probability, 1.0))
+        eligible = (probability > 0) & (energy - decay * k > self.reproduction_threshold[sp])
+        times[REPRODUCE] = np.where(eligible, t + k, NEVER)
+
+        # Epidémie en cours : mort tirée sur les ticks restants
+        if self.epidemy_active and self.epidemy_death_rate > 0:
+            death = t + self.rng.geometric(self.epidemy_death_rate, len(slots))
+            times[EPIDEMY] = np.where(death < self.epidemy_end_tick, death, NEVER)
+        self.epidemy_tick[slots] = times[EPIDEMY]
+
+        # Âge limite
+        times[OLD_AGE] = t + np.maximum(1, self.max_age[sp] - self.age[slots])
+
+        kinds = np.argmin(times, axis=0)   # à égalité, l'événement traité le plus tôt dans le tick
+        self.push(slots, times[kinds, np.arange(len(slots))], kinds)
+
+    def push(self, slots, ticks, kinds):
+        """Range les événements (par paquets d'un même tick) et invalide les précédents"""
+        if len(slots) == 0:
+            return
+        self.version[slots] += 1
+        self.event_tick[slots] = ticks
+        self.event_kind[slots] = kinds
+        order = np.argsort(ticks, kind='stable')
+        ordered = ticks[order]
+        starts = np.flatnonzero(ordered[1:] != ordered[:-1]) + 1   # début de chaque paquet d'un même tick
+        for tick, part in zip(ordered[np.r_[0, starts]].tolist(), np.split(order, starts)):
+            group = slots[part]
+            bucket = self.buckets.get(tick)
+            if bucket is None:
+                bucket = self.buckets[tick] = []
+                heapq.heappush(self.calendar, tick)
+            bucket.append((group, self.version[group]))
+
+    def pop_due(self, tick):
+        """Slots dont l'événement (encore valide) tombe à ce tick"""
+        due = []
+        while self.calendar and self.calendar[0] <= tick:
+            for slots, versions in self.buckets.pop(heapq.heappop(self.calendar)):
+                due.append(slots[(self.version[slots] == versions) & self.alive[slots]])
+        return np.concatenate(due) if due else np.empty(0, dtype=np.int64)
+
+    def trigger_epidemy(self):
+        super().trigger_epidemy()
+        self.epidemy_started = True
+
+    def schedule_epidemy(self):
+        """Début (ou prolongation) d'une épidémie : mort tirée pour chaque individu endormi"""
+        start = max(self.tick_count, self.epidemy_sampled_until)  # ticks pas encore tirés
+        end = self.epidemy_end_tick
+        self.epidemy_sampled_until = end
+        if self.epidemy_death_rate <= 0 or start >= end:
+            return
+        sleeping = np.flatnonzero(self.alive[:self.size] & ~self.awake_mask[:self.size])
+        death = start - 1 + self.rng.geometric(self.epidemy_death_rate, len(sleeping))
+        drawn = death < end
+        self.epidemy_tick[sleeping[drawn]] = np.minimum(self.epidemy_tick[sleeping[drawn]], death[drawn])
+        earlier = drawn & (death < self.event_tick[sleeping])
+        self.push(sleeping[earlier], death[earlier], np.full(np.count_nonzero(earlier), EPIDEMY))
+
+    # ------------------------------------------------------------------
+    # Tick
+    # ------------------------------------------------------------------
+
+    def step(self):
+        """Avance la simulation d'un tick (individus actifs et individus réveillés seulement)"""
+        self.tick_count += 1
+        t = self.tick_count
+        cfg = self.config
+
+        # Environnement
+        self.update_grass()
+        self.check_drought()
+        self.check_epidemy()
+        if self.epidemy_started:
+            self.schedule_epidemy()
+            self.epidemy_started = False
+
+        # Réveil : état ramené à la fin du tick précédent
+        due = self.pop_due(t)
+        late = t - 1 - self.ref_tick[due]
+        self.energy[due] -= self.energy_decay[self.species[due]] * late
+        self.age[due] += late.astype(np.int32)
+        self.awake_mask[due] = True
+        awake = np.concatenate((self.awake, due))
+        woken = np.zeros(len(awake), dtype=bool)
+        woken[len(self.awake):] = True
+        kind = np.where(woken, self.event_kind[awake], -1)
+
+        sp = self.species[awake]
+        n = len(awake)
+        alive = np.ones(n, dtype=bool)
+
+        # Diminution de l'énergie, puis état (hystérésis de 20 comme update_state)
+        energy = self.energy[awake] - self.energy_decay[sp]
+        hunger = self.hunger_threshold[sp]
+        active = np.where(energy < hunger, True, np.where(energy > hunger + 20, False, self.active[awake]))
+
+        # Chasse : les proies mangées sont tirées parmi toutes les proies, endormies ou non
+        hunters = np.flatnonzero(active & (sp == PREDATOR))
+        fed = pick_winners(self.rng, hunters, cfg.PREDATOR_FEED_PROBABILITY, self.population[PREY])
+        eaten = self.sample_alive(PREY, len(fed))
+        if len(fed):
+            energy[fed] += cfg.PREDATOR_ENERGY_GAIN
+            self.alive[eaten] = False # comptées mortes par kill() plus bas
+            alive &= self.alive[awake]
+
+        # Herbe
+        grazers = np.flatnonzero(active & (sp == PREY) & alive)
+        fed = pick_winners(self.rng, grazers, 1.0, self.grass)
+        if len(fed):
+            energy[fed] += cfg.PREY_ENERGY_GAIN
+            self.grass -= len(fed)
+
+        # Reproduction : tirage habituel, sauf pour les endormis réveillés dont le succès est déjà tiré
+        draw = ~woken | active
+        parents_count = [0, 0]
+        populations = [self.population[PREDATOR], self.population[PREY] - len(eaten)]
+        for species in (PREDATOR, PREY):
+            candidates = np.flatnonzero(alive & (sp == species) & (energy > self.reproduction_threshold[species]))
+            success = draw[candidates] & (self.rng.random(len(candidates)) < self.reproduction_probability[species])
+            parents = candidates[success | (kind[candidates] == REPRODUCE)]
+            if len(parents):
+                energy[parents] -= self.reproduction_cost[species]
+                parents_count[species] = len(parents)
+
+        # Mort de faim, épidémie puis vieillesse
+        alive &= energy > 0
+        if self.epidemy_active:
+            # Mort tirée d'avance : aussi quand un autre événement (reproduction) l'a réveillé au même tick
+            alive &= ~((draw & (self.rng.random(n) < cfg.EPIDEMY_DEATH_RATE)) | (woken & (self.epidemy_tick[awake] == t)))
+        age = self.age[awake] + 1
+        alive &= age < self.max_age[sp]
+
+        self.energy[awake] = energy
+        self.age[awake] = age
+        self.active[awake] = active
+        self.ref_tick[awake] = t
+        self.kill(np.concatenate((awake[~alive], eaten[~self.awake_mask[eaten]])))
+
+        # Les survivants passifs se rendorment jusqu'à leur prochain événement
+        survivors = awake[alive]
+        sleeping = survivors[~active[alive]]
+        self.awake = survivors[active[alive]]
+        self.awake_mask[sleeping] = False
+        self.schedule(sleeping)
+        self.reproduce(parents_count, populations)
+
+    # ------------------------------------------------------------------
+    # Checkpoint
+    # ------------------------------------------------------------------
+
+    def snapshot(self):
+        """Population vivante, état ramené au tick courant (format de checkpoint.py)"""
+        slots = np.flatnonzero(self.alive[:self.size])
+        late = self.tick_count - self.ref_tick[slots]
+        sp = self.species[slots]
+        return {'ids': self.ids[slots], 'species': sp,
+                'energy': self.energy[slots] - self.energy_decay[sp] * late,
+                'age': self.age[slots] + late.astype(np.int32), 'active': self.active[slots]}
+
+    def checkpoint(self, path):
+        """Copie l'état et l'écrit en arrière-plan ; renvoie le thread d'écriture"""
+        state = {
+            'engine': 'event',
+            'tick_count': self.tick_count,
+            'grass': int(self.grass),
+            'drought_active': bool(self.drought_active),
+            'drought_end_tick': self.drought_end_tick,
+            'epidemy_active': bool(self.epidemy_active),
+            'epidemy_end_tick': self.epidemy_end_tick,
+            'total_births': self.total_births,
+            'total_deaths': self.total_deaths,
+            'next_id': self.next_id,
+            'rng': self.rng.bit_generator.state,
+        }
+        return save_in_background(path, state, self.snapshot())
+
+    def restore(self, path):
+        """Reprend la simulation depuis un checkpoint (de n'importe quel moteur)
+
+        Les événements à venir ne sont pas sauvegardés : ils sont tirés à
+        nouveau (les tirages géométriques sont sans mémoire), la suite est
+        donc équivalente en loi mais pas identique à celle du run d'origine.
+        """
+        state, population = read_checkpoint(path)
+        self.tick_count = state['tick_count']
+        self.grass = state['grass']
+        self.drought_active = state['drought_active']
+        self.drought_end_tick = state['drought_end_tick']
+        self.epidemy_active = state['epidemy_active']
+        self.epidemy_end_tick = state['epidemy_end_tick']
+        if state.get('engine') == 'event':
+            self.rng.bit_generator.state = state['rng']
+
+        self.clear()
+        ids = population['ids']
+        slots = self.allocate(len(ids))
+        for name in ('ids', 'species', 'energy', 'age', 'active'):
+            getattr(self, name)[slots] = population[name]
+        self.alive[slots] = True
+        self.ref_tick[slots] = self.tick_count
+        counts = np.bincount(population['species'], minlength=2)
+        self.population = [int(counts[PREDATOR]), int(counts[PREY])]
+        self.awake = slots[population['active']]
+        self.awake_mask[self.awake] = True
+        self.epidemy_sampled_until = self.epidemy_end_tick if self.epidemy_active else 0
+        self.schedule(slots[~population['active']])
+        self.total_births = state['total_births']
+        self.total_deaths = state['total_deaths']
+        self.next_id = state.get('next_id', int(ids.max()) + 1 if len(ids) else 0)
+
+
+def event_env_process(cmd_queue, data_queue, config, status_block=None):
+    """Point d'entrée du processus environnement, moteur à événements"""
+    env = VectorEnvironment(cmd_queue, data_queue, config, status_block, engine=EventEngine)
+    env.run()
@@ -0,0 +1,257 @@
+"""
+JOURNAL d'événements - Tous les messages reçus par ENV, en binaire, pour rejouer un run
+
+Structure d'un journal (dossier) :
+    events.bin   enregistrements de 16 octets : tick d'ENV, type, entité, id (ajout seulement)
+    index.bin    tous les INDEX_INTERVAL ticks : tick, position dans events.bin, prédateurs, proies
+                 (populations telles qu'ENV les compte, voir population_deltas)
+
+Exemples :
+    python eventlog.py journal --counts --from 200 --to 260
+    python eventlog.py journal --lifetimes
+    python eventlog.py journal_a --compare journal_b --to 500
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+from collections import deque
+import numpy as np
+from protocol import ENTITIES, ENTITY_CODES, MESSAGE_TYPES, TYPE_CODES
+
+EVENT = np.dtype([('tick', '<u4'), ('type', 'u1'), ('entity', 'u1'), ('pad', 'u2'), ('id', '<i8')])
+INDEX = np.dtype([('tick', '<i8'), ('offset', '<i8'), ('predators', '<i8'), ('preys', '<i8')])
+
+JOIN, DEATH, FEED, FED = (TYPE_CODES[name] for name in ('JOIN', 'DEATH', 'FEED', 'FED'))
+PREDATOR, PREY = ENTITY_CODES['predator'], ENTITY_CODES['prey']
+
+
+def population_deltas(events):
+    """Effet de chaque événement sur les compteurs d'ENV : tableau (n, 2) prédateurs, proies
+
+    JOIN et DEATH comptent pour leur espèce ; un repas de prédateur (FEED ou FED) retire une proie.
+    """
+    types, entities = events['type'], events['entity']
+    sign = np.where(types == JOIN, 1, np.where(types == DEATH, -1, 0))
+    deltas = np.zeros((len(events), 2), dtype=np.int64)
+    deltas[:, PREDATOR] = sign * (entities == PREDATOR)
+    deltas[:, PREY] = sign * (entities == PREY) - ((entities == PREDATOR) & ((types == FEED) | (types == FED)))
+    return deltas
+
+
+def running_counts(deltas, start):
+    """Populations après chaque événement, jamais négatives (comme claim() côté ENV)"""
+    totals = np.asarray(start, dtype=np.int64) + np.cumsum(deltas, axis=0)
+    return totals - np.minimum(0, np.minimum.accumulate(totals, axis=0))
+
+
+class EventLog:
+    """Journal en ajout seul, écrit par un thread d'arrière-plan
+
+    append() ne fait qu'ajouter un tuple à une deque (sûr entre threads, sans
+    verrou) : le thread socket d'ENV n'attend jamais le disque. Le thread
+    d'écriture encode les événements en bloc avec NumPy, rend les ticks
+    croissants (un événement lu au tick t pendant que le tick t+1 démarre est
+    rangé au tick t+1) et complète l'index creux avec les populations
+    cumulées, ce qui permet de reconstituer les comptages à n'importe quel
+    tick sans relire le début du journal.
+    """
+
+    def __init__(self, directory, index_interval=16, flush_interval=0.2):
+        self.directory = directory
+        self.index_interval = index_interval
+        self.flush_interval = flush_interval
+        os.makedirs(directory, exist_ok=True)
+        self.events = open(os.path.join(directory, 'events.bin'), 'wb')
+        self.index = open(os.path.join(directory, 'index.bin'), 'wb')
+        self.pending = deque()
+        self.offset = 0           # nombre d'événements écrits
+        self.last_tick = 0
+        self.next_mark = 0        # prochain tick à indexer
+        self.counts = [0, 0]      # prédateurs, proies (JOIN - DEATH)
+        self.stopping = threading.Event()
+        self.writer = threading.Thread(target=self.run, name='eventlog', daemon=True)
+        self.writer.start()
+
+    def append(self, tick, msg_type, entity, animal_id):
+        """Ajoute un événement (appelé sur le chemin d'ingestion : aucun encodage ici)"""
+        self.pending.append((tick, TYPE_CODES[msg_type], ENTITY_CODES[entity], animal_id))
+
+    def run(self):
+        while not self.stopping.wait(self.flush_interval):
+            self.write_pending()
+        self.write_pending()
+
+    def write_pending(self):
+        """Encode et écrit tous les événements en attente"""
+        n = len(self.pending)
+        if not n:
+            return
+        batch = [self.pending.popleft() for _ in range(n)]
+        records = np.zeros(n, dtype=EVENT)
+        ticks, types, entities, ids = zip(*batch)
+        records['tick'] = np.maximum.accumulate(np.maximum(np.array(ticks, dtype=np.int64), self.last_tick))
+        records['type'] = types
+        records['entity'] = entities
+        records['id'] = ids
+        self.last_tick = int(records['tick'][-1])
+
+        # Populations cumulées, puis une entrée d'index au premier événement de chaque tick marqué
+        running = np.empty((n + 1, 2), dtype=np.int64)
+        running[0] = self.counts
+        running[1:] = running_counts(population_deltas(records), self.counts)
+        entries = []
+        while self.next_mark <= self.last_tick:
+            position = int(np.searchsorted(records['tick'], self.next_mark))
+            entries.append((self.next_mark, self.offset + position, running[position, PREDATOR], running[position, PREY]))
+            self.next_mark += self.index_interval
+        self.counts = running[n].tolist()
+
+        self.events.write(records.tobytes())
+        self.events.flush()
+        if entries:
+            self.index.write(np.array(entries, dtype=INDEX).tobytes())
+            self.index.flush()
+        self.offset += n
+
+    def close(self):
+        """Écrit les derniers événements et ferme les fichiers"""
+        self.stopping.set()
+        self.writer.join()
+        self.events.close()
+        self.index.close()
+
+
+# ----------------------------------------------------------------------
+# Lecture (outil de rejeu)
+# ----------------------------------------------------------------------
+
+def read_index(directory):
+    return np.fromfile(os.path.join(directory, 'index.bin'), dtype=INDEX)
+
+
+def read_events(directory, first_tick=0, last_tick=None):
+    """Événements des ticks [first_tick, last_tick], en sautant directement au bon endroit grâce à l'index
+
+    Renvoie aussi les populations (prédateurs, proies) juste avant le premier événement lu.
+    """
+    path = os.path.join(directory, 'events.bin')
+    index = read_index(directory)
+    entry = np.searchsorted(index['tick'], first_tick, side='right') - 1
+    offset, counts = 0, [0, 0]
+    if entry >= 0:
+        offset = int(index['offset'][entry])
+        counts = [int(index['predators'][entry]), int(index['preys'][entry])]
+    count = -1  # jusqu'à la fin du fichier
+    if last_tick is not None:
+        end = np.searchsorted(index['tick'], last_tick, side='right')
+        if end < len(index):
+            count = int(index['offset'][end]) - offset
+    events = np.fromfile(path, dtype=EVENT, count=count, offset=offset * EVENT.itemsize)
+    if last_tick is not None:
+        events = events[:np.searchsorted(events['tick'], last_tick, side='right')]
+
+    # Événements entre l'entrée d'index et first_tick : comptés, pas renvoyés
+    first = int(np.searchsorted(events['tick'], first_tick))
+    if first:
+        counts = running_counts(population_deltas(events[:first]), counts)[-1].tolist()
+    return events[first:], tuple(counts)
+
+
+def population_counts(events, counts):
+    """Populations à la fin de chaque tick (celles de GET_STATUS) : tableau (tick, prédateurs, proies)"""
+    if not len(events):
+        return np.empty((0, 3), dtype=np.int64)
+    ticks = np.arange(int(events['tick'][0]), int(events['tick'][-1]) + 1)
+    running = running_counts(population_deltas(events), counts)
+    last = np.searchsorted(events['tick'], ticks, side='right') - 1   # dernier événement de chaque tick
+    return np.column_stack((ticks, running[last]))
+
+
+def lifetimes(events):
+    """Durées de vie (en ticks d'ENV) des individus nés et morts dans l'intervalle, par entité"""
+    born = {}
+    durations = {name: [] for name in ENTITIES}
+    for tick, msg_type, entity, animal_id in zip(events['tick'].tolist(), events['type'].tolist(),
+                                                 events['entity'].tolist(), events['id'].tolist()):
+        if msg_type == JOIN:
+            born[(entity, animal_id)] = tick
+        elif msg_type == DEATH and (entity, animal_id) in born:
+            durations[ENTITIES[entity]].append(tick - born.pop((entity, animal_id)))
+    return {name: np.array(values) for name, values in durations.items()}
+
+
+def canonical(events):
+    """Événements triés dans chaque tick (type, entité, id) : l'ordre d'arrivée dans un tick ne compte pas"""
+    return np.sort(events, order=['tick', 'type', 'entity', 'id'])
+
+
+def compare_events(events_a, events_b):
+    """Premier tick où deux journaux diffèrent, et ses événements propres à chacun ; None si identiques"""
+    a, b = canonical(events_a), canonical(events_b)
+    common = min(len(a), len(b))
+    fields = ['tick', 'type', 'entity', 'id']
+    differ = np.zeros(common, dtype=bool)
+    for name in fields:
+        differ |= a[name][:common] != b[name][:common]
+    if not differ.any() and len(a) == len(b):
+        return None
+    position = int(np.argmax(differ)) if differ.any() else common
+    tick = min(int(events['tick'][position]) for events in (a, b) if position < len(events))
+    at_a = set(zip(*(a[name][a['tick'] == tick].tolist() for name in fields[1:])))
+    at_b = set(zip(*(b[name][b['tick'] == tick].tolist() for name in fields[1:])))
+    return {'tick': tick, 'only_a': sorted(at_a - at_b), 'only_b': sorted(at_b - at_a), 'events': (len(a), len(b))}
+
+
+def print_difference(difference, lines=10):
+    """Rapport de compare_events"""
+    if difference is None:
+        print("Journaux identiques")
+        return
+    names = np.array(MESSAGE_TYPES)
+    print(f"Premier écart au tick {difference['tick']} ({difference['events'][0]} / {difference['events'][1]} événements)")
+    for side in ('only_a', 'only_b'):
+        events = difference[side]
+        print(f" {side} : {len(events)} événements")
+        for msg_type, entity, animal_id in events[:lines]:
+            print(f"   {names[msg_type]:10s} {ENTITIES[entity]:9s} {animal_id}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rejeu d'un journal d'événements d'ENV")
+    parser.add_argument('directory')
+    parser.add_argument('--from', dest='first', type=int, default=0, help="Premier tick")
+    parser.add_argument('--to', dest='last', type=int, help="Dernier tick")
+    parser.add_argument('--counts', action='store_true', help="Populations par tick (CSV)")
+    parser.add_argument('--lifetimes', action='store_true', help="Durées de vie par entité")
+    parser.add_argument('--compare', metavar='AUTRE', help="Compare au journal AUTRE (code de sortie 1 si différents)")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    events, counts = read_events(args.directory, args.first, args.last)
+    print(f"{len(events)} événements lus en {(time.perf_counter() - start) * 1e3:.1f} ms", file=sys.stderr)
+    if args.compare:
+        other, _ = read_events(args.compare, args.first, args.last)
+        difference = compare_events(events, other)
+        print_difference(difference)
+        return 0 if difference is None else 1
+    if args.counts:
+        print("tick,predators,preys")
+        for tick, predators, preys in population_counts(events, counts):
+            print(f"{tick},{predators},{preys}")
+    elif args.lifetimes:
+        for name, values in lifetimes(events).items():
+            if len(values):
+                print(f"{name:9s} {len(values):6d} morts  durée de vie moyenne {values.mean():7.1f}  "
+                      f"médiane {np.median(values):6.1f}  max {values.max()}")
+    else:
+        names = np.array(MESSAGE_TYPES)
+        for t in np.unique(events['type']):
+            print(f"{names[t]:10s} {np.count_nonzero(events['type'] == t)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
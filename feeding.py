@@ -0,0 +1,41 @@
+"""
+Alimentation - Résolution en une passe des repas d'un tick
+"""
+
+import numpy as np
+
+
+def pick_winners(rng, candidates, probability, available):
+    """Candidats qui réussissent (probabilité), au plus `available`, dans un ordre tiré au sort"""
+    candidates = np.asarray(candidates)
+    if len(candidates) == 0 or available <= 0:
+        return candidates[:0]
+    candidates = rng.permutation(candidates)
+    if probability < 1.0:
+        candidates = candidates[rng.random(len(candidates)) < probability]
+    return candidates[:available]
+
+
+def keyed_winners(streams, tick, candidates, probability, available):
+    """Comme pick_winners, mais l'ordre et la réussite de chaque candidat sont tirés par son id (streams.py)"""
+    candidates = np.asarray(candidates, dtype=np.int64)
+    if len(candidates) == 0 or available <= 0:
+        return candidates[:0]
+    candidates = streams.permutation(candidates, tick, 'feed_order')
+    if probability < 1.0:
+        candidates = candidates[streams.uniform(candidates, tick, 'feed') < probability]
+    return candidates[:available]
+
+
+def resolve_feeding(streams, tick, hunters, grazers, preys_available, grass_available, config):
+    """Tranche tous les repas d'un tick : d'abord la chasse, puis l'herbe
+
+    hunters / grazers : ids des prédateurs et proies affamés du tick.
+    Chaque tirage est clé par (graine, id, tick) : à graine et demandes
+    égales, le résultat ne dépend ni de l'ordre d'arrivée des messages, ni
+    du processus ou du worker qui héberge chaque animal.
+    Renvoie (prédateurs nourris, proies nourries), tableaux d'ids.
+    """
+    fed_hunters = keyed_winners(streams, tick, hunters, config.PREDATOR_FEED_PROBABILITY, preys_available)
+    fed_grazers = keyed_winners(streams, tick, grazers, 1.0, grass_available)
+    return fed_hunters, fed_grazers
@@ -0,0 +1,143 @@
+"""
+Mode BATCH - Simulation sans affichage ni attente, pour les runs de régression
+
+Exemple :
+    python headless.py --predators 5 --preys 15 --grass 100 --seed 42 --ticks 800 --output stats.json
+"""
+
+import argparse
+import json
+import sys
+import time
+from config import Config
+from vector_engine import VectorEngine
+from coordinator import Coordinator
+from event_engine import EventEngine
+from aggregate_engine import AggregateEngine
+from spatial_engine import SpatialEngine
+from recorder import TimeSeriesRecorder
+
+# Moteurs utilisables en mode batch : même constructeur (config, prédateurs, proies, herbe, graine)
+ENGINES = {
+    'vector': VectorEngine,
+    'distributed': Coordinator,
+    'event': EventEngine,
+    'aggregate': AggregateEngine,
+    'spatial': SpatialEngine,
+}
+
+
+def extinct(status):
+    """Toutes les espèces éteintes (toutes celles du réseau trophique, si le moteur les détaille)"""
+    if 'populations' in status:
+        return not any(status['populations'].values())
+    return status['predators'] == 0 and status['preys'] == 0
+
+
+def run_headless(config, engine='vector', ticks=None, seed=None, checkpoint=None):
+    """Enchaîne les ticks sans sleep et renvoie les statistiques finales
+
+    Avec Config.RESUME, la simulation reprend au tick du checkpoint et va
+    jusqu'au tick `ticks` ; `checkpoint` : fichier où sauvegarder l'état final.
+    """
+    ticks = config.TICKS if ticks is None else ticks
+    seed = config.SEED if seed is None else seed
+    sim = ENGINES[engine](config, config.INITIAL_PREDATORS, config.INITIAL_PREYS, config.INITIAL_GRASS, seed=seed)
+    if config.RESUME:
+        sim.restore(config.RESUME)
+    recorder = TimeSeriesRecorder(config.RECORD_DIR, config.RECORD_CAPACITY) if config.RECORD_DIR else None
+
+    peak_predators = peak_preys = 0
+    predators_extinct_tick = preys_extinct_tick = None
+    grass_sum = steps = 0
+    start = time.perf_counter()
+    status = sim.status()
+    start_tick = status['tick']
+    while status['tick'] < ticks:
+        remaining = ticks - status['tick']
+        if getattr(sim, 'leap', 1) > remaining: # moteur agrégé : dernier saut raccourci, arrêt pile au tick `ticks`
+            sim.step(remaining)
+        else:
+            sim.step()
+        steps += 1
+        status = sim.status()
+        if recorder:
+            recorder.append(status)
+        grass_sum += status['grass']
+        peak_predators = max(peak_predators, status['predators'])
+        peak_preys = max(peak_preys, status['preys'])
+        if status['predators'] == 0 and predators_extinct_tick is None:
+            predators_extinct_tick = status['tick']
+        if status['preys'] == 0 and preys_extinct_tick is None:
+            preys_extinct_tick = status['tick']
+        if extinct(status): # même arrêt que l'affichage
+            break
+    elapsed = time.perf_counter() - start
+    if hasattr(sim, 'close'): # nœuds du moteur réparti, threads du moteur spatial
+        sim.close()
+    if recorder:
+        recorder.close()
+    if checkpoint:
+        sim.checkpoint(checkpoint).join()
+
+    status.update({
+        'engine': engine,
+        'seed': seed,
+        'peak_predators': peak_predators,
+        'peak_preys': peak_preys,
+        'predators_extinct_tick': predators_extinct_tick,
+        'preys_extinct_tick': preys_extinct_tick,
+        'extinction_tick': status['tick'] if extinct(status) else None,
+        'mean_grass': grass_sum / steps if steps else float(status['grass']),
+        'elapsed': elapsed,
+        'ticks_per_second': (status['tick'] - start_tick) / elapsed if elapsed > 0 else None,
+    })
+    return status
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Simulation sans interface (ticks enchaînés sans attente)")
+    parser.add_argument('--config', help="Fichier JSON de paramètres Config ({\"NOM\": valeur})")
+    parser.add_argument('--predators', type=int, help="Nombre initial de prédateurs")
+    parser.add_argument('--preys', type=int, help="Nombre initial de proies")
+    parser.add_argument('--grass', type=int, help="Quantité initiale d'herbe")
+    parser.add_argument('--seed', type=int, help="Graine aléatoire")
+    parser.add_argument('--ticks', type=int, help="Nombre de ticks")
+    parser.add_argument('--engine', choices=sorted(ENGINES), default='vector')
+    parser.add_argument('--set', action='append', default=[], metavar='NOM=VALEUR',
+                        help="Surcharge d'un paramètre Config (valeur JSON), répétable")
+    parser.add_argument('--record', help="Dossier où enregistrer la série temporelle par tick (recorder.py)")
+    parser.add_argument('--resume', help="Checkpoint à reprendre (le run continue jusqu'au tick --ticks)")
+    parser.add_argument('--checkpoint', help="Fichier où sauvegarder l'état final (checkpoint.py)")
+    parser.add_argument('--output', help="Fichier JSON des statistiques finales (stdout par défaut)")
+    return parser.parse_args(argv)
+
+
+def build_config(args):
+    """Config du fichier, puis des options de la ligne de commande"""
+    overrides = {}
+    for item in args.set:
+        name, _, value = item.partition('=')
+        overrides[name] = json.loads(value)
+    for name, value in (('INITIAL_PREDATORS', args.predators), ('INITIAL_PREYS', args.preys),
+                        ('INITIAL_GRASS', args.grass), ('SEED', args.seed), ('TICKS', args.ticks),
+                        ('RECORD_DIR', args.record), ('RESUME', args.resume)):
+        if value is not None:
+            overrides[name] = value
+    return Config(args.config, **overrides)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    config = build_config(args)
+    stats = run_headless(config, engine=args.engine, checkpoint=args.checkpoint)
+    text = json.dumps(stats, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
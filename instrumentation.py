@@ -0,0 +1,142 @@
+"""
+INSTRUMENTATION - Mesures facultatives du chemin critique (durées par étape, attentes de verrous)
+
+Désactivée par défaut (Config.INSTRUMENTATION = False) : ENV et les animaux
+ne font alors qu'un test `is None` par tick. Activée, tout est écrit dans des
+tampons alloués une fois pour toutes, et la commande GET_STATS de cmd_queue
+renvoie un résumé sur data_queue.
+"""
+
+import time
+import multiprocessing as mp
+import numpy as np
+import protocol
+
+# Étapes du tick d'ENV ; 'ingestion' = temps passé par le thread socket à décoder et traiter les messages
+STAGES = ('message_queue', 'feeding', 'grass', 'drought', 'epidemy', 'ingestion')
+
+# Histogrammes en puissances de 2 de microsecondes : [0,1), [1,2), [2,4), [4,8)...
+BUCKETS = 32
+
+
+def bucket(seconds):
+    """Case d'histogramme d'une durée"""
+    return min(int(seconds * 1e6).bit_length(), BUCKETS - 1)
+
+
+def bucket_label(i):
+    return f"<{1 << i}us" if i < BUCKETS - 1 else f">={1 << (i - 1)}us"
+
+
+class SharedHistograms:
+    """Histogrammes en mémoire partagée, une ligne par nom, incrémentés sans verrou
+
+    Deux processus qui incrémentent la même case au même instant peuvent perdre
+    un comptage : c'est accepté, ce sont des statistiques.
+    """
+
+    def __init__(self, names):
+        self.names = tuple(names)
+        self.counts = mp.Array('q', len(self.names) * BUCKETS, lock=False)
+
+    def record(self, row, seconds):
+        self.counts[row * BUCKETS + bucket(seconds)] += 1
+
+    def report(self):
+        out = {}
+        for row, name in enumerate(self.names):
+            counts = self.counts[row * BUCKETS:(row + 1) * BUCKETS]
+            total = sum(counts)
+            if total:
+                out[name] = {'count': total,
+                             'buckets': {bucket_label(i): c for i, c in enumerate(counts) if c}}
+        return out
+
+
+class TimedLock:
+    """Verrou qui enregistre son temps d'attente d'acquisition dans un histogramme partagé"""
+
+    def __init__(self, lock, histograms, row):
+        self.lock = lock
+        self.histograms = histograms
+        self.row = row
+
+    def acquire(self, block=True, timeout=None):
+        start = time.perf_counter()
+        acquired = self.lock.acquire(block, timeout)
+        self.histograms.record(self.row, time.perf_counter() - start)
+        return acquired
+
+    def release(self):
+        self.lock.release()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+class Instrumentation:
+    """Mesures d'ENV : durées par étape (tampon circulaire), messages par type, verrous, dépassements"""
+
+    def __init__(self, lock_names, capacity=4096):
+        self.capacity = capacity
+        self.durations = np.zeros((capacity, len(STAGES)))
+        self.ticks = 0
+        self.row = 0
+        self.mark = 0.0
+        self.ingestion = 0.0
+        self.messages = np.zeros(len(protocol.MESSAGE_TYPES) + 1, dtype=np.int64)  # dernière case : inconnu
+        self.locks = SharedHistograms(lock_names)
+        self.overruns = SharedHistograms(('predator', 'prey', 'worker'))  # écrit par les animaux
+
+    def begin_tick(self):
+        self.row = self.ticks % self.capacity
+        self.durations[self.row] = 0.0
+        self.mark = time.perf_counter()
+
+    def lap(self, stage):
+        """Durée écoulée depuis la mesure précédente, attribuée à l'étape"""
+        now = time.perf_counter()
+        self.durations[self.row, stage] += now - self.mark
+        self.mark = now
+
+    def end_tick(self):
+        self.durations[self.row, STAGES.index('ingestion')] = self.ingestion
+        self.ingestion = 0.0
+        self.ticks += 1
+
+    def add_ingestion(self, seconds):
+        self.ingestion += seconds
+
+    def count_message(self, msg_type):
+        self.messages[protocol.TYPE_CODES.get(msg_type, len(protocol.MESSAGE_TYPES))] += 1
+
+    def wrap_lock(self, lock, name):
+        """Remplace un verrou par sa version mesurée"""
+        return TimedLock(lock, self.locks, self.locks.names.index(name))
+
+    def report(self):
+        """Résumé pour la commande GET_STATS"""
+        filled = self.durations[:min(self.ticks, self.capacity)]
+        stages = {}
+        for i, name in enumerate(STAGES):
+            column = filled[:, i] * 1e6
+            if len(column):
+                stages[name] = {
+                    'mean_us': round(float(column.mean()), 2),
+                    'p50_us': round(float(np.percentile(column, 50)), 2),
+                    'p99_us': round(float(np.percentile(column, 99)), 2),
+                    'max_us': round(float(column.max()), 2)
+                }
+        names = protocol.MESSAGE_TYPES + ('UNKNOWN',)
+        return {
+            'ticks': self.ticks,
+            'window': len(filled),
+            'stages': stages,
+            'messages': {name: int(c) for name, c in zip(names, self.messages) if c},
+            'lock_wait': self.locks.report(),
+            'tick_overrun': self.overruns.report()
+        }
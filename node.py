@@ -0,0 +1,168 @@
+"""
+NŒUD - Héberge une partie de la population pour un coordinateur (coordinator.py)
+
+Exemple (sur chaque machine, ou plusieurs fois sur la même) :
+    python node.py --host 192.168.1.10 --port 9998
+
+Les paramètres (Config) et la graine viennent du coordinateur.
+
+À chaque tick, le nœud reçoit du coordinateur un ordre TICK (herbe et proies
+qu'il peut consommer, proies mangées ailleurs qu'il doit retirer, naissances
+qui lui sont confiées, sécheresse / épidémie) et répond par un seul message
+DELTA agrégé : populations, consommations, demandes de naissance, morts.
+"""
+
+import argparse
+import socket
+import sys
+from collections import deque
+import numpy as np
+import protocol
+from config import Config
+from feeding import pick_winners
+from vector_engine import PREDATOR, PREY, VectorEngine
+
+
+class PartitionEngine(VectorEngine):
+    """Moteur vectorisé d'une partition : l'environnement est décidé par le coordinateur
+
+    L'herbe et les proies sont des ressources globales : le nœud ne consomme
+    que les quantités allouées pour ce tick. Une proie mangée par un prédateur
+    du nœud n'est pas retirée ici : le coordinateur répartit les proies
+    mangées entre les nœuds, qui les retirent au tick suivant. Les naissances
+    ne sont pas ajoutées directement : elles sont demandées au coordinateur,
+    qui applique MAX_PREDATORS / MAX_PREYS globalement et les confie au nœud
+    de son choix.
+    """
+
+    def __init__(self, config, seed=None):
+        super().__init__(config, seed=seed)
+        self.prey_budget = 0
+        self.reset_tick()
+
+    def reset_tick(self):
+        self.grass_eaten = 0
+        self.preys_eaten = 0
+        self.requested_births = [0, 0]
+
+    # L'environnement (herbe, sécheresse, épidémie) appartient au coordinateur
+    def update_grass(self):
+        pass
+
+    def check_drought(self):
+        pass
+
+    def check_epidemy(self):
+        pass
+
+    def hunt(self, hunters, preys, alive, probability, gain):
+        fed = pick_winners(self.rng, hunters, probability, self.prey_budget)
+        if len(fed):
+            self.energy[fed] += gain
+        self.preys_eaten = len(fed)
+        return fed
+
+    def graze(self, grazers, probability, gain):
+        budget = self.grass
+        fed = super().graze(grazers, probability, gain)
+        self.grass_eaten = budget - self.grass
+        return fed
+
+    def reproduce(self, parents_count, populations):
+        self.requested_births = [int(count) for count in parents_count]
+
+    def remove_preys(self, count):
+        """Retire count proies au hasard (mangées au tick précédent par des prédateurs d'un nœud quelconque)"""
+        preys = np.flatnonzero(self.species == PREY)
+        count = min(count, len(preys))
+        if count:
+            alive = np.ones(len(self.ids), dtype=bool)
+            alive[self.rng.choice(preys, size=count, replace=False)] = False
+            self.keep(alive)  # déjà comptées comme morts par le coordinateur
+
+    def apply(self, order):
+        """Exécute un ordre TICK et renvoie le DELTA du tick"""
+        self.reset_tick()
+        deaths = self.total_deaths
+        self.remove_preys(order['kills'])
+        self.add_individuals(PREDATOR, order['births'][PREDATOR])
+        self.add_individuals(PREY, order['births'][PREY])
+        self.grass = order['grass']
+        self.prey_budget = order['preys']
+        self.drought_active = order['drought']
+        self.epidemy_active = order['epidemy']
+        self.tick_count = order['tick'] - 1
+        self.step()
+        active = self.active
+        return {
+            'type': 'DELTA',
+            'tick': self.tick_count,
+            'predators': self.count(PREDATOR),
+            'preys': self.count(PREY),
+            'grass_eaten': int(self.grass_eaten),
+            'preys_eaten': int(self.preys_eaten),
+            'births': self.requested_births,
+            'deaths': self.total_deaths - deaths,
+            'hungry_predators': int(np.count_nonzero(active & (self.species == PREDATOR))),
+            'hungry_preys': int(np.count_nonzero(active & (self.species == PREY)))
+        }
+
+
+class Node:
+    """Connexion au coordinateur et boucle TICK -> DELTA"""
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.config = None        # celle du coordinateur, reçue à l'accueil
+        self.engine = None
+        self.socket = None
+        self.buffer = bytearray()
+        self.messages = deque()   # messages décodés pas encore traités
+
+    def receive(self):
+        """Prochain message du coordinateur (bloquant), None si la connexion est fermée"""
+        while not self.messages:
+            data = self.socket.recv(65536)
+            if not data:
+                return None
+            self.buffer += data
+            self.messages.extend(protocol.decode_json(self.buffer))
+        return self.messages.popleft()
+
+    def send(self, msg):
+        self.socket.sendall(protocol.encode_json([msg]))
+
+    def run(self):
+        self.socket = socket.create_connection((self.host, self.port))
+        self.socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.send({'type': 'HELLO'})
+        try:
+            while True:
+                msg = self.receive()
+                if msg is None or msg['type'] == 'SHUTDOWN':
+                    break
+                if msg['type'] == 'WELCOME': # paramètres et graine du coordinateur
+                    self.config = Config(**msg['config'])
+                    self.engine = PartitionEngine(self.config, seed=msg.get('seed'))
+                elif msg['type'] == 'TICK':
+                    self.send(self.engine.apply(msg))
+        finally:
+            self.socket.close()
+
+
+def node_process(host, port):
+    """Point d'entrée d'un processus nœud"""
+    Node(host, port).run()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Nœud de calcul d'une simulation distribuée")
+    parser.add_argument('--host', default=Config.COORDINATOR_HOST)
+    parser.add_argument('--port', type=int, default=Config.COORDINATOR_PORT)
+    args = parser.parse_args(argv)
+    node_process(args.host, args.port)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
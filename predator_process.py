@@ -4,8 +4,9 @@ Processus PREDATOR - Simulation d'un prédateur individuel
 
 import socket
 import time
-import json
-import random
+import protocol
+import transport
+from streams import Streams
 
 class Predator:
     """Représente un prédateur dans l'écosystème"""
@@ -20,41 +21,68 @@ class Predator:
         self.state = 'passive'  # 'active' ou 'passive'
         self.alive = True
         self.age = 0
+        self.streams = Streams(config.SEED) # tirages clés par (id, âge) : mêmes valeurs dans tout hôte
+        self.shard = shared_memory['counters'].shard_for(predator_id) # ligne des compteurs partagés
         
-        # Socket pour communiquer avec env
+        # Socket pour communiquer avec env, et messages du tick en attente d'envoi
         self.socket = None
+        self.outbox = []
+        self.inbox = bytearray()   # réponses d'ENV pas encore décodées
         
     def connect_to_env(self):
         """Se connecte au processus environnement"""
-        max_retries = 5
+        max_retries = 8 # attente doublée à chaque essai : 10 ms, 20 ms... (ENV écoute avant les naissances)
         for attempt in range(max_retries):
             try:
-                self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-                self.socket.connect((self.config.SOCKET_HOST, self.config.SOCKET_PORT))
+                self.socket = transport.connect(self.config, self.shared_mem, self.id)
                 # Envoyer message JOIN
                 self.send_message({
                     'type': 'JOIN',
                     'entity': 'predator',
                     'id': self.id
                 })
+                self.flush_messages()
                 return True
             except Exception as e:
                 if attempt < max_retries - 1:
-                    time.sleep(0.5)
+                    time.sleep(0.01 * 2 ** attempt)
                 else:
                     print(f" Prédateur {self.id}: Impossible de se connecter")
                     return False
         return False
     
     def send_message(self, msg):
-        """Envoie un message au processus env"""
-        if self.socket:
+        """Met un message en attente : il partira avec les autres à la fin du tick"""
+        msg['tick'] = self.age
+        self.outbox.append(msg)
+
+    def flush_messages(self):
+        """Envoie en une seule écriture tous les messages en attente"""
+        if self.socket and self.outbox:
             try:
-                data = json.dumps(msg) + '\n' # on utilise cette fonction car msg est un dico, elle transforme en string
-                self.socket.sendall(data.encode('utf-8'))
+                self.socket.sendall(protocol.encode(self.outbox, self.config.PROTOCOL))
             except Exception as e:
                 print(f" Prédateur {self.id}: Erreur envoi message: {e}")
+        self.outbox.clear()
     
+    def receive_messages(self):
+        """Lit sans bloquer les réponses d'ENV (FED en alimentation groupée)"""
+        while True:
+            try:
+                data = self.socket.recv(65536, socket.MSG_DONTWAIT)
+            except (BlockingIOError, InterruptedError, OSError):
+                break
+            if not data:
+                break
+            self.inbox += data
+        for msg in protocol.decode(self.inbox, self.config.PROTOCOL):
+            if msg.get('type') == 'FED':
+                self.eat()
+
+    def eat(self):
+        """Gain d'énergie d'un repas"""
+        self.energy += self.config.PREDATOR_ENERGY_GAIN
+
     def update_state(self):
         """Met à jour l'état (actif/passif) selon l'énergie"""
         if self.energy < self.config.PREDATOR_HUNGER_THRESHOLD:
@@ -67,13 +95,23 @@ class Predator:
     def try_to_feed(self):
         if self.state != 'active':
             return False
+        
+        if self.config.FEEDING == 'batched':
+            # ENV tranche tous les affamés du tick en une passe et répond FED
+            self.send_message({
+                'type': 'HUNGRY',
+                'entity': 'predator',
+                'id': self.id
+            })
+            return False
+
         fed = False
 
-        with self.shared_mem['count_lock']:
-            if self.shared_mem['prey_count'].value > 0 and random.random() < 0.7:
-                self.shared_mem['prey_count'].value -= 1
-                self.energy += self.config.PREDATOR_ENERGY_GAIN
-                fed = True
+        # claim() ne prend la proie que s'il en reste, sans verrou global
+        if self.streams.random(self.id, self.age, 'feed') < self.config.PREDATOR_FEED_PROBABILITY and \
+           self.shared_mem['counters'].claim(self.shard, 'prey'):
+            self.eat()
+            fed = True
         if fed:
             self.send_message({
                 'type': 'FEED',
@@ -88,7 +126,7 @@ class Predator:
         """Tentative de se reproduire si énergie suffisante"""
         if self.energy > self.config.PREDATOR_REPRODUCTION_THRESHOLD:
             # Probabilité de reproduction
-            if random.random() < 0.3: 
+            if self.streams.random(self.id, self.age, 'reproduce') < self.config.PREDATOR_REPRODUCTION_PROBABILITY:
                 self.energy -= self.config.PREDATOR_REPRODUCTION_COST
                 
                 self.send_message({
@@ -99,51 +137,99 @@ class Predator:
                 return True
         return False
     
+    def restore(self, energy, age, active):
+        """Reprend l'état sauvegardé dans un checkpoint"""
+        self.energy = energy
+        self.age = age
+        self.state = 'active' if active else 'passive'
+
+    def send_state(self):
+        """Envoie son état à ENV pour un checkpoint"""
+        self.send_message({
+            'type': 'STATE',
+            'entity': 'predator',
+            'id': self.id,
+            'energy': self.energy,
+            'active': self.state == 'active'
+        })
+
+    def is_alive(self):
+        """Vrai tant que l'individu n'est mort ni de faim, ni d'épidémie, ni de vieillesse"""
+        return self.alive and self.energy > 0 and self.age < self.config.AGE_PREDATORS
+
+    def step(self):
+        """Un tick de vie du prédateur"""
+        # Diminution de l'énergie
+        self.energy -= self.config.PREDATOR_ENERGY_DECAY
+        
+        # Mise à jour de l'état
+        self.update_state()
+        
+        # Tentative de se nourrir
+        self.try_to_feed()
+        
+        # Tentative de reproduction
+        self.try_to_reproduce()
+        
+        # Vérifier la mort
+        if self.energy <= 0:
+            self.alive = False
+            return
+
+        if self.shared_mem['epidemy_active'].value: # Lecture directe car ce n'est pas dangereux (c'est un entier, et en cas de 
+            if self.streams.random(self.id, self.age, 'epidemy_death') < self.config.EPIDEMY_DEATH_RATE: # mauvaise lecture il relit au tick d'après)
+                self.alive = False # Evite des blocages
+                return
+
+        self.age += 1
+
+    def die(self):
+        """Prévient l'environnement de la mort du prédateur"""
+        self.send_message({
+            'type': 'DEATH',
+            'entity': 'predator',
+            'id': self.id
+        })
+
     def live(self):
         """Boucle de vie du prédateur"""
         if not self.connect_to_env():
             return
         
-        while self.alive and self.energy > 0 and not self.shared_mem['shutdown'].value and self.age < self.config.AGE_PREDATORS :
-            # Diminution de l'énergie
-            self.energy -= self.config.PREDATOR_ENERGY_DECAY
-            
-            # Mise à jour de l'état
-            self.update_state()
-            
-            # Tentative de se nourrir
-            self.try_to_feed()
-            
-            # Tentative de reproduction
-            self.try_to_reproduce()
-            
-            # Vérifier la mort
-            if self.energy <= 0:
-                self.alive = False
-                break
-
-            if self.shared_mem['epidemy_active'].value: # Lecture directe car ce n'est pas dangereux (c'est un entier, et en cas de 
-                if random.random() < self.config.EPIDEMY_DEATH_RATE: # mauvaise lecture il relit au tick d'après)
-                    self.alive = False                               # Evite des blocages
-                    break
-
-            self.age += 1
+        overruns = self.shared_mem.get('overruns') # instrumentation : None si désactivée
+        checkpoint = self.shared_mem['checkpoint']
+        checkpoint_seen = checkpoint.value # un checkpoint demandé avant notre naissance ne nous concerne pas
+        last = time.monotonic()
+        while self.is_alive() and not self.shared_mem['shutdown'].value:
+            if overruns is not None:
+                now = time.monotonic()
+                overruns.record(0, max(0.0, now - last - self.config.SIMULATION_TICK)) # retard sur le tick
+                last = now
+            if self.config.FEEDING == 'batched':
+                self.receive_messages()
+            if checkpoint.value != checkpoint_seen: # checkpoint demandé par ENV
+                checkpoint_seen = checkpoint.value
+                self.send_state()
+            self.step()
+            self.flush_messages()
             
             # Attendre le prochain cycle
             time.sleep(self.config.SIMULATION_TICK)
         
         # Mort du prédateur
-        self.send_message({
-            'type': 'DEATH',
-            'entity': 'predator',
-            'id': self.id
-        })
+        self.die()
+        self.flush_messages()
         
         # Fermer la socket
         if self.socket:
             self.socket.close()
+        counters = self.shared_mem['counters']
+        if not counters.owner: # copie reçue en 'spawn' / 'forkserver' : libérée avant la fin de l'interpréteur
+            counters.close()
 
-def predator_process(predator_id, shared_memory, config):
+def predator_process(predator_id, shared_memory, config, state=None):
 
     predator = Predator(predator_id, shared_memory, config)
+    if state: # reprise d'un checkpoint : (énergie, âge, actif)
+        predator.restore(*state)
     predator.live()
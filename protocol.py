@@ -0,0 +1,76 @@
+"""
+Protocole - Encodage des messages entre animaux et ENV (JSON lisible ou binaire compact)
+"""
+
+import json
+import struct
+
+MESSAGE_TYPES = ('JOIN', 'FEED', 'REPRODUCE', 'DEATH', 'HUNGRY', 'FED',  # HUNGRY/FED : alimentation groupée
+                 'STATE')                                                   # STATE : état d'un animal (checkpoint)
+ENTITIES = ('predator', 'prey')
+
+TYPE_CODES = {name: code for code, name in enumerate(MESSAGE_TYPES)}
+ENTITY_CODES = {name: code for code, name in enumerate(ENTITIES)}
+
+# Un enregistrement de taille fixe : type, entité, actif, (bourrage), tick, id, énergie -> 24 octets
+# (actif et énergie ne servent qu'aux messages STATE ; énergie en double : checkpoint exact)
+RECORD = struct.Struct('<BBBxIqd')
+
+
+def encode(messages, protocol):
+    """Encode tous les messages d'un tick en un seul bloc d'octets"""
+    if protocol == 'binary':
+        return encode_binary(messages)
+    return encode_json(messages)
+
+
+def encode_json(messages):
+    """Une ligne JSON par message (pratique pour déboguer)"""
+    return ''.join(json.dumps(msg) + '\n' for msg in messages).encode('utf-8')
+
+
+def encode_binary(messages):
+    """Enregistrements RECORD concaténés"""
+    return b''.join(
+        RECORD.pack(TYPE_CODES[msg['type']], ENTITY_CODES[msg['entity']], msg.get('active', False),
+                    msg.get('tick', 0), msg['id'], msg.get('energy', 0.0))
+        for msg in messages
+    )
+
+
+def decode(buffer, protocol):
+    """Décode et retire du tampon (bytearray) tous les messages complets"""
+    if protocol == 'binary':
+        return decode_binary(buffer)
+    return decode_json(buffer)
+
+
+def decode_json(buffer):
+    """Lignes complètes du tampon ; la dernière ligne, incomplète, reste dans le tampon"""
+    end = buffer.rfind(b'\n')
+    if end < 0:
+        return []
+    lines = bytes(buffer[:end]).split(b'\n')
+    del buffer[:end + 1]
+    messages = []
+    for line in lines:
+        if line.strip():
+            try:
+                messages.append(json.loads(line))
+            except ValueError:
+                pass  # ligne corrompue : ignorée
+    return messages
+
+
+def decode_binary(buffer):
+    """Enregistrements complets du tampon, décodés en bloc avec struct.iter_unpack"""
+    end = len(buffer) - len(buffer) % RECORD.size
+    if end == 0:
+        return []
+    records = RECORD.iter_unpack(bytes(buffer[:end]))
+    del buffer[:end]
+    return [
+        {'type': MESSAGE_TYPES[msg_type], 'entity': ENTITIES[entity], 'tick': tick, 'id': animal_id,
+         'active': bool(active), 'energy': energy}
+        for msg_type, entity, active, tick, animal_id, energy in records
+    ]
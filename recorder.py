@@ -0,0 +1,110 @@
+"""
+ENREGISTREUR - Séries temporelles par tick, une colonne par fichier projeté en mémoire
+
+Structure d'un enregistrement (dossier) :
+    meta.json          noms et types des colonnes
+    header.i8          [nombre de lignes, capacité] (int64, projeté en mémoire)
+    <colonne>.<type>   valeurs brutes de la colonne
+
+Lecture pendant le run, sans copie :
+    from recorder import open_series
+    series = open_series('run1')      # {'tick': np.memmap, 'preys': np.memmap, ...}
+"""
+
+import json
+import os
+import sys
+import numpy as np
+
+COLUMNS = (
+    ('tick', 'i8'),
+    ('predators', 'i8'),
+    ('preys', 'i8'),
+    ('grass', 'i8'),
+    ('births', 'i8'),
+    ('deaths', 'i8'),
+    ('drought_active', 'i1'),
+    ('epidemy_active', 'i1'),
+)
+
+LENGTH, CAPACITY = 0, 1
+
+
+class TimeSeriesRecorder:
+    """Ajoute une ligne par tick directement dans des fichiers projetés en mémoire
+
+    La capacité double quand elle est atteinte (fichiers agrandis sur place,
+    sans recopie) : le coût est amorti et la mémoire du processus ENV ne
+    grossit pas avec la durée du run, les pages écrites appartenant au cache
+    du système de fichiers.
+    """
+
+    def __init__(self, directory, capacity=65536, columns=COLUMNS):
+        self.directory = directory
+        self.columns = tuple(columns)
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, 'meta.json'), 'w') as f:
+            json.dump({'columns': self.columns}, f)
+
+        self.header = np.memmap(os.path.join(directory, 'header.i8'), dtype='i8', mode='w+', shape=(2,))
+        self.header[LENGTH] = 0
+        self.length = 0
+        self.capacity = 0
+        self.data = {}
+        self.resize(capacity)
+
+    def path(self, name, dtype):
+        return os.path.join(self.directory, f'{name}.{dtype}')
+
+    def resize(self, capacity):
+        """Agrandit chaque fichier de colonne puis le reprojette"""
+        self.data = {}  # libère les anciennes projections
+        for name, dtype in self.columns:
+            path = self.path(name, dtype)
+            with open(path, 'ab') as f:
+                f.truncate(capacity * np.dtype(dtype).itemsize)
+            self.data[name] = np.memmap(path, dtype=dtype, mode='r+', shape=(capacity,))
+        self.capacity = capacity
+        self.header[CAPACITY] = capacity
+
+    def append(self, status):
+        """Ajoute la ligne d'un tick (dict au format GET_STATUS)"""
+        if self.length == self.capacity:
+            self.resize(2 * self.capacity)
+        i = self.length
+        for name, _ in self.columns:
+            self.data[name][i] = status[name]
+        self.length += 1
+        self.header[LENGTH] = self.length  # publié après les valeurs : un lecteur ne voit que des lignes complètes
+
+    def flush(self):
+        for column in self.data.values():
+            column.flush()
+        self.header.flush()
+
+    def close(self):
+        self.flush()
+        self.data = {}
+
+
+def open_series(directory):
+    """Colonnes d'un enregistrement, limitées aux lignes déjà écrites (lecture seule, sans copie)"""
+    with open(os.path.join(directory, 'meta.json')) as f:
+        columns = json.load(f)['columns']
+    header = np.memmap(os.path.join(directory, 'header.i8'), dtype='i8', mode='r', shape=(2,))
+    length = int(header[LENGTH])
+    series = {}
+    for name, dtype in columns:
+        path = os.path.join(directory, f'{name}.{dtype}')
+        series[name] = np.memmap(path, dtype=dtype, mode='r', shape=(length,)) if length else np.empty(0, dtype=dtype)
+    return series
+
+
+if __name__ == "__main__":
+    # Résumé d'un enregistrement (éventuellement en cours)
+    series = open_series(sys.argv[1])
+    n = len(series['tick'])
+    print(f"{n} ticks enregistrés")
+    for name, column in series.items():
+        if n and name != 'tick':
+            print(f"  {name:15s} min {column.min():8d}  max {column.max():8d}  moyenne {column.mean():10.2f}")
@@ -0,0 +1,265 @@
+"""
+REGISTRE des individus - Qui vit où, ids uniques, processus terminés récupérés
+"""
+
+import os
+import threading
+from multiprocessing.connection import wait
+import numpy as np
+from protocol import ENTITIES, ENTITY_CODES
+
+NO_HOST = -1
+
+
+class EntityRegistry:
+    """Table des individus vivants, en colonnes NumPy compactes
+
+    Une case par individu (espèce, pid ou worker hôte, tick de naissance,
+    dernier tick où un message a été reçu, JOIN reçu, tick de fin de son
+    hôte) ; les cases libérées sont réutilisées (pile de cases libres) et un
+    dictionnaire id -> case donne l'accès en O(1). Les ids sont attribués
+    par un compteur monotone, jamais réutilisés.
+
+    Un thread d'arrière-plan (start_reaper) attend la fin des processus
+    d'animaux et des workers : un processus terminé est joint puis fermé
+    aussitôt (ni zombie ni descripteur ouvert), et ses individus sont
+    marqués. expire() renvoie ceux dont le DEATH n'est pas arrivé après un
+    délai de grâce : ENV les compte alors comme morts.
+
+    wait_ready() est la barrière de démarrage : elle rend la main quand
+    tous les individus inscrits ont envoyé leur JOIN (ou sont sortis du
+    registre).
+    """
+
+    def __init__(self, capacity=1024, first_id=0):
+        self.lock = threading.Lock()
+        self.ready = threading.Condition(self.lock)
+        self.pending = 0                                       # inscrits dont le JOIN n'est pas arrivé
+        self.joining = np.zeros(len(ENTITIES), dtype=np.int64) # les mêmes, par espèce
+        self.next_id = first_id
+        self.species = np.zeros(capacity, dtype=np.int8)
+        self.ids = np.full(capacity, -1, dtype=np.int64)
+        self.pid = np.zeros(capacity, dtype=np.int64)          # processus de l'animal (0 : hébergé par un worker)
+        self.worker = np.full(capacity, NO_HOST, dtype=np.int64)
+        self.birth_tick = np.zeros(capacity, dtype=np.int64)
+        self.last_seen = np.zeros(capacity, dtype=np.int64)
+        self.joined = np.zeros(capacity, dtype=bool)
+        self.exit_tick = np.full(capacity, -1, dtype=np.int64)  # fin de l'hôte, DEATH pas encore reçu
+        self.processes = {}                                    # case -> mp.Process de l'animal, pas encore récupéré
+        self.slots = {}                                        # id -> case
+        self.free = list(range(capacity - 1, -1, -1))
+        self.exited = set()                                    # cases dont l'hôte est terminé
+        self.workers = {}                                      # numéro -> mp.Process du worker
+        self.tick = 0                                          # tick courant d'ENV (écrit par ENV)
+        self.reaped = 0
+        self.lost = 0
+        self.reaper = None
+        self.stopping = threading.Event()
+        self.waker_r, self.waker_w = os.pipe()                 # réveille le thread de récupération (arrêt)
+
+    def __len__(self):
+        return len(self.slots)
+
+    def allocate(self):
+        """Nouvel id, jamais attribué auparavant"""
+        with self.lock:
+            animal_id = self.next_id
+            self.next_id += 1
+            return animal_id
+
+    def reserve(self, animal_id):
+        """Id imposé (reprise d'un checkpoint) : les ids attribués ensuite seront plus grands"""
+        with self.lock:
+            self.next_id = max(self.next_id, animal_id + 1)
+
+    def grow(self):
+        """Double la capacité de la table"""
+        capacity = len(self.ids)
+        for name, fill in (('species', 0), ('ids', -1), ('pid', 0), ('worker', NO_HOST), ('birth_tick', 0),
+                           ('last_seen', 0), ('joined', False), ('exit_tick', -1)):
+            column = getattr(self, name)
+            setattr(self, name, np.concatenate([column, np.full(capacity, fill, dtype=column.dtype)]))
+        self.free.extend(range(2 * capacity - 1, capacity - 1, -1))
+
+    def __contains__(self, animal_id):
+        return animal_id in self.slots
+
+    def add(self, animal_id, entity, tick):
+        """Inscrit un individu né au tick `tick`
+
+        Pour ne pas manquer son JOIN, on l'inscrit avant de le lancer, puis on
+        indique son hôte avec host().
+        """
+        with self.lock:
+            if animal_id in self.slots:
+                raise ValueError(f"Id déjà inscrit : {animal_id}")
+            if not self.free:
+                self.grow()
+            slot = self.free.pop()
+            self.slots[animal_id] = slot
+            self.ids[slot] = animal_id
+            self.species[slot] = ENTITY_CODES[entity]
+            self.pid[slot] = 0
+            self.worker[slot] = NO_HOST
+            self.birth_tick[slot] = tick
+            self.last_seen[slot] = tick
+            self.joined[slot] = False
+            self.exit_tick[slot] = -1
+            self.pending += 1
+            self.joining[self.species[slot]] += 1
+
+    def host(self, animal_id, process=None, worker=NO_HOST):
+        """Processus (lancé) ou worker qui fait vivre l'individu"""
+        with self.lock:
+            slot = self.slots.get(animal_id)
+            if slot is None:
+                return
+            self.pid[slot] = process.pid if process is not None else 0
+            self.worker[slot] = worker
+            if process is not None:
+                self.processes[slot] = process
+
+    def seen(self, animal_id, tick, joined=False):
+        """Message reçu de l'individu ; False s'il n'est pas (ou plus) inscrit"""
+        with self.lock:
+            slot = self.slots.get(animal_id)
+            if slot is None:
+                return False
+            self.last_seen[slot] = tick
+            if joined and not self.joined[slot]:
+                self.joined[slot] = True
+                self.joined_one(slot)
+            return True
+
+    def joined_one(self, slot):
+        """Un inscrit de moins en attente de JOIN (verrou tenu par l'appelant)"""
+        self.pending -= 1
+        self.joining[self.species[slot]] -= 1
+        if not self.pending:
+            self.ready.notify_all()
+
+    def waiting(self, entity):
+        """Individus de l'espèce inscrits dont le JOIN n'est pas arrivé (naissances pas encore comptées)"""
+        with self.lock:
+            return int(self.joining[ENTITY_CODES[entity]])
+
+    def wait_ready(self, timeout=None):
+        """Barrière de démarrage : attend le JOIN de tous les inscrits ; False au bout de timeout s"""
+        with self.ready:
+            return self.ready.wait_for(lambda: not self.pending, timeout)
+
+    def get(self, animal_id):
+        """Fiche d'un individu, None s'il n'est pas inscrit"""
+        with self.lock:
+            slot = self.slots.get(animal_id)
+            if slot is None:
+                return None
+            return {
+                'id': animal_id,
+                'entity': ENTITIES[self.species[slot]],
+                'pid': int(self.pid[slot]) or None,
+                'worker': int(self.worker[slot]) if self.worker[slot] != NO_HOST else None,
+                'birth_tick': int(self.birth_tick[slot]),
+                'last_seen': int(self.last_seen[slot]),
+                'joined': bool(self.joined[slot]),
+            }
+
+    def remove(self, animal_id):
+        """Désinscrit un individu ; renvoie (espèce, JOIN reçu), None s'il n'était pas inscrit"""
+        with self.lock:
+            slot = self.slots.pop(animal_id, None)
+            if slot is None:
+                return None
+            return self.release(slot)
+
+    def release(self, slot):
+        """Libère une case (verrou tenu par l'appelant)"""
+        removed = ENTITIES[self.species[slot]], bool(self.joined[slot])
+        if not self.joined[slot]:
+            self.joined_one(slot)
+        self.ids[slot] = -1
+        self.exited.discard(slot)
+        if slot not in self.processes: # sinon la case sera libérée par le thread de récupération
+            self.free.append(slot)
+        return removed
+
+    # ------------------------------------------------------------------
+    # Processus terminés
+    # ------------------------------------------------------------------
+
+    def watch_worker(self, index, process):
+        """Surveille un worker du pool : s'il s'arrête, ses animaux sont perdus"""
+        with self.lock:
+            self.workers[index] = process
+
+    def reap(self, timeout=0):
+        """Récupère les processus terminés (attente d'au plus `timeout` s) ; renvoie leur nombre"""
+        with self.lock:
+            sentinels = {p.sentinel: ('animal', slot, p) for slot, p in self.processes.items()}
+            sentinels.update({p.sentinel: ('worker', index, p) for index, p in self.workers.items()})
+        ready = [sentinel for sentinel in wait(list(sentinels) + [self.waker_r], timeout) if sentinel in sentinels]
+        for sentinel in ready:
+            kind, key, process = sentinels[sentinel]
+            process.join()
+            if kind == 'animal': # les workers restent dans la liste d'ENV jusqu'à l'arrêt
+                process.close()
+            with self.lock:
+                if kind == 'worker':
+                    del self.workers[key]
+                    hosted = np.flatnonzero((self.worker == key) & (self.ids >= 0) & (self.exit_tick < 0))
+                else:
+                    del self.processes[key]
+                    self.pid[key] = 0
+                    if self.ids[key] < 0: # DEATH déjà reçu : la case est libre
+                        self.free.append(key)
+                        hosted = []
+                    else:
+                        hosted = [key]
+                for slot in hosted:
+                    self.exit_tick[slot] = self.tick
+                    self.exited.add(int(slot))
+                self.reaped += 1
+        return len(ready)
+
+    def start_reaper(self, running, interval):
+        """Thread de récupération, actif tant que running() est vrai"""
+        def loop():
+            while running() and not self.stopping.is_set():
+                self.reap(interval)
+        self.reaper = threading.Thread(target=loop, daemon=True)
+        self.reaper.start()
+
+    def stop_reaper(self, timeout=None):
+        """Arrête le thread de récupération sans attendre la fin de sa passe"""
+        self.stopping.set()
+        os.write(self.waker_w, b'\0')
+        if self.reaper is not None:
+            self.reaper.join(timeout)
+            self.reaper = None
+
+    def expire(self, tick, grace):
+        """Désinscrit les individus dont l'hôte s'est terminé il y a `grace` ticks sans DEATH
+
+        Renvoie leur liste [(id, espèce, JOIN reçu)].
+        """
+        lost = []
+        with self.lock:
+            for slot in [slot for slot in self.exited if tick - self.exit_tick[slot] >= grace]:
+                animal_id = int(self.ids[slot])
+                del self.slots[animal_id]
+                lost.append((animal_id, *self.release(slot)))
+            self.lost += len(lost)
+        return lost
+
+    def live_processes(self):
+        """Processus d'animaux pas encore récupérés"""
+        with self.lock:
+            return list(self.processes.values())
+
+    def stats(self):
+        """Individus inscrits, processus récupérés, individus perdus (sans DEATH)"""
+        with self.lock:
+            alive = self.ids >= 0
+            oldest = int(self.last_seen[alive].min()) if alive.any() else None
+            return {'registered': len(self.slots), 'joining': self.pending, 'reaped': self.reaped,
+                    'lost': self.lost, 'oldest_last_seen': oldest}
@@ -0,0 +1,223 @@
+"""
+Serveur SOCKET - Réception des messages des animaux dans une seule boucle d'événements
+"""
+
+import os
+import resource
+import selectors
+import socket
+import tempfile
+import threading
+import time
+import protocol
+
+
+def default_socket_path():
+    """Fichier du socket Unix propre à ce processus ENV"""
+    return os.path.join(tempfile.gettempdir(), f'jeu_de_la_vie_{os.getpid()}.sock')
+
+
+class SocketServer:
+    """Serveur à boucle d'événements : un seul thread pour toutes les connexions
+
+    Chaque connexion a son propre tampon (bytearray). Les messages complets
+    (lignes JSON ou enregistrements binaires, selon Config.PROTOCOL) sont
+    découpés en une fois à chaque réception, ce qui reste linéaire même quand
+    le tampon contient des centaines de messages.
+    """
+
+    def __init__(self, config, on_message, instrumentation=None):
+        self.config = config
+        self.on_message = on_message    # appelé pour chaque message décodé : on_message(msg, client)
+        self.instrumentation = instrumentation
+        self.selector = selectors.DefaultSelector()
+        self.listener = None
+        self.path = None                # fichier du socket Unix (Config.TRANSPORT == 'unix')
+        self.waker = None               # paire de sockets pour réveiller la boucle (sync)
+
+        # sync() : demandes numérotées, et dernière demande vue par une boucle restée sans données
+        self.idle = threading.Condition()
+        self.sync_requests = 0
+        self.synced = 0
+
+        # Statistiques
+        self.total_messages = 0
+        self.messages_per_second = 0.0
+        self.rate_start = time.monotonic()
+        self.rate_count = 0
+
+    def setup(self):
+        """Configure le socket d'écoute (non bloquant)
+
+        L'adresse réelle (fichier Unix, port choisi quand SOCKET_PORT = 0) est
+        écrite dans la Config, dont hériteront les animaux.
+        """
+        # Une connexion = un descripteur : on monte la limite souple au maximum autorisé
+        soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+        if soft != hard:
+            resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+        if self.config.TRANSPORT == 'unix':
+            self.path = self.config.SOCKET_PATH or default_socket_path()
+            if os.path.exists(self.path):
+                os.unlink(self.path) # reste d'un run interrompu
+            self.listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.listener.bind(self.path)
+            self.config.SOCKET_PATH = self.path
+        else:
+            self.listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            self.listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            self.listener.bind((self.config.SOCKET_HOST, self.config.SOCKET_PORT))
+            self.config.SOCKET_PORT = self.listener.getsockname()[1]
+        self.listener.listen(self.config.SOCKET_BACKLOG)
+        self.listener.setblocking(False)
+        self.selector.register(self.listener, selectors.EVENT_READ, data=None)
+        self.waker = socket.socketpair()
+        self.waker[0].setblocking(False)
+        self.selector.register(self.waker[0], selectors.EVENT_READ, data=False)
+
+    def serve(self, is_running):
+        """Boucle d'événements, tant que is_running() est vrai"""
+        while is_running():
+            requested = self.sync_requests
+            received = False
+            timeout = 0 if self.synced < requested else 0.5  # sync() en attente : on ne bloque pas
+            for key, _ in self.selector.select(timeout=timeout):
+                if key.data is None:
+                    self.accept()
+                    received = True
+                elif key.data is False: # réveil par sync()
+                    try:
+                        key.fileobj.recv(4096)
+                    except (BlockingIOError, InterruptedError):
+                        pass
+                else:
+                    self.read(key.fileobj, key.data)
+                    received = True
+            if not received:
+                self.mark_idle(requested)
+            self.update_rate()
+
+    def mark_idle(self, requested):
+        """La boucle a trouvé toutes les connexions vides : les demandes sync() antérieures sont servies"""
+        with self.idle:
+            self.synced = max(self.synced, requested)
+            self.idle.notify_all()
+
+    def wake(self):
+        if self.waker:
+            try:
+                self.waker[1].send(b'\0')
+            except OSError:
+                pass
+
+    def sync(self, timeout=None):
+        """Attend que tout ce qui a été envoyé avant l'appel soit reçu et traité
+
+        Il suffit d'une attente de la boucle commencée après l'appel et
+        revenue sans données : tout ce qui était déjà écrit par les animaux a
+        été lu et décodé. Renvoie False si timeout est dépassé.
+        """
+        with self.idle:
+            self.sync_requests += 1
+            request = self.sync_requests
+            self.wake()
+            return self.idle.wait_for(lambda: self.synced >= request, timeout)
+
+    def accept(self):
+        """Accepte toutes les connexions en attente"""
+        while True:
+            try:
+                client, _ = self.listener.accept()
+            except (BlockingIOError, InterruptedError):
+                return
+            client.setblocking(False)
+            self.selector.register(client, selectors.EVENT_READ, data=bytearray())
+
+    def read(self, client, buffer):
+        """Lit tout ce qui est disponible sur une connexion"""
+        try:
+            data = client.recv(65536)
+        except (BlockingIOError, InterruptedError):
+            return
+        except OSError:
+            data = b''
+        if not data:
+            self.close_client(client)
+            return
+        buffer += data
+        if self.instrumentation:
+            start = time.perf_counter()
+            self.parse(buffer, client)
+            self.instrumentation.add_ingestion(time.perf_counter() - start)
+        else:
+            self.parse(buffer, client)
+
+    def parse(self, buffer, client=None):
+        """Décode en une passe tous les messages complets du tampon"""
+        messages = protocol.decode(buffer, self.config.PROTOCOL)
+        for msg in messages:
+            self.on_message(msg, client)
+        self.rate_count += len(messages)
+
+    def send(self, client, messages):
+        """Réponse groupée à un client : tous les messages en une écriture"""
+        try:
+            client.sendall(protocol.encode(messages, self.config.PROTOCOL))
+        except OSError:
+            pass  # client parti entre-temps
+
+    def close_client(self, client):
+        """Retire une connexion de la boucle"""
+        try:
+            self.selector.unregister(client)
+        except (KeyError, ValueError):
+            pass
+        try:
+            client.close()
+        except OSError:
+            pass
+
+    def update_rate(self):
+        """Débit de messages, recalculé chaque seconde"""
+        elapsed = time.monotonic() - self.rate_start
+        if elapsed >= 1.0:
+            self.messages_per_second = self.rate_count / elapsed
+            self.total_messages += self.rate_count
+            self.rate_count = 0
+            self.rate_start = time.monotonic()
+
+    def connection_count(self):
+        """Nombre de connexions d'animaux ouvertes"""
+        return len(self.selector.get_map()) - (1 if self.listener else 0) - (1 if self.waker else 0)
+
+    def stats(self):
+        """Débit et nombre de threads, pour vérifier la tenue en charge"""
+        return {
+            'connections': self.connection_count(),
+            'messages': self.total_messages + self.rate_count,
+            'messages_per_second': round(self.messages_per_second, 1),
+            'threads': threading.active_count()
+        }
+
+    def close(self):
+        """Ferme toutes les connexions puis le socket d'écoute"""
+        for key in list(self.selector.get_map().values()):
+            if key.data is not None and key.data is not False:
+                self.close_client(key.fileobj)
+        if self.waker:
+            self.selector.unregister(self.waker[0])
+            for sock in self.waker:
+                sock.close()
+            self.waker = None
+        if self.listener:
+            self.selector.unregister(self.listener)
+            self.listener.close()
+            self.listener = None
+        if self.path:
+            try:
+                os.unlink(self.path)
+            except OSError:
+                pass
+            self.path = None
+        self.selector.close()
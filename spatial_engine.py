@@ -0,0 +1,258 @@
+"""
+Moteur SPATIAL - Population en tableaux NumPy dans un monde en grille, repas locaux
+
+Exemple :
+    python headless.py --engine spatial --set WORLD_WIDTH=64 --set WORLD_HEIGHT=64 --set WORLD_TILES=4 \
+        --predators 400 --preys 2000 --grass 20000 --set GRASS_MAX=40000 --set GRASS_GROWTH_RATE=200
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from species import GRASS
+from vector_engine import VectorEngine, VectorEnvironment
+
+# Les 9 déplacements possibles d'un tick (case voisine ou sur place), sur place au milieu
+DX = np.array([-1, 0, 1, -1, 0, 1, -1, 0, 1])
+DY = np.array([-1, -1, -1, 0, 0, 0, 1, 1, 1])
+
+
+def rank_in_cell(cells):
+    """Rang de chaque élément parmi ceux de sa case, dans l'ordre du tableau (index de grille : un tri)"""
+    rank = np.empty(len(cells), dtype=np.int64)
+    if not len(cells):
+        return rank
+    order = np.argsort(cells, kind='stable')
+    sorted_cells = cells[order]
+    starts = np.flatnonzero(np.r_[True, sorted_cells[1:] != sorted_cells[:-1]])
+    rank[order] = np.arange(len(cells)) - np.repeat(starts, np.diff(np.r_[starts, len(cells)]))
+    return rank
+
+
+def local_meals(rng, cells, probability, available):
+    """Candidats servis, par leur position dans `cells` : au plus available[case] par case, dans un ordre tiré au sort
+
+    Même tirage que pick_winners, mais chaque case a sa propre réserve. Seuls
+    les candidats des cases dont la réserve ne suffit qu'à une partie d'entre
+    eux sont classés.
+    """
+    order = rng.permutation(len(cells))
+    if probability < 1.0:
+        order = order[rng.random(len(order)) < probability]
+    cells = cells[order]
+    served = (np.bincount(cells, minlength=len(available)) <= available)[cells]
+    shared = (~served & (available[cells] > 0)).nonzero()[0]
+    served[shared] = rank_in_cell(cells[shared]) < available[cells[shared]]
+    return order[served]
+
+
+class SpatialEngine(VectorEngine):
+    """Moteur vectorisé dans un monde en grille torique (WORLD_WIDTH x WORLD_HEIGHT cases)
+
+    Chaque individu a une position (x, y). L'herbe est un champ NumPy, une
+    quantité par case, qui repousse ou sèche case par case ; les paramètres
+    GRASS_* et l'herbe initiale restent des totaux pour tout le monde,
+    répartis également entre les cases.
+
+    À chaque tick, chacun fait un pas vers une case voisine : un affamé va
+    vers la plus riche en nourriture de son régime (comptage par case, pas
+    de recherche sur toutes les paires), les autres au hasard. Un individu
+    ne mange que dans sa case : proies et herbe de chaque case sont
+    réparties entre ses seuls affamés. Les petits naissent dans la case de
+    leur parent.
+
+    Les repas d'une case ne dépendent que de cette case : avec WORLD_TILES
+    bandes de lignes, chaque bande est tranchée dans un thread, avec son
+    propre générateur aléatoire (résultat indépendant de l'ordonnancement
+    des threads, mais pas du nombre de bandes).
+    """
+
+    def __init__(self, config, nb_predators=0, nb_preys=0, grass=0, seed=None):
+        self.config = config
+        self.width = config.WORLD_WIDTH
+        self.height = config.WORLD_HEIGHT
+        self.cells = self.width * self.height
+        self.tiles = config.WORLD_TILES
+        if not 1 <= self.tiles <= self.height:
+            raise ValueError(f"WORLD_TILES doit être entre 1 et WORLD_HEIGHT ({self.height}) : {self.tiles}")
+        self.x = np.empty(0, dtype=np.int32)
+        self.y = np.empty(0, dtype=np.int32)
+        self.birthplaces = {}   # espèce -> cases des parents du tick
+        super().__init__(config, nb_predators, nb_preys, grass, seed=seed)
+        self.tile_rngs = self.rng.spawn(self.tiles) if self.tiles > 1 else []
+        self.pool = ThreadPoolExecutor(self.tiles, thread_name_prefix='tile') if self.tiles > 1 else None
+
+    # ------------------------------------------------------------------
+    # Population
+    # ------------------------------------------------------------------
+
+    def add_individuals(self, species, count):
+        """Ajoute count individus neufs, dans la case d'un parent du tick ou dans une case au hasard"""
+        if count <= 0:
+            return
+        places = self.birthplaces.pop(species, None)
+        if places is None or len(places) < count:
+            places = self.rng.integers(0, self.cells, count)
+        super().add_individuals(species, count)
+        self.x = np.concatenate((self.x, (places[:count] % self.width).astype(np.int32)))
+        self.y = np.concatenate((self.y, (places[:count] // self.width).astype(np.int32)))
+
+    def keep(self, mask):
+        super().keep(mask)
+        self.x = self.x[mask]
+        self.y = self.y[mask]
+
+    def cell_of(self, rows):
+        """Case (index de grille y * largeur + x) des lignes `rows`"""
+        return self.y[rows].astype(np.int64) * self.width + self.x[rows]
+
+    def occupancy(self):
+        """Individus de chaque espèce par case, tableau (espèces, cases)"""
+        cells = self.cell_of(slice(None))
+        return np.array([np.bincount(cells[member], minlength=self.cells) for member in self.members(self.species)])
+
+    # ------------------------------------------------------------------
+    # Environnement
+    # ------------------------------------------------------------------
+
+    @property
+    def grass(self):
+        """Herbe de tout le monde (somme du champ)"""
+        return int(self.field.sum() + 1e-6) # arrondi des divisions par le nombre de cases
+
+    @grass.setter
+    def grass(self, value):
+        """Répartit `value` également entre les cases"""
+        self.field = np.full((self.height, self.width), value / self.cells)
+
+    def update_grass(self):
+        """Repousse ou sécheresse, case par case"""
+        cfg = self.config
+        if not self.drought_active:
+            self.field += cfg.GRASS_GROWTH_RATE / self.cells
+            np.minimum(self.field, cfg.GRASS_MAX / self.cells, out=self.field)
+        else:
+            self.field -= cfg.GRASS_DECREASE_RATE / self.cells
+            np.maximum(self.field, 0, out=self.field)
+
+    # ------------------------------------------------------------------
+    # Tick
+    # ------------------------------------------------------------------
+
+    def step(self):
+        """Déplacements, puis le tick du moteur vectorisé avec des repas locaux"""
+        self.move()
+        super().step()
+
+    def move(self):
+        """Un pas par individu : les affamés vers la case voisine la plus riche pour leur régime, les autres au hasard"""
+        n = len(self.ids)
+        if not n:
+            return
+        moves = self.rng.integers(0, len(DX), n)
+        hungry = np.flatnonzero(self.active)
+        if len(hungry):
+            # Nourriture de chaque espèce par case : herbe du champ, proies comptées par case
+            food = np.floor(self.field).ravel()
+            occupancy = self.occupancy()
+            appeal = np.zeros((len(self.table), self.cells))
+            for species, diet in enumerate(self.table.diets):
+                for prey, probability, gain in diet:
+                    appeal[species] += probability * gain * (food if prey == GRASS else occupancy[prey])
+            appeal = appeal.reshape(len(self.table), self.height, self.width)
+
+            x = (self.x[hungry, None] + DX) % self.width
+            y = (self.y[hungry, None] + DY) % self.height
+            scores = appeal[self.species[hungry, None], y, x]
+            scores += self.rng.random(scores.shape) * 1e-6 # ex aequo départagés au hasard
+            moves[hungry] = scores.argmax(axis=1)
+        self.x = ((self.x + DX[moves]) % self.width).astype(np.int32)
+        self.y = ((self.y + DY[moves]) % self.height).astype(np.int32)
+
+    def resolve(self, cells, probability, available):
+        """local_meals sur tout le monde, ou bande par bande dans les threads du pool"""
+        if self.pool is None:
+            return local_meals(self.rng, cells, probability, available)
+        bands = (cells // self.width) * self.tiles // self.height
+        parts = [np.flatnonzero(bands == tile) for tile in range(self.tiles)]
+        futures = [self.pool.submit(local_meals, rng, cells[part], probability, available)
+                   for rng, part in zip(self.tile_rngs, parts)]
+        return np.concatenate([part[future.result()] for part, future in zip(parts, futures)])
+
+    def hunt(self, hunters, preys, alive, probability, gain):
+        """Chaque chasseur ne chasse que les proies de sa case ; renvoie les chasseurs nourris"""
+        hunter_cells, prey_cells = self.cell_of(hunters), self.cell_of(preys)
+        served = self.resolve(hunter_cells, probability, np.bincount(prey_cells, minlength=self.cells))
+        fed = hunters[served]
+        if len(fed):
+            self.energy[fed] += gain
+            eaten = self.resolve(prey_cells, 1.0, np.bincount(hunter_cells[served], minlength=self.cells))
+            alive[preys[eaten]] = False
+        return fed
+
+    def graze(self, grazers, probability, gain):
+        """Chaque affamé ne mange que l'herbe de sa case ; renvoie ceux qui ont mangé"""
+        cells = self.cell_of(grazers)
+        served = self.resolve(cells, probability, np.floor(self.field).ravel())
+        fed = grazers[served]
+        if len(fed):
+            self.energy[fed] += gain
+            self.field -= np.bincount(cells[served], minlength=self.cells).reshape(self.field.shape)
+        return fed
+
+    def select_parents(self, members, alive):
+        parents, parents_count = super().select_parents(members, alive)
+        places = np.split(self.cell_of(parents), np.cumsum(parents_count)[:-1])
+        self.birthplaces = dict(enumerate(places))
+        return parents, parents_count
+
+    def reproduce(self, parents_count, populations):
+        super().reproduce(parents_count, populations)
+        self.birthplaces = {}
+
+    def close(self):
+        """Arrête les threads des bandes"""
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+
+    # ------------------------------------------------------------------
+    # Checkpoint
+    # ------------------------------------------------------------------
+
+    def snapshot(self):
+        population = super().snapshot()
+        population.update({'x': self.x.copy(), 'y': self.y.copy(), 'grass_field': self.field.copy()})
+        return population
+
+    def checkpoint_state(self):
+        state = super().checkpoint_state()
+        state.update({'engine': 'spatial', 'world': [self.width, self.height],
+                      'tile_rngs': [rng.bit_generator.state for rng in self.tile_rngs]})
+        return state
+
+    def load(self, state, population):
+        """Positions et champ d'herbe du checkpoint s'il vient d'un monde de même taille, sinon tirés / répartis"""
+        super().load(state, population)
+        if state.get('world') == [self.width, self.height] and 'x' in population:
+            self.x, self.y = population['x'], population['y']
+            self.field = population['grass_field']
+        else:
+            places = self.rng.integers(0, self.cells, len(self.ids))
+            self.x = (places % self.width).astype(np.int32)
+            self.y = (places // self.width).astype(np.int32)
+        if state.get('engine') == 'spatial':
+            self.rng.bit_generator.state = state['rng']
+            if len(state.get('tile_rngs', [])) == len(self.tile_rngs):
+                for rng, rng_state in zip(self.tile_rngs, state['tile_rngs']):
+                    rng.bit_generator.state = rng_state
+
+    def status(self):
+        status = super().status()
+        status['occupied_cells'] = int(np.count_nonzero(np.bincount(self.cell_of(slice(None)), minlength=self.cells)))
+        return status
+
+
+def spatial_env_process(cmd_queue, data_queue, config, status_block=None):
+    """Point d'entrée du processus environnement, monde en grille"""
+    env = VectorEnvironment(cmd_queue, data_queue, config, status_block, engine=SpatialEngine)
+    env.run()
@@ -0,0 +1,113 @@
+"""
+RÉSEAU TROPHIQUE - Table des espèces (Config.SPECIES) compilée en tableaux par espèce
+
+Une espèce est un dict :
+    name                      nom (unique)
+    diet                      régime, par préférence : [[nourriture, probabilité, gain], ...]
+                              (nourriture : 'grass' ou nom d'une espèce)
+    initial_energy, energy_decay, hunger_threshold
+    reproduction_threshold, reproduction_cost, reproduction_probability
+    max_age, max_population
+    initial                   effectif de départ (facultatif, 0 par défaut)
+
+Les deux premières espèces tiennent les rôles de prédateur et de proie :
+populations 'predators' / 'preys' de GET_STATUS, commandes GET_PREDATOR /
+GET_PREY, arguments nb_predators / nb_preys des moteurs.
+"""
+
+import numpy as np
+
+GRASS = -1   # code de l'herbe dans les régimes compilés
+
+FIELDS = ('initial_energy', 'energy_decay', 'hunger_threshold', 'reproduction_threshold', 'reproduction_cost',
+          'reproduction_probability', 'max_age', 'max_population')
+
+
+def predator_prey(config):
+    """Préréglage historique : prédateurs mangeurs de proies, proies mangeuses d'herbe (paramètres PREDATOR_* / PREY_*)"""
+    c = config
+    return [
+        {'name': 'predator', 'diet': [['prey', c.PREDATOR_FEED_PROBABILITY, c.PREDATOR_ENERGY_GAIN]],
+         'initial_energy': c.PREDATOR_INITIAL_ENERGY, 'energy_decay': c.PREDATOR_ENERGY_DECAY,
+         'hunger_threshold': c.PREDATOR_HUNGER_THRESHOLD, 'reproduction_threshold': c.PREDATOR_REPRODUCTION_THRESHOLD,
+         'reproduction_cost': c.PREDATOR_REPRODUCTION_COST,
+         'reproduction_probability': c.PREDATOR_REPRODUCTION_PROBABILITY,
+         'max_age': c.AGE_PREDATORS, 'max_population': c.MAX_PREDATORS},
+        {'name': 'prey', 'diet': [['grass', 1.0, c.PREY_ENERGY_GAIN]],
+         'initial_energy': c.PREY_INITIAL_ENERGY, 'energy_decay': c.PREY_ENERGY_DECAY,
+         'hunger_threshold': c.PREY_HUNGER_THRESHOLD, 'reproduction_threshold': c.PREY_REPRODUCTION_THRESHOLD,
+         'reproduction_cost': c.PREY_REPRODUCTION_COST, 'reproduction_probability': c.PREY_REPRODUCTION_PROBABILITY,
+         'max_age': c.AGE_PROIES, 'max_population': c.MAX_PREYS},
+    ]
+
+
+def three_levels(config):
+    """Trois niveaux : un superprédateur omnivore chasse les prédateurs, et les proies faute de mieux"""
+    return predator_prey(config) + [
+        {'name': 'superpredator', 'diet': [['predator', 0.5, 70.0], ['prey', 0.2, 30.0]],
+         'initial_energy': 150.0, 'energy_decay': 0.6, 'hunger_threshold': 110, 'reproduction_threshold': 170,
+         'reproduction_cost': 80.0, 'reproduction_probability': 0.15, 'max_age': 500, 'max_population': 20,
+         'initial': 3},
+    ]
+
+
+PRESETS = {
+    'predator_prey': predator_prey,
+    'three_levels': three_levels,
+}
+
+
+class SpeciesTable:
+    """Table des espèces compilée : un tableau NumPy par paramètre, indexé par code d'espèce
+
+    Le code d'une espèce est sa position dans la table. Les régimes sont
+    compilés en listes [(code de la nourriture, probabilité, gain)], GRASS
+    pour l'herbe.
+    """
+
+    def __init__(self, species):
+        if len(species) < 2:
+            raise ValueError("Réseau trophique : au moins deux espèces (rôles de prédateur et de proie)")
+        self.names = tuple(entry['name'] for entry in species)
+        if len(set(self.names)) != len(self.names) or 'grass' in self.names:
+            raise ValueError(f"Réseau trophique : noms d'espèces en double ou réservés : {self.names}")
+        self.codes = {name: code for code, name in enumerate(self.names)}
+        for field in FIELDS:
+            missing = [entry['name'] for entry in species if field not in entry]
+            if missing:
+                raise ValueError(f"Réseau trophique : {field} manquant pour {', '.join(missing)}")
+        self.initial_energy = np.array([entry['initial_energy'] for entry in species], dtype=float)
+        self.energy_decay = np.array([entry['energy_decay'] for entry in species], dtype=float)
+        self.hunger_threshold = np.array([entry['hunger_threshold'] for entry in species], dtype=float)
+        self.reproduction_threshold = np.array([entry['reproduction_threshold'] for entry in species], dtype=float)
+        self.reproduction_cost = np.array([entry['reproduction_cost'] for entry in species], dtype=float)
+        self.reproduction_probability = np.array([entry['reproduction_probability'] for entry in species], dtype=float)
+        self.max_age = np.array([entry['max_age'] for entry in species], dtype=np.int64)
+        self.max_population = np.array([entry['max_population'] for entry in species], dtype=np.int64)
+        self.initial = np.array([entry.get('initial', 0) for entry in species], dtype=np.int64)
+        self.diets = []
+        for entry in species:
+            diet = []
+            for food, probability, gain in entry['diet']:
+                if food != 'grass' and food not in self.codes:
+                    raise ValueError(f"Réseau trophique : {entry['name']} mange une espèce inconnue : {food}")
+                diet.append((GRASS if food == 'grass' else self.codes[food], float(probability), float(gain)))
+            self.diets.append(diet)
+
+    @classmethod
+    def from_config(cls, config):
+        """Table de Config.SPECIES : nom d'un préréglage ou liste d'espèces"""
+        if isinstance(config.SPECIES, str):
+            if config.SPECIES not in PRESETS:
+                raise ValueError(f"Réseau trophique inconnu : {config.SPECIES} (préréglages : {', '.join(PRESETS)})")
+            return cls(PRESETS[config.SPECIES](config))
+        return cls(config.SPECIES)
+
+    def __len__(self):
+        return len(self.names)
+
+
+def require_predator_prey(config, engine):
+    """Les moteurs à deux espèces codées en dur refusent les autres réseaux"""
+    if config.SPECIES != 'predator_prey':
+        raise ValueError(f"Le moteur {engine} ne gère que le réseau 'predator_prey' (Config.SPECIES = {config.SPECIES!r})")
@@ -0,0 +1,47 @@
+"""
+Bloc d'ÉTAT publié - Dernier état de la simulation en mémoire partagée, lu sans verrou
+"""
+
+import multiprocessing as mp
+
+FIELDS = ('tick', 'predators', 'preys', 'grass', 'births', 'deaths', 'drought_active', 'epidemy_active')
+FLAGS = ('drought_active', 'epidemy_active')
+
+
+class StatusBlock:
+    """Etat versionné écrit une fois par tick par ENV (seqlock)
+
+    Case 0 : numéro de version. ENV le rend impair avant d'écrire et pair
+    après. Un lecteur relit tant que la version est impaire ou a changé
+    pendant sa lecture : il obtient toujours un état cohérent, sans verrou
+    ni aller-retour par une file, quel que soit le nombre de lecteurs.
+    """
+
+    def __init__(self):
+        self.values = mp.RawArray('q', 1 + len(FIELDS))
+
+    def publish(self, status):
+        """Écrit un nouvel état (un seul écrivain : ENV)"""
+        values = self.values
+        values[0] += 1  # impair : écriture en cours
+        for i, name in enumerate(FIELDS, 1):
+            values[i] = int(status[name])
+        values[0] += 1  # pair : état cohérent
+
+    def read(self, retries=1000):
+        """Copie cohérente du dernier état, ou None si rien n'a encore été publié"""
+        values = self.values
+        for _ in range(retries):
+            before = values[0]
+            if before & 1:
+                continue
+            snapshot = values[1:]
+            if values[0] == before:
+                if before == 0:
+                    return None
+                status = dict(zip(FIELDS, snapshot))
+                for name in FLAGS:
+                    status[name] = bool(status[name])
+                status['version'] = before // 2
+                return status
+        return None
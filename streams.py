@@ -0,0 +1,84 @@
+"""
+FLUX aléatoires - Tirages sans état, fonction de (graine, id, tick, usage)
+
+Un tirage n'est plus le n-ième d'un générateur : c'est un hachage
+(SplitMix64) de sa clé. Un animal tire donc la même valeur au même âge
+qu'il vive dans son propre processus, dans un worker du pool ou après une
+reprise de checkpoint, et quel que soit l'ordre dans lequel les processus
+ont été ordonnancés. Deux processus lancés par fork ne partagent plus la
+même suite.
+
+Exemple :
+    streams = Streams(config.SEED)
+    if streams.random(animal_id, age, 'reproduce') < probabilité: ...
+    u = streams.uniform(ids, tick, 'feed')   # tableau NumPy, mêmes valeurs
+"""
+
+import secrets
+import numpy as np
+
+MASK = (1 << 64) - 1
+GOLDEN = 0x9E3779B97F4A7C15
+SCALE = 1.0 / (1 << 53)   # 53 bits de poids fort -> [0, 1)
+
+# Usages : deux usages d'une même clé et d'un même tick donnent des tirages indépendants
+PURPOSES = {
+    'feed': 1,
+    'reproduce': 2,
+    'epidemy_death': 3,
+    'drought': 4,
+    'drought_duration': 5,
+    'epidemy': 6,
+    'epidemy_duration': 7,
+    'feed_order': 8,
+}
+
+ENV = -1   # clé des tirages d'ENV (sécheresses, épidémies) ; les animaux ont des ids >= 0
+
+
+def mix(z):
+    """Finaliseur de SplitMix64 (entier Python de 64 bits)"""
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & MASK
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & MASK
+    return z ^ (z >> 31)
+
+
+def mix_array(z):
+    """Même finaliseur sur un tableau uint64 (produits modulo 2**64)"""
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return z ^ (z >> np.uint64(31))
+
+
+def run_seed(seed=None):
+    """Graine du run : celle donnée, ou tirée une fois (à transmettre à tous les processus)"""
+    return secrets.randbits(63) if seed is None else int(seed)
+
+
+class Streams:
+    """Tirages uniformes clés par (graine, id, tick, usage), en scalaire ou en tableau"""
+
+    def __init__(self, seed=None):
+        self.seed = run_seed(seed)
+        self.bases = {name: mix((self.seed + code * GOLDEN) & MASK) for name, code in PURPOSES.items()}
+
+    def random(self, key, tick, purpose):
+        """Un tirage dans [0, 1)"""
+        z = mix(self.bases[purpose] ^ (key & MASK))
+        return (mix((z + tick) & MASK) >> 11) * SCALE
+
+    def uniform(self, keys, tick, purpose):
+        """Un tirage par clé de `keys`, identique à random() clé par clé"""
+        keys = np.ascontiguousarray(keys, dtype=np.int64).view(np.uint64)
+        z = mix_array(np.uint64(self.bases[purpose]) ^ keys)
+        z = mix_array(z + np.uint64(tick & MASK))
+        return (z >> np.uint64(11)).astype(np.float64) * SCALE
+
+    def integers(self, low, high, key, tick, purpose):
+        """Entier dans [low, high] (bornes incluses, comme random.randint)"""
+        return low + int(self.random(key, tick, purpose) * (high - low + 1))
+
+    def permutation(self, keys, tick, purpose):
+        """`keys` dans un ordre tiré au sort, qui ne dépend pas de leur ordre d'arrivée"""
+        keys = np.asarray(keys, dtype=np.int64)
+        return keys[np.argsort(self.uniform(keys, tick, purpose), kind='stable')]
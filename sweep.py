@@ -0,0 +1,171 @@
+"""
+Balayage de PARAMÈTRES - Nombreux runs batch en parallèle sur une grille de Config
+
+Exemples :
+    python sweep.py --grid PREDATOR_ENERGY_GAIN=40,46,52 --grid GRASS_GROWTH_RATE=1.5,2,3 --seeds 10
+    python sweep.py --random EPIDEMY_DEATH_RATE=0.001:0.05 --samples 200 --seeds 5 --output eps.csv
+
+Chaque ligne du fichier de résultats est écrite dès qu'un run se termine.
+Relancer la même commande reprend là où elle s'était arrêtée : les runs
+déjà présents dans le fichier (même run_id : surcharges, graine, ticks et
+moteur) ne sont pas recalculés. Un fichier existant dont les colonnes ne
+sont pas celles du balayage est refusé.
+"""
+
+import argparse
+import csv
+import hashlib
+import itertools
+import json
+import os
+import random
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from config import Config
+from headless import ENGINES, run_headless
+
+RESULT_FIELDS = ['tick', 'extinction_tick', 'predators_extinct_tick', 'preys_extinct_tick',
+                 'peak_predators', 'peak_preys', 'mean_grass', 'predators', 'preys', 'grass',
+                 'births', 'deaths', 'elapsed']
+
+
+def grid_points(grid):
+    """Produit cartésien {NOM: [valeurs]} -> liste de surcharges"""
+    names = sorted(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[n] for n in names))]
+
+
+def random_points(ranges, samples, sample_seed=0):
+    """Tirage uniforme dans {NOM: (min, max)} ; entiers si les deux bornes sont entières"""
+    rng = random.Random(sample_seed)  # même graine -> mêmes points, indispensable pour reprendre
+    points = []
+    for _ in range(samples):
+        point = {}
+        for name in sorted(ranges):
+            low, high = ranges[name]
+            if isinstance(low, int) and isinstance(high, int):
+                point[name] = rng.randint(low, high)
+            else:
+                point[name] = rng.uniform(low, high)
+        points.append(point)
+    return points
+
+
+def run_id(overrides, seed, ticks, engine):
+    """Identifiant stable d'un run (surcharges, communes comprises, graine, ticks et moteur)"""
+    key = json.dumps({'overrides': overrides, 'seed': seed, 'ticks': ticks, 'engine': engine}, sort_keys=True)
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]
+
+
+def run_point(overrides, seed, ticks, engine):
+    """Un run batch (exécuté dans un processus du pool)"""
+    config = Config(**overrides)
+    return run_headless(config, engine=engine, ticks=ticks, seed=seed)
+
+
+def completed_runs(path, fieldnames):
+    """run_id déjà présents dans le fichier de résultats, s'il a bien les colonnes `fieldnames`"""
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        return set()
+    with open(path, newline='') as f:
+        reader = csv.DictReader(f)
+        if reader.fieldnames != fieldnames:
+            raise ValueError(f"{path} a d'autres colonnes que ce balayage ({', '.join(reader.fieldnames or [])}) : "
+                             f"choisir un autre fichier avec --output")
+        return {row['run_id'] for row in reader}
+
+
+def sweep(points, seeds, output, ticks=None, engine='vector', workers=None, base=None):
+    """Lance points x graines en parallèle et ajoute chaque résultat au fichier CSV"""
+    base = base or {}
+    param_names = sorted({name for point in points for name in point})
+    fieldnames = ['run_id', 'seed', 'engine', 'ticks'] + param_names + RESULT_FIELDS
+
+    done = completed_runs(output, fieldnames)
+    tasks = []
+    for point in points:
+        overrides = dict(base, **point)
+        run_ticks = Config(**overrides).TICKS if ticks is None else ticks
+        for seed in seeds:
+            rid = run_id(overrides, seed, run_ticks, engine)
+            if rid not in done:
+                tasks.append((rid, point, overrides, seed, run_ticks))
+    print(f"{len(tasks)} runs à faire ({len(done)} déjà dans {output})")
+    if not tasks:
+        return 0
+
+    new_file = not os.path.exists(output) or os.path.getsize(output) == 0
+    with open(output, 'a', newline='') as f, ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        if new_file:
+            writer.writeheader()
+        futures = {pool.submit(run_point, overrides, seed, run_ticks, engine): (rid, point, seed, run_ticks)
+                   for rid, point, overrides, seed, run_ticks in tasks}
+        for n, future in enumerate(as_completed(futures), 1):
+            rid, point, seed, run_ticks = futures[future]
+            try:
+                stats = future.result()
+            except Exception as e:
+                print(f" Run {rid} en erreur : {e}")
+                continue
+            row = {'run_id': rid, 'seed': seed, 'engine': engine, 'ticks': run_ticks}
+            row.update(point)
+            row.update({name: stats.get(name) for name in RESULT_FIELDS})
+            writer.writerow(row)
+            f.flush()  # une ligne par run terminé : rien n'est perdu si on interrompt
+            print(f"\r {n}/{len(tasks)} runs terminés", end='', flush=True)
+    print()
+    return len(tasks)
+
+
+def parse_values(text):
+    """'40,46,52' -> [40, 46, 52] (valeurs JSON)"""
+    return [json.loads(v) for v in text.split(',')]
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Balayage parallèle de paramètres Config")
+    parser.add_argument('--grid', action='append', default=[], metavar='NOM=V1,V2,...',
+                        help="Valeurs d'un paramètre (produit cartésien entre paramètres)")
+    parser.add_argument('--random', action='append', default=[], metavar='NOM=MIN:MAX',
+                        help="Intervalle d'un paramètre tiré au hasard (avec --samples)")
+    parser.add_argument('--samples', type=int, default=20, help="Nombre de points tirés au hasard")
+    parser.add_argument('--sample-seed', type=int, default=0, help="Graine du tirage des points")
+    parser.add_argument('--set', action='append', default=[], metavar='NOM=VALEUR',
+                        help="Paramètre fixe commun à tous les runs")
+    parser.add_argument('--seeds', type=int, default=5, help="Nombre de graines par point")
+    parser.add_argument('--ticks', type=int, help="Nombre de ticks par run (Config.TICKS par défaut)")
+    parser.add_argument('--engine', choices=sorted(ENGINES), default='vector')
+    parser.add_argument('--workers', type=int, help="Processus en parallèle (un par cœur par défaut)")
+    parser.add_argument('--output', default='sweep_results.csv')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    base = {}
+    for item in args.set:
+        name, _, value = item.partition('=')
+        base[name] = json.loads(value)
+    grid = {}
+    for item in args.grid:
+        name, _, values = item.partition('=')
+        grid[name] = parse_values(values)
+    ranges = {}
+    for item in args.random:
+        name, _, bounds = item.partition('=')
+        low, _, high = bounds.partition(':')
+        ranges[name] = (json.loads(low), json.loads(high))
+
+    points = grid_points(grid) if grid else [{}]
+    if ranges:
+        # grille x tirages : chaque point de grille est complété par les points tirés
+        points = [dict(p, **r) for p in points for r in random_points(ranges, args.samples, args.sample_seed)]
+    Config(**base, **points[0])  # paramètres inconnus détectés avant de lancer le pool
+
+    sweep(points, list(range(args.seeds)), args.output, ticks=args.ticks,
+          engine=args.engine, workers=args.workers, base=base)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,73 @@
+"""
+ARRÊT de la simulation - Tous les processus d'un coup, avec une échéance globale
+"""
+
+import os
+import selectors
+import signal
+import time
+
+
+def wait_exit(pending, deadline):
+    """Attend ensemble la fin des processus de `pending` (sentinelle -> processus), au plus jusqu'à `deadline`
+
+    Un seul sélecteur pour toute l'attente : chaque sentinelle est inscrite
+    une fois (multiprocessing.connection.wait les réinscrit toutes à chaque
+    appel, quadratique avec des milliers de processus).
+    """
+    with selectors.DefaultSelector() as selector:
+        for sentinel in pending:
+            selector.register(sentinel, selectors.EVENT_READ)
+        while pending:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            for key, _ in selector.select(remaining):
+                selector.unregister(key.fileobj)
+                pending.pop(key.fileobj).join()
+
+
+def signal_group(group, sig):
+    """Envoie `sig` à tout le groupe de processus `group`, sauf à l'appelant (qui en fait partie)"""
+    previous = signal.signal(sig, signal.SIG_IGN)
+    try:
+        os.killpg(group, sig)
+    finally:
+        signal.signal(sig, previous)
+
+
+def stop_processes(processes, grace, kill_after=0.2, group=None):
+    """Arrête des processus déjà prévenus (drapeau shutdown, ordre SHUTDOWN...) ; renvoie le rapport
+
+    Jusqu'à `grace` s, on attend qu'ils sortent d'eux-mêmes, toutes les
+    sentinelles à la fois. Les retardataires reçoivent alors SIGTERM : un seul
+    killpg si `group` (groupe dont l'appelant est le leader) ou un par un ;
+    ceux qui restent reçoivent SIGKILL au bout de `kill_after` s. Sur peu de
+    coeurs, tuer est bien plus rapide que laisser des milliers d'interpréteurs
+    se terminer : grace=0 envoie le signal tout de suite.
+    """
+    start = time.monotonic()
+    pending = {p.sentinel: p for p in processes} # sentinelle d'un processus déjà terminé : lisible tout de suite
+    total = len(pending)
+    wait_exit(pending, start + grace)
+    exited = total - len(pending)
+    stragglers = []
+    if pending:
+        if group is not None:
+            signal_group(group, signal.SIGTERM)
+        else:
+            for p in pending.values():
+                p.terminate()
+        wait_exit(pending, time.monotonic() + kill_after)
+        stragglers = [p.name for p in pending.values()]
+        for p in pending.values():
+            p.kill()
+        wait_exit(pending, time.monotonic() + kill_after)
+    return {
+        'processes': total,
+        'exited': exited,
+        'terminated': total - exited - len(stragglers),
+        'killed': len(stragglers),
+        'stragglers': stragglers,                             # noms des processus qu'il a fallu tuer (SIGKILL)
+        'seconds': time.monotonic() - start,
+    }
@@ -0,0 +1,42 @@
+"""
+Tests des compteurs partagés (counters.py)
+"""
+
+import pytest
+from counters import ShardedCounters
+
+
+@pytest.fixture
+def counters():
+    counters = ShardedCounters(shards=3)  # 4 lignes : ENV + 3 shards
+    yield counters
+    counters.close()
+
+
+def fill(counters, field, per_row):
+    for shard in range(counters.rows):
+        counters.add(shard, field, per_row)
+
+
+def test_take_drains_several_rows(counters):
+    """Une prise partielle continue sur les autres lignes tant que `amount` n'est pas atteint"""
+    fill(counters, 'prey', 3)
+    assert counters.take(0, 'prey', 10) == 10
+    assert counters.total('prey') == 2
+    assert counters.take(0, 'prey', 10) == 2 # tout ce qui reste
+    assert counters.total('prey') == 0
+
+
+def test_take_keeps_the_rest(counters):
+    fill(counters, 'grass', 3)
+    assert counters.take(0, 'grass', 7) == 7
+    assert counters.total('grass') == 5
+    assert all(counters.values[counters.slot(shard, 'grass')] >= 0 for shard in range(counters.rows))
+
+
+def test_claim_takes_all_or_nothing(counters):
+    fill(counters, 'predator', 1)
+    assert not counters.claim(0, 'predator', 2)
+    assert counters.total('predator') == 4
+    assert counters.claim(2, 'predator')
+    assert counters.total('predator') == 3
@@ -0,0 +1,57 @@
+"""
+Tests du moteur à événements (event_engine.py)
+"""
+
+import numpy as np
+from config import Config
+from event_engine import EPIDEMY, REPRODUCE, EventEngine
+from vector_engine import PREY
+
+
+def quiet_config(**overrides):
+    """Ni sécheresse ni nouvelle épidémie tirées au hasard, une proie rassasiée qui se reproduit à coup sûr"""
+    values = {
+        'DROUGHT_PROBABILITY': 0.0,
+        'EPIDEMY_PROBABILITY': 0.0,
+        'PREY_HUNGER_THRESHOLD': 0,
+        'PREY_REPRODUCTION_THRESHOLD': 0,
+        'PREY_REPRODUCTION_PROBABILITY': 1.0,
+        'EPIDEMY_DEATH_RATE': 1.0,
+    }
+    values.update(overrides)
+    return Config(**values)
+
+
+def epidemic_engine(config):
+    """Une proie endormie, épidémie en cours : reproduction et mort tirées au même tick"""
+    engine = EventEngine(config, nb_preys=1, seed=0)
+    engine.epidemy_active = True
+    engine.epidemy_end_tick = 100
+    engine.epidemy_sampled_until = engine.epidemy_end_tick
+    engine.schedule(np.array([0]))
+    return engine
+
+
+def test_reproduce_and_epidemy_on_same_tick():
+    """La reproduction, traitée d'abord, ne doit pas effacer la mort par épidémie du même tick"""
+    engine = epidemic_engine(quiet_config())
+    assert engine.event_kind[0] == REPRODUCE
+    assert engine.epidemy_tick[0] == engine.event_tick[0] == 1
+
+    engine.step()
+
+    assert engine.total_births == 1
+    assert engine.total_deaths == 1
+    assert 0 not in engine.snapshot()['ids']
+    assert engine.count(PREY) == 1 # le petit
+
+
+def test_epidemy_alone_still_kills():
+    """Sans reproduction, le réveil par l'épidémie tue comme avant"""
+    engine = epidemic_engine(quiet_config(PREY_REPRODUCTION_PROBABILITY=0.0))
+    assert engine.event_kind[0] == EPIDEMY
+
+    engine.step()
+
+    assert engine.total_births == 0
+    assert engine.count(PREY) == 0
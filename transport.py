@@ -0,0 +1,240 @@
+"""
+TRANSPORTS - Canal des messages animaux -> ENV (Config.TRANSPORT)
+
+    'tcp'   socket TCP sur SOCKET_HOST:SOCKET_PORT (SOCKET_PORT = 0 : port libre choisi par ENV)
+    'unix'  socket de domaine Unix (SOCKET_PATH, par défaut un fichier propre au processus ENV)
+    'shm'   anneaux d'octets en mémoire partagée, plusieurs écrivains et un seul lecteur (ENV)
+
+Côté animal, connect() renvoie un objet avec sendall / recv / close, quel que
+soit le transport. Côté ENV, make_server() renvoie le serveur correspondant.
+Avec 'unix' ou un port libre, l'adresse réelle est écrite dans la Config
+d'ENV avant la naissance des animaux, qui en héritent : deux simulations
+peuvent tourner côte à côte.
+"""
+
+import os
+import select
+import socket
+import time
+import multiprocessing as mp
+from multiprocessing.reduction import DupFd
+from multiprocessing.shared_memory import SharedMemory
+from socket_server import SocketServer
+
+TRANSPORTS = ('tcp', 'unix', 'shm')
+
+HEADER = 64  # octets par anneau : position d'écriture (head), de lecture (tail), écrivains connectés
+
+
+class SharedRings:
+    """Anneaux d'octets en mémoire partagée (un par shard), écrits par les animaux et lus par ENV
+
+    head et tail ne font que croître ; la position dans l'anneau est leur
+    reste modulo la capacité. Un écrivain écrit tout son bloc de messages sous
+    le verrou de son anneau puis avance head : les blocs ne s'entremêlent
+    jamais et ENV, seul lecteur, les lit sans verrou jusqu'à head puis avance
+    tail. Un anneau plein fait attendre l'écrivain (contre-pression). Chaque
+    écriture réveille ENV par un eventfd.
+    """
+
+    def __init__(self, capacity=1 << 20, shards=None, ctx=None):
+        self.capacity = capacity
+        self.shards = shards or os.cpu_count() or 1
+        self.shm = SharedMemory(create=True, size=self.shards * (HEADER + capacity))
+        self.words = self.shm.buf.cast('q')
+        for shard in range(self.shards):
+            for field in range(3):
+                self.words[self.slot(shard, field)] = 0
+        self.locks = [(ctx or mp).Lock() for _ in range(self.shards)]
+        self.wakeup = os.eventfd(0, os.EFD_NONBLOCK) if hasattr(os, 'eventfd') else None
+        self.owner = True
+
+    def __getstate__(self):
+        # Comme ShardedCounters : un processus lancé en 'spawn'/'forkserver' se rattache par le nom ;
+        # il n'hérite d'aucun descripteur, l'eventfd lui est transmis explicitement
+        return {'capacity': self.capacity, 'shards': self.shards, 'name': self.shm.name,
+                'locks': self.locks, 'wakeup': DupFd(self.wakeup) if self.wakeup is not None else None}
+
+    def __setstate__(self, state):
+        self.capacity = state['capacity']
+        self.shards = state['shards']
+        self.shm = SharedMemory(name=state['name'])
+        self.words = self.shm.buf.cast('q')
+        self.locks = state['locks']
+        self.wakeup = state['wakeup'].detach() if state['wakeup'] is not None else None
+        self.owner = False
+
+    def slot(self, shard, field):
+        """Mot d'en-tête : 0 head, 1 tail, 2 écrivains connectés"""
+        return shard * HEADER // 8 + field
+
+    def data_start(self, shard):
+        return self.shards * HEADER + shard * self.capacity
+
+    def write(self, shard, data):
+        """Ajoute un bloc entier à l'anneau (attend de la place si besoin)"""
+        buf = self.shm.buf
+        start = self.data_start(shard)
+        head_slot, tail_slot = self.slot(shard, 0), self.slot(shard, 1)
+        view = memoryview(data)
+        with self.locks[shard]:
+            head = self.words[head_slot]
+            while view:
+                free = self.capacity - (head - self.words[tail_slot])
+                if free == 0:
+                    self.wake()
+                    time.sleep(0.0001)
+                    continue
+                pos = head % self.capacity
+                n = min(len(view), free, self.capacity - pos)  # jusqu'à la fin de l'anneau au plus
+                buf[start + pos:start + pos + n] = view[:n]
+                view = view[n:]
+                head += n
+                self.words[head_slot] = head  # publié après les octets
+        self.wake()
+
+    def read_into(self, shard, buffer):
+        """Déplace dans buffer (bytearray) tout ce qui a été écrit ; renvoie le nombre d'octets"""
+        head = self.words[self.slot(shard, 0)]
+        tail = self.words[self.slot(shard, 1)]
+        if head == tail:
+            return 0
+        buf = self.shm.buf
+        start = self.data_start(shard)
+        pos = tail % self.capacity
+        n = head - tail
+        first = min(n, self.capacity - pos)
+        buffer += buf[start + pos:start + pos + first]
+        if first < n:
+            buffer += buf[start:start + n - first]
+        self.words[self.slot(shard, 1)] = head
+        return n
+
+    def wake(self):
+        if self.wakeup is not None:
+            try:
+                os.eventfd_write(self.wakeup, 1)
+            except OSError:
+                pass
+
+    def wait(self, timeout):
+        """Attend une écriture (ou timeout) ; sans eventfd, simple attente courte"""
+        if self.wakeup is None:
+            time.sleep(min(timeout, 0.001))
+            return
+        if select.select([self.wakeup], [], [], timeout)[0]:
+            try:
+                os.eventfd_read(self.wakeup)
+            except BlockingIOError:
+                pass
+
+    def connect(self, key=0):
+        return RingConnection(self, key % self.shards)
+
+    def connected(self):
+        return sum(self.words[self.slot(shard, 2)] for shard in range(self.shards))
+
+    def close(self):
+        self.words.release()
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+            if self.wakeup is not None:
+                os.close(self.wakeup)
+
+
+class RingConnection:
+    """Connexion d'un animal (ou d'un worker) à un anneau, avec l'interface d'un socket"""
+
+    def __init__(self, rings, shard):
+        self.rings = rings
+        self.shard = shard
+        self.open = True
+        self.add_writer(1)
+
+    def add_writer(self, delta):
+        with self.rings.locks[self.shard]:
+            self.rings.words[self.rings.slot(self.shard, 2)] += delta
+
+    def sendall(self, data):
+        if not self.open:
+            raise OSError("connexion fermée")
+        self.rings.write(self.shard, data)
+
+    def recv(self, size, flags=0):
+        # Pas de réponses d'ENV par ce transport (voir make_server)
+        raise BlockingIOError
+
+    def close(self):
+        if self.open:
+            self.open = False
+            self.add_writer(-1)
+
+
+class RingServer(SocketServer):
+    """Lecture des anneaux par le thread de réception d'ENV, avec le même décodage que SocketServer"""
+
+    def __init__(self, config, on_message, instrumentation=None, ctx=None):
+        super().__init__(config, on_message, instrumentation)
+        self.rings = SharedRings(config.RING_SIZE, config.RING_SHARDS, ctx)
+        self.buffers = [bytearray() for _ in range(self.rings.shards)]  # messages incomplets par anneau
+
+    def setup(self):
+        pass
+
+    def serve(self, is_running):
+        while is_running():
+            requested = self.sync_requests
+            received = 0
+            for shard, buffer in enumerate(self.buffers):
+                if self.rings.read_into(shard, buffer):
+                    received += 1
+                    if self.instrumentation:
+                        start = time.perf_counter()
+                        self.parse(buffer)
+                        self.instrumentation.add_ingestion(time.perf_counter() - start)
+                    else:
+                        self.parse(buffer)
+            if not received:
+                self.mark_idle(requested)
+                if self.synced >= self.sync_requests:
+                    self.rings.wait(0.5)
+            self.update_rate()
+
+    def wake(self):
+        self.rings.wake()
+
+    def send(self, client, messages):
+        pass  # pas de voie retour : refusé par make_server quand elle serait nécessaire
+
+    def connection_count(self):
+        return self.rings.connected()
+
+    def close(self):
+        self.rings.close()
+        self.selector.close()
+
+
+def make_server(config, on_message, instrumentation=None, ctx=None):
+    """Serveur d'ENV du transport choisi (ctx : contexte multiprocessing des animaux)"""
+    if config.TRANSPORT not in TRANSPORTS:
+        raise ValueError(f"Transport inconnu : {config.TRANSPORT} (choix : {', '.join(TRANSPORTS)})")
+    if config.TRANSPORT == 'shm':
+        if config.FEEDING == 'batched':
+            raise ValueError("FEEDING = 'batched' a besoin des réponses d'ENV : transport 'tcp' ou 'unix'")
+        return RingServer(config, on_message, instrumentation, ctx)
+    return SocketServer(config, on_message, instrumentation)
+
+
+def connect(config, shared_memory, key=0):
+    """Connexion d'un animal ou d'un worker à ENV (key : id ou numéro de worker, pour répartir les anneaux)"""
+    if config.TRANSPORT == 'shm':
+        return shared_memory['ring'].connect(key)
+    if config.TRANSPORT == 'unix':
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.connect(config.SOCKET_PATH)
+        return sock
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1) # une écriture par tick : rien à regrouper (Nagle)
+    sock.connect((config.SOCKET_HOST, config.SOCKET_PORT))
+    return sock
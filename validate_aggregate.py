@@ -0,0 +1,154 @@
+"""
+VALIDATION du moteur agrégé - Mêmes statistiques que le moteur par individus, à petite échelle
+
+Exemple :
+    python validate_aggregate.py --seeds 400 --ticks 800 --leap 1
+    python validate_aggregate.py --set EPIDEMY_PROBABILITY=0.02 --leap 5 --output validation.json
+
+Lance `--seeds` runs de VectorEngine (un individu par ligne) et autant de
+répliques d'AggregateEngine, avec la même Config, puis compare tous les
+`--every` ticks :
+    - la moyenne des prédateurs, des proies et de l'herbe (écart en nombre
+      d'erreurs-types de la différence, z) et le rapport des écarts-types ;
+    - la proportion de runs où chaque espèce est éteinte (test sur deux
+      proportions).
+La validation échoue (code de sortie 1) si un |z| dépasse --threshold.
+"""
+
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from config import Config
+from vector_engine import VectorEngine
+from aggregate_engine import AggregateEngine
+
+VARIABLES = ('predators', 'preys', 'grass')
+
+
+def agent_run(config, seed, ticks, every):
+    """Un run de VectorEngine : (prédateurs, proies, herbe) tous les `every` ticks"""
+    engine = VectorEngine(config, config.INITIAL_PREDATORS, config.INITIAL_PREYS, config.INITIAL_GRASS, seed=seed)
+    samples = []
+    for tick in range(1, ticks + 1):
+        engine.step()
+        if tick % every == 0:
+            samples.append((engine.count(0), engine.count(1), engine.grass))
+    return samples
+
+
+def agent_trajectories(config, seeds, ticks, every, workers=None):
+    """Tableau (runs, échantillons, 3), runs répartis sur un pool de processus"""
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        runs = pool.map(agent_run, [config] * seeds, range(seeds), [ticks] * seeds, [every] * seeds)
+        return np.array(list(runs), dtype=float)
+
+
+def aggregate_trajectories(config, replicates, ticks, every, leap, seed=None):
+    """Tableau (répliques, échantillons, 3) du moteur agrégé"""
+    engine = AggregateEngine(config, config.INITIAL_PREDATORS, config.INITIAL_PREYS, config.INITIAL_GRASS,
+                             seed=seed, replicates=replicates, leap=leap)
+    samples = []
+    while engine.tick_count < ticks:
+        engine.step()
+        if engine.tick_count % every == 0:
+            samples.append(np.stack(engine.populations(), axis=1))
+    return np.stack(samples, axis=1).astype(float)
+
+
+def z_means(a, b):
+    """Ecart des moyennes de a et b (axe 0) en erreurs-types de la différence"""
+    se = np.sqrt(a.var(axis=0, ddof=1) / len(a) + b.var(axis=0, ddof=1) / len(b))
+    diff = a.mean(axis=0) - b.mean(axis=0)
+    return np.divide(diff, se, out=np.zeros_like(diff), where=se > 0)
+
+
+def z_proportions(a, b):
+    """Test sur deux proportions (axe 0), a et b booléens"""
+    pa, pb = a.mean(axis=0), b.mean(axis=0)
+    pooled = (a.sum(axis=0) + b.sum(axis=0)) / (len(a) + len(b))
+    se = np.sqrt(pooled * (1 - pooled) * (1 / len(a) + 1 / len(b)))
+    return np.divide(pa - pb, se, out=np.zeros_like(pa), where=se > 0)
+
+
+def compare(agent, aggregate, every):
+    """Statistiques comparées par tick échantillonné, et |z| maximal de chaque grandeur"""
+    ticks = [every * (i + 1) for i in range(agent.shape[1])]
+    rows = []
+    worst = {}
+    for v, name in enumerate(VARIABLES):
+        z = z_means(agent[:, :, v], aggregate[:, :, v])
+        worst[name] = float(np.abs(z).max())
+        for i, tick in enumerate(ticks):
+            rows.append({'tick': tick, 'variable': name, 'z': float(z[i]),
+                         'agent_mean': float(agent[:, i, v].mean()), 'aggregate_mean': float(aggregate[:, i, v].mean()),
+                         'agent_std': float(agent[:, i, v].std()), 'aggregate_std': float(aggregate[:, i, v].std())})
+    for v, name in enumerate(VARIABLES[:2]):
+        z = z_proportions(agent[:, :, v] == 0, aggregate[:, :, v] == 0)
+        worst[f'{name}_extinct'] = float(np.abs(z).max())
+        for i, tick in enumerate(ticks):
+            rows.append({'tick': tick, 'variable': f'{name}_extinct', 'z': float(z[i]),
+                         'agent_mean': float((agent[:, i, v] == 0).mean()),
+                         'aggregate_mean': float((aggregate[:, i, v] == 0).mean())})
+    return rows, worst
+
+
+def validate(config, seeds, ticks, leap, every=None, threshold=4.0, seed=None, workers=None):
+    """Compare les deux moteurs ; renvoie (lignes du rapport, |z| maximaux, succès)"""
+    every = every or leap * max(1, -(-10 // leap))
+    if every % leap:
+        raise ValueError(f"--every ({every}) doit être un multiple du saut ({leap})")
+    ticks -= ticks % every
+    agent = agent_trajectories(config, seeds, ticks, every, workers)
+    aggregate = aggregate_trajectories(config, seeds, ticks, every, leap, seed)
+    rows, worst = compare(agent, aggregate, every)
+    return rows, worst, all(z <= threshold for z in worst.values())
+
+
+def print_report(rows, worst, threshold, lines=10):
+    """Quelques ticks du rapport, puis le |z| maximal de chaque grandeur"""
+    ticks = sorted({row['tick'] for row in rows})
+    shown = set(ticks[::max(1, len(ticks) // lines)]) | {ticks[-1]}
+    print(f"{'tick':>6} {'grandeur':<18} {'individus':>10} {'agrégé':>10} {'z':>7}")
+    for row in rows:
+        if row['tick'] in shown:
+            print(f"{row['tick']:>6} {row['variable']:<18} {row['agent_mean']:>10.3f} {row['aggregate_mean']:>10.3f} {row['z']:>7.2f}")
+    print()
+    for name, z in worst.items():
+        print(f" {name:<18} |z| max = {z:5.2f} {'OK' if z <= threshold else 'ÉCART'}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare le moteur agrégé au moteur par individus (VectorEngine)")
+    parser.add_argument('--config', help="Fichier JSON de paramètres Config ({\"NOM\": valeur})")
+    parser.add_argument('--seeds', type=int, default=400, help="Runs de chaque moteur")
+    parser.add_argument('--ticks', type=int, help="Nombre de ticks (Config.TICKS par défaut)")
+    parser.add_argument('--leap', type=int, help="Ticks par saut du moteur agrégé (Config.AGGREGATE_LEAP par défaut)")
+    parser.add_argument('--every', type=int, help="Ticks entre deux comparaisons (multiple du saut)")
+    parser.add_argument('--threshold', type=float, default=4.0, help="|z| maximal accepté")
+    parser.add_argument('--seed', type=int, help="Graine du moteur agrégé")
+    parser.add_argument('--workers', type=int, help="Processus pour les runs par individus (un par cœur par défaut)")
+    parser.add_argument('--set', action='append', default=[], metavar='NOM=VALEUR',
+                        help="Surcharge d'un paramètre Config (valeur JSON), répétable")
+    parser.add_argument('--output', help="Fichier JSON du rapport complet")
+    args = parser.parse_args(argv)
+
+    overrides = {}
+    for item in args.set:
+        name, _, value = item.partition('=')
+        overrides[name] = json.loads(value)
+    config = Config(args.config, **overrides)
+    leap = args.leap or config.AGGREGATE_LEAP
+    rows, worst, ok = validate(config, args.seeds, args.ticks or config.TICKS, leap, every=args.every,
+                               threshold=args.threshold, seed=args.seed, workers=args.workers)
+    print_report(rows, worst, args.threshold)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'leap': leap, 'seeds': args.seeds, 'worst': worst, 'rows': rows}, f, indent=2)
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
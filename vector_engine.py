@@ -0,0 +1,393 @@
+"""
+Moteur VECTORISÉ - Toute la population dans des tableaux NumPy
+"""
+
+import signal
+import time
+import numpy as np
+from feeding import pick_winners
+from recorder import TimeSeriesRecorder
+from checkpoint import read_checkpoint, save_in_background
+from species import GRASS, SpeciesTable
+
+# Codes des deux premières espèces de la table (préréglage 'predator_prey')
+PREDATOR = 0
+PREY = 1
+SPECIES_NAMES = ('predator', 'prey')
+
+
+class VectorEngine:
+    """Simulation de toute la population en un seul processus
+
+    Chaque individu est une ligne des tableaux (id, espèce, énergie, âge, état).
+    Un tick applique à toute la population, en une passe vectorisée, la même
+    boucle que Predator.live / Prey.live : perte d'énergie, update_state,
+    try_to_feed, try_to_reproduce, mort de faim, épidémie et âge limite.
+    Contrairement au mode processus, une proie mangée meurt vraiment.
+
+    Les espèces et leur régime viennent de la table Config.SPECIES
+    (species.py) : les paramètres sont des tableaux indexés par code
+    d'espèce, et les parents de toutes les espèces sont tirés en un seul
+    tirage par tick.
+    """
+
+    def __init__(self, config, nb_predators=0, nb_preys=0, grass=0, seed=None):
+        self.config = config
+        self.rng = np.random.default_rng(seed)
+
+        # Etat de l'environnement (comme EnvironmentManager)
+        self.tick_count = 0
+        self.grass = int(grass)
+        self.drought_active = False
+        self.drought_end_tick = 0
+        self.epidemy_active = False
+        self.epidemy_end_tick = 0
+
+        # Statistiques
+        self.total_births = 0
+        self.total_deaths = 0
+
+        # Paramètres par espèce, indexés par code d'espèce (PREDATOR, PREY, puis les suivantes de la table)
+        self.table = SpeciesTable.from_config(config)
+        self.initial_energy = self.table.initial_energy
+        self.energy_decay = self.table.energy_decay
+        self.hunger_threshold = self.table.hunger_threshold
+        self.reproduction_threshold = self.table.reproduction_threshold
+        self.reproduction_cost = self.table.reproduction_cost
+        self.reproduction_probability = self.table.reproduction_probability
+        self.max_age = self.table.max_age
+        self.max_population = self.table.max_population
+
+        # Population : une ligne par individu vivant
+        self.next_id = 0
+        self.ids = np.empty(0, dtype=np.int64)
+        self.species = np.empty(0, dtype=np.int8)
+        self.energy = np.empty(0, dtype=np.float64)
+        self.age = np.empty(0, dtype=np.int32)
+        self.active = np.empty(0, dtype=bool)
+
+        self.add_individuals(PREDATOR, nb_predators)
+        self.add_individuals(PREY, nb_preys)
+        for species, count in enumerate(self.table.initial):
+            self.add_individuals(species, int(count))
+
+    # ------------------------------------------------------------------
+    # Population
+    # ------------------------------------------------------------------
+
+    def add_individuals(self, species, count):
+        """Ajoute count individus neufs (énergie initiale, âge 0, passifs)"""
+        if count <= 0:
+            return
+        new_ids = np.arange(self.next_id, self.next_id + count, dtype=np.int64)
+        self.next_id += count
+        self.ids = np.concatenate((self.ids, new_ids))
+        self.species = np.concatenate((self.species, np.full(count, species, dtype=np.int8)))
+        self.energy = np.concatenate((self.energy, np.full(count, self.initial_energy[species])))
+        self.age = np.concatenate((self.age, np.zeros(count, dtype=np.int32)))
+        self.active = np.concatenate((self.active, np.zeros(count, dtype=bool)))
+
+    def count(self, species):
+        """Nombre d'individus vivants d'une espèce"""
+        return int(np.count_nonzero(self.species == species))
+
+    def populations(self):
+        """Nombre d'individus vivants de chaque espèce, par code"""
+        return np.array([np.count_nonzero(member) for member in self.members(self.species)])
+
+    def members(self, species):
+        """Masque de chaque espèce (quelques espèces : un masque coûte moins qu'un tri ou un bincount d'int8)"""
+        return [species == code for code in range(len(self.table))]
+
+    def keep(self, mask):
+        """Ne garde que les individus du masque"""
+        self.ids = self.ids[mask]
+        self.species = self.species[mask]
+        self.energy = self.energy[mask]
+        self.age = self.age[mask]
+        self.active = self.active[mask]
+
+    # ------------------------------------------------------------------
+    # Environnement
+    # ------------------------------------------------------------------
+
+    def update_grass(self):
+        """Met à jour la croissance de l'herbe"""
+        if not self.drought_active:
+            self.grass = int(min(self.grass + self.config.GRASS_GROWTH_RATE, self.config.GRASS_MAX))
+        else:
+            self.grass = int(max(self.grass - self.config.GRASS_DECREASE_RATE, 0))
+
+    def check_drought(self):
+        """Vérifie et gère les sécheresses"""
+        if not self.drought_active:
+            if self.rng.random() < self.config.DROUGHT_PROBABILITY:
+                self.trigger_drought()
+        elif self.tick_count >= self.drought_end_tick:
+            self.drought_active = False
+
+    def trigger_drought(self):
+        """Déclenche une sécheresse"""
+        self.drought_active = True
+        duration = int(self.rng.integers(self.config.DROUGHT_MIN_DURATION, self.config.DROUGHT_MAX_DURATION + 1))
+        self.drought_end_tick = self.tick_count + duration
+
+    def check_epidemy(self):
+        """Démarre ou termine une épidémie"""
+        if not self.epidemy_active:
+            if self.rng.random() < self.config.EPIDEMY_PROBABILITY:
+                self.trigger_epidemy()
+        elif self.tick_count >= self.epidemy_end_tick:
+            self.epidemy_active = False
+
+    def trigger_epidemy(self):
+        """Démarre une épidémie"""
+        self.epidemy_active = True
+        duration = int(self.rng.integers(self.config.EPIDEMY_MIN_DURATION, self.config.EPIDEMY_MAX_DURATION + 1))
+        self.epidemy_end_tick = self.tick_count + duration
+
+    # ------------------------------------------------------------------
+    # Tick
+    # ------------------------------------------------------------------
+
+    def step(self):
+        """Avance la simulation d'un tick"""
+        self.tick_count += 1
+        cfg = self.config
+
+        # Environnement
+        self.update_grass()
+        self.check_drought()
+        self.check_epidemy()
+
+        sp = self.species
+        n = len(sp)
+        alive = np.ones(n, dtype=bool)
+
+        # Diminution de l'énergie
+        self.energy -= self.energy_decay[sp]
+
+        # Mise à jour de l'état (hystérésis de 20 comme update_state)
+        hunger = self.hunger_threshold[sp]
+        self.active = np.where(self.energy < hunger, True, np.where(self.energy > hunger + 20, False, self.active))
+
+        # Repas : espèce par espèce dans l'ordre de la table (les prédateurs chassent, puis les proies
+        # encore vivantes mangent l'herbe), chaque affamé essayant son régime par ordre de préférence
+        members = self.members(sp)
+        self.feed(members, alive)
+
+        # Reproduction : parents tirés parmi les individus assez énergiques, toutes espèces en un tirage
+        _, parents_count = self.select_parents(members, alive)
+        populations = np.array([np.count_nonzero(alive & member) for member in members])
+
+        # Mort de faim, épidémie puis vieillesse
+        alive &= self.energy > 0
+        if self.epidemy_active:
+            alive &= self.rng.random(n) >= cfg.EPIDEMY_DEATH_RATE
+        self.age += 1
+        alive &= self.age < self.max_age[sp]
+
+        self.total_deaths += int(n - np.count_nonzero(alive))
+        self.keep(alive)
+        self.reproduce(parents_count, populations)
+
+    def feed(self, members, alive):
+        """Repas du tick ; members : masque de chaque espèce. Un individu mange au plus une fois"""
+        hungry = self.active & alive
+        for member, diet in zip(members, self.table.diets):
+            for food, probability, gain in diet:
+                eaters = np.flatnonzero(hungry & member & alive)
+                if food == GRASS:
+                    winners = self.graze(eaters, probability, gain)
+                else:
+                    winners = self.hunt(eaters, np.flatnonzero(alive & members[food]), alive, probability, gain)
+                hungry[winners] = False
+
+    def hunt(self, hunters, preys, alive, probability, gain):
+        """Les chasseurs affamés chassent : chaque proie attrapée meurt ; renvoie les chasseurs nourris"""
+        fed = pick_winners(self.rng, hunters, probability, len(preys))
+        if len(fed):
+            self.energy[fed] += gain
+            eaten = self.rng.choice(preys, size=len(fed), replace=False)
+            alive[eaten] = False
+        return fed
+
+    def graze(self, grazers, probability, gain):
+        """Les affamés mangent l'herbe, tant qu'il en reste ; renvoie ceux qui ont mangé"""
+        fed = pick_winners(self.rng, grazers, probability, self.grass)
+        if len(fed):
+            self.energy[fed] += gain
+            self.grass -= len(fed)
+        return fed
+
+    def select_parents(self, members, alive):
+        """Tire les parents du tick et déduit leur coût de reproduction ; renvoie (lignes des parents, nombre par espèce)"""
+        candidates = [np.flatnonzero(alive & member & (self.energy > threshold))
+                      for member, threshold in zip(members, self.reproduction_threshold)]
+        sizes = [len(rows) for rows in candidates]
+        chosen = self.rng.random(sum(sizes)) < np.repeat(self.reproduction_probability, sizes)
+        parents_count = np.array([np.count_nonzero(part) for part in np.split(chosen, np.cumsum(sizes)[:-1])])
+        parents = np.concatenate(candidates)[chosen] # groupés par espèce
+        self.energy[parents] -= np.repeat(self.reproduction_cost, parents_count)
+        return parents, parents_count
+
+    def reproduce(self, parents_count, populations):
+        """Naissances, limitées par max_population de chaque espèce ; une espèce éteinte ne renaît pas"""
+        parents_count, populations = np.asarray(parents_count), np.asarray(populations)
+        births = np.where(populations > 0, np.minimum(parents_count, np.maximum(0, self.max_population - populations)), 0)
+        for species in np.flatnonzero(births):
+            self.add_individuals(int(species), int(births[species]))
+        self.total_births += int(births.sum())
+
+    # ------------------------------------------------------------------
+    # Checkpoint
+    # ------------------------------------------------------------------
+
+    def snapshot(self):
+        """Copie de la population (format de checkpoint.py)"""
+        return {'ids': self.ids.copy(), 'species': self.species.copy(), 'energy': self.energy.copy(),
+                'age': self.age.copy(), 'active': self.active.copy()}
+
+    def checkpoint_state(self):
+        """Etat de l'environnement, de l'horloge et du générateur aléatoire (méta-données du checkpoint)"""
+        return {
+            'engine': 'vector',
+            'tick_count': self.tick_count,
+            'grass': int(self.grass),
+            'drought_active': bool(self.drought_active),
+            'drought_end_tick': self.drought_end_tick,
+            'epidemy_active': bool(self.epidemy_active),
+            'epidemy_end_tick': self.epidemy_end_tick,
+            'total_births': self.total_births,
+            'total_deaths': self.total_deaths,
+            'next_id': self.next_id,
+            'rng': self.rng.bit_generator.state,
+            'species_names': list(self.table.names),
+        }
+
+    def checkpoint(self, path):
+        """Copie l'état (quelques ms) et l'écrit en arrière-plan ; renvoie le thread d'écriture"""
+        return save_in_background(path, self.checkpoint_state(), self.snapshot())
+
+    def restore(self, path):
+        """Reprend la simulation depuis un checkpoint (de l'un ou l'autre moteur)"""
+        self.load(*read_checkpoint(path))
+
+    def load(self, state, population):
+        """Etat et population lus dans un checkpoint"""
+        names = tuple(state.get('species_names', SPECIES_NAMES))
+        if names != self.table.names[:len(names)]:
+            raise ValueError(f"Checkpoint d'un autre réseau trophique : {names} (Config.SPECIES : {self.table.names})")
+        self.tick_count = state['tick_count']
+        self.grass = state['grass']
+        self.drought_active = state['drought_active']
+        self.drought_end_tick = state['drought_end_tick']
+        self.epidemy_active = state['epidemy_active']
+        self.epidemy_end_tick = state['epidemy_end_tick']
+        self.total_births = state['total_births']
+        self.total_deaths = state['total_deaths']
+        self.ids = population['ids']
+        self.species = population['species']
+        self.energy = population['energy']
+        self.age = population['age']
+        self.active = population['active']
+        self.next_id = state.get('next_id', int(self.ids.max()) + 1 if len(self.ids) else 0)
+        if state.get('engine') == 'vector':
+            self.rng.bit_generator.state = state['rng']
+
+    def run(self, ticks):
+        """Enchaîne `ticks` ticks sans attente"""
+        for _ in range(ticks):
+            self.step()
+
+    def status(self):
+        """Etat courant, au même format que GET_STATUS"""
+        populations = self.populations()
+        return {
+            'predators': int(populations[PREDATOR]),
+            'preys': int(populations[PREY]),
+            'grass': int(self.grass),
+            'tick': self.tick_count,
+            'births': self.total_births,
+            'deaths': self.total_deaths,
+            'drought_active': bool(self.drought_active),
+            'epidemy_active': bool(self.epidemy_active),
+            'populations': dict(zip(self.table.names, populations.tolist()))
+        }
+
+
+class VectorEnvironment:
+    """Processus ENV du mode vectorisé : mêmes commandes et signaux qu'EnvironmentManager"""
+
+    def __init__(self, cmd_queue, data_queue, config, status_block=None, engine=None):
+        self.cmd_queue = cmd_queue
+        self.data_queue = data_queue
+        self.config = config
+        self.status_block = status_block
+        self.recorder = TimeSeriesRecorder(config.RECORD_DIR, config.RECORD_CAPACITY) if config.RECORD_DIR else None
+        self.engine = (engine or VectorEngine)(config) # classe du moteur (VectorEngine ou une sous-classe)
+        if config.RESUME:
+            self.engine.restore(config.RESUME)
+        self.running = True
+        self.drought_dem = False
+        self.epidemy_dem = False
+
+    def handle_message_queue(self):
+        """Traite les messages de la file (depuis display)"""
+        while not self.cmd_queue.empty():
+            try:
+                msg = self.cmd_queue.get_nowait()
+                cmd_type = msg.get('type')
+
+                if cmd_type == 'GET_HERBE':
+                    self.engine.grass = int(msg['value'])
+                elif cmd_type == 'GET_PREY':
+                    self.engine.add_individuals(PREY, int(msg['value']))
+                elif cmd_type == 'GET_PREDATOR':
+                    self.engine.add_individuals(PREDATOR, int(msg['value']))
+                elif cmd_type == 'GET_STATUS':
+                    self.data_queue.put(self.engine.status())
+                elif cmd_type == 'CHECKPOINT':
+                    path = msg.get('path') or self.config.CHECKPOINT_PATH
+                    self.engine.checkpoint(path)
+                    self.data_queue.put({'type': 'CHECKPOINT', 'path': path, 'individuals': len(self.engine.ids)})
+                elif cmd_type == 'SHUTDOWN':
+                    self.running = False
+            except Exception as e:
+                print(f" Erreur message queue: {e}")
+
+    def handle_signal(self, sig, frame):
+        if sig == signal.SIGUSR1:
+            self.drought_dem = True
+        if sig == signal.SIGUSR2:
+            self.epidemy_dem = True
+
+    def run(self):
+        """Boucle principale, un tick vectorisé par SIMULATION_TICK"""
+        signal.signal(signal.SIGUSR1, self.handle_signal)
+        signal.signal(signal.SIGUSR2, self.handle_signal)
+        print("Démarrage (moteur vectorisé)...")
+        print("\n")
+        while self.running:
+            self.handle_message_queue()
+            if self.drought_dem:
+                self.engine.trigger_drought()
+                self.drought_dem = False
+            if self.epidemy_dem:
+                self.engine.trigger_epidemy()
+                self.epidemy_dem = False
+            self.engine.step()
+            status = self.engine.status()
+            if self.status_block:
+                self.status_block.publish(status)
+            if self.recorder:
+                self.recorder.append(status)
+            time.sleep(self.config.SIMULATION_TICK)
+        if self.recorder:
+            self.recorder.close()
+
+
+def vector_env_process(cmd_queue, data_queue, config, status_block=None):
+    """Point d'entrée du processus environnement vectorisé"""
+    env = VectorEnvironment(cmd_queue, data_queue, config, status_block)
+    env.run()
@@ -0,0 +1,107 @@
+"""
+VÉRIFICATION du déterminisme - Même graine, deux configurations d'ENV, journaux d'événements identiques
+
+Exemple :
+    python verify_determinism.py --ticks 300 --b WORKER_POOL_SIZE=4 --b 'TRANSPORT="unix"'
+    python verify_determinism.py --set PROTOCOL='"binary"' --a WORKER_POOL_SIZE=1 --b WORKER_POOL_SIZE=3
+
+Lance deux fois ENV (moteur par processus, un journal EVENT_LOG_DIR par
+run) avec la même graine, la Config commune (--config, --set) et les
+surcharges propres à chaque run (--a, --b), puis compare les journaux
+jusqu'au tick --ticks. Les tirages sont clés par (graine, id, tick)
+(streams.py) : avec le pool en lockstep et les repas groupés (valeurs par
+défaut ici), le journal ne dépend ni du nombre de workers, ni du
+transport, ni du protocole. La vérification échoue (code de sortie 1) au
+premier tick qui diffère.
+"""
+
+import argparse
+import json
+import multiprocessing as mp
+import os
+import sys
+import tempfile
+import time
+from config import Config
+from env_process import env_process
+from eventlog import compare_events, print_difference, read_events
+from status_block import StatusBlock
+from streams import run_seed
+
+# Seul ordonnancement où le journal ne dépend pas du temps : un step par tick pour tous, repas tranchés par ENV
+DEFAULTS = {'WORKER_POOL': True, 'SCHEDULER': 'lockstep', 'FEEDING': 'batched', 'SOCKET_PORT': 0}
+
+
+def parse_overrides(items):
+    overrides = {}
+    for item in items:
+        name, _, value = item.partition('=')
+        overrides[name] = json.loads(value)
+    return overrides
+
+
+def logged_run(config, predators, preys, grass, ticks, timeout=120.0):
+    """Un run d'ENV jusqu'au tick `ticks` (au moins), journal dans config.EVENT_LOG_DIR"""
+    cmd_queue, data_queue = mp.Queue(), mp.Queue()
+    status_block = StatusBlock()
+    cmd_queue.put({'type': 'GET_HERBE', 'value': grass})
+    cmd_queue.put({'type': 'GET_PREY', 'value': preys})
+    cmd_queue.put({'type': 'GET_PREDATOR', 'value': predators})
+    env = mp.Process(target=env_process, args=(cmd_queue, data_queue, config, status_block))
+    env.start()
+    deadline = time.monotonic() + timeout
+    while env.is_alive() and time.monotonic() < deadline:
+        status = status_block.read()
+        if status and status['tick'] > ticks: # tous les messages du tick `ticks` sont journalisés
+            break
+        time.sleep(0.01)
+    else:
+        print(f" Run arrêté avant le tick {ticks}", file=sys.stderr)
+    cmd_queue.put({'type': 'SHUTDOWN'})
+    env.join(config.SHUTDOWN_TIMEOUT + 5)
+    if env.is_alive():
+        env.kill()
+        env.join()
+
+
+def verify(config_a, config_b, predators, preys, grass, ticks, directory):
+    """Les deux runs, puis compare_events sur les ticks [0, ticks]"""
+    for name, config in (('a', config_a), ('b', config_b)):
+        config.EVENT_LOG_DIR = os.path.join(directory, name)
+        logged_run(config, predators, preys, grass, ticks)
+    events_a, _ = read_events(config_a.EVENT_LOG_DIR, 0, ticks)
+    events_b, _ = read_events(config_b.EVENT_LOG_DIR, 0, ticks)
+    return compare_events(events_a, events_b), len(events_a)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare les journaux d'événements de deux configurations d'ENV")
+    parser.add_argument('--config', help="Fichier JSON de paramètres Config ({\"NOM\": valeur})")
+    parser.add_argument('--predators', type=int, default=10, help="Nombre initial de prédateurs")
+    parser.add_argument('--preys', type=int, default=40, help="Nombre initial de proies")
+    parser.add_argument('--grass', type=int, default=400, help="Quantité initiale d'herbe")
+    parser.add_argument('--ticks', type=int, default=200, help="Dernier tick comparé")
+    parser.add_argument('--seed', type=int, help="Graine commune (tirée au hasard par défaut)")
+    parser.add_argument('--set', action='append', default=[], metavar='NOM=VALEUR',
+                        help="Surcharge d'un paramètre Config pour les deux runs (valeur JSON), répétable")
+    parser.add_argument('--a', action='append', default=[], metavar='NOM=VALEUR', help="Surcharge du run a seul")
+    parser.add_argument('--b', action='append', default=[], metavar='NOM=VALEUR', help="Surcharge du run b seul")
+    parser.add_argument('--keep', help="Dossier où garder les deux journaux (temporaire par défaut)")
+    args = parser.parse_args(argv)
+
+    common = {**DEFAULTS, **parse_overrides(args.set)}
+    common['SEED'] = run_seed(args.seed if args.seed is not None else common.get('SEED'))
+    config_a = Config(args.config, **{**common, **parse_overrides(args.a)})
+    config_b = Config(args.config, **{**common, **parse_overrides(args.b)})
+    print(f"Graine {common['SEED']}, {args.ticks} ticks")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        difference, events = verify(config_a, config_b, args.predators, args.preys, args.grass, args.ticks,
+                                    args.keep or tmp)
+    print(f"{events} événements")
+    print_difference(difference)
+    return 0 if difference is None else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,248 @@
+"""
+Pool de WORKERS - Processus hôtes faisant vivre de nombreux animaux chacun
+"""
+
+import os
+import queue
+import socket
+import threading
+import time
+import multiprocessing as mp
+import protocol
+import transport
+from predator_process import Predator
+from prey_process import Prey
+
+ANIMAL_CLASSES = {'predator': Predator, 'prey': Prey}
+
+# 'free' : chaque worker suit sa propre horloge (sleep SIMULATION_TICK)
+# 'lockstep' : un step par tick d'ENV, départ et fin de tick donnés par une barrière
+SCHEDULERS = ('free', 'lockstep')
+
+
+class AnimalWorker:
+    """Processus hôte : exécute à tour de rôle les step() de ses animaux"""
+
+    def __init__(self, index, inbox, loads, sent, received, shared_memory, config, barrier=None):
+        self.index = index
+        self.inbox = inbox          # ordres SPAWN envoyés par ENV
+        self.loads = loads          # population de chaque worker (une case par worker)
+        self.sent = sent            # nombre d'ordres SPAWN envoyés à chaque worker (écrit par ENV)
+        self.received = received    # nombre d'ordres SPAWN traités par chaque worker
+        self.barrier = barrier      # Config.SCHEDULER == 'lockstep' : barrière partagée avec ENV
+        self.shared_mem = shared_memory
+        self.config = config
+        self.animals = []
+        self.by_id = {}             # animaux vivants par id (réponses FED)
+        self.socket = None
+        self.outbox = []            # partagé par tous les animaux du worker
+        self.replies = bytearray()  # réponses d'ENV pas encore décodées
+
+    def connect_to_env(self):
+        """Une seule connexion au processus environnement pour tout le worker"""
+        max_retries = 8
+        for attempt in range(max_retries):
+            try:
+                self.socket = transport.connect(self.config, self.shared_mem, self.index)
+                return True
+            except Exception:
+                if attempt < max_retries - 1:
+                    time.sleep(0.01 * 2 ** attempt)
+                else:
+                    print(f" Worker {self.index}: Impossible de se connecter")
+                    return False
+        return False
+
+    def spawn(self, entity, animal_id, state=None):
+        """Naissance : simple insertion d'un objet dans la liste du worker"""
+        animal = ANIMAL_CLASSES[entity](animal_id, self.shared_mem, self.config)
+        if state: # reprise d'un checkpoint : (énergie, âge, actif)
+            animal.restore(*state)
+        animal.socket = self.socket
+        animal.outbox = self.outbox
+        animal.shard = self.shared_mem['counters'].shard_for(self.index) # une ligne par worker
+        animal.send_message({
+            'type': 'JOIN',
+            'entity': entity,
+            'id': animal_id
+        })
+        self.animals.append(animal)
+        self.by_id[animal_id] = animal
+
+    def flush_messages(self):
+        """Une seule écriture par tick pour les messages de tous les animaux"""
+        if self.outbox:
+            try:
+                self.socket.sendall(protocol.encode(self.outbox, self.config.PROTOCOL))
+            except Exception as e:
+                print(f" Worker {self.index}: Erreur envoi message: {e}")
+            self.outbox.clear()
+
+    def receive_messages(self):
+        """Lit sans bloquer les réponses groupées d'ENV et nourrit les animaux concernés"""
+        while True:
+            try:
+                data = self.socket.recv(65536, socket.MSG_DONTWAIT)
+            except (BlockingIOError, InterruptedError, OSError):
+                break
+            if not data:
+                break
+            self.replies += data
+        for msg in protocol.decode(self.replies, self.config.PROTOCOL):
+            animal = self.by_id.get(msg.get('id'))
+            if msg.get('type') == 'FED' and animal is not None:
+                animal.eat()
+
+    def handle_inbox(self, wait=False):
+        """Traite les ordres en attente (sans bloquer, ou jusqu'au dernier ordre envoyé si wait)"""
+        while True:
+            try:
+                if wait and self.received[self.index] < self.sent[self.index]:
+                    order = self.inbox.get(timeout=self.config.LOCKSTEP_TIMEOUT)
+                else:
+                    order = self.inbox.get_nowait()
+            except queue.Empty:
+                return
+            self.handle_order(order)
+
+    def handle_order(self, order):
+        """Exécute un ordre d'ENV (SPAWN : naissance)"""
+        cmd, entity, animal_id, state = order
+        if cmd == 'SPAWN':
+            self.spawn(entity, animal_id, state)
+        self.received[self.index] += 1
+
+    def wait_next_tick(self, deadline):
+        """Attente du prochain tick, en traitant chaque ordre SPAWN dès son arrivée (JOIN envoyé aussitôt)"""
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            try:
+                order = self.inbox.get(timeout=remaining)
+            except queue.Empty:
+                return
+            self.handle_order(order)
+            self.flush_messages()
+
+    def wait_barrier(self):
+        """Attente à la barrière du tick ; False si ENV l'a rompue (arrêt) ou ne répond plus"""
+        try:
+            self.barrier.wait()
+            return True
+        except threading.BrokenBarrierError:
+            return False
+
+    def run(self):
+        """Boucle du worker : un step() par animal et par tick"""
+        if not self.connect_to_env():
+            return
+        overruns = self.shared_mem.get('overruns') # instrumentation : None si désactivée
+        checkpoint = self.shared_mem['checkpoint']
+        checkpoint_seen = checkpoint.value
+        lockstep = self.barrier is not None
+        while not self.shared_mem['shutdown'].value:
+            if lockstep and not self.wait_barrier(): # départ du tick, donné par ENV
+                break
+            start = time.monotonic()
+            self.handle_inbox(wait=lockstep) # en lockstep, toutes les naissances du tick précédent
+            if self.config.FEEDING == 'batched':
+                self.receive_messages()
+            if checkpoint.value != checkpoint_seen: # checkpoint demandé par ENV : état de tous nos animaux
+                checkpoint_seen = checkpoint.value
+                for animal in self.animals:
+                    animal.send_state()
+
+            survivors = []
+            for animal in self.animals:
+                animal.step()
+                if animal.is_alive():
+                    survivors.append(animal)
+                else:
+                    animal.die()
+                    self.by_id.pop(animal.id, None)
+            self.animals = survivors
+            self.loads[self.index] = len(self.animals)
+            self.flush_messages()
+
+            # Lockstep : fin de tick signalée à ENV, qui enchaîne dès que tous les workers ont fini
+            if lockstep:
+                if not self.wait_barrier():
+                    break
+                continue
+
+            # Attendre le prochain tick (moins le temps de calcul), naissances traitées dès leur arrivée
+            elapsed = time.monotonic() - start
+            if overruns is not None:
+                overruns.record(2, max(0.0, elapsed - self.config.SIMULATION_TICK))
+            self.wait_next_tick(start + self.config.SIMULATION_TICK)
+
+        # Arrêt : ENV ne compte plus les morts, on ferme simplement la connexion
+        self.socket.close()
+        counters = self.shared_mem['counters']
+        if not counters.owner: # copie reçue en 'spawn' / 'forkserver' : libérée avant la fin de l'interpréteur
+            counters.close()
+
+
+def worker_process(index, inbox, loads, sent, received, shared_memory, config, barrier=None):
+    """Point d'entrée d'un processus worker"""
+    worker = AnimalWorker(index, inbox, loads, sent, received, shared_memory, config, barrier)
+    worker.run()
+
+
+class WorkerPool:
+    """Pool de taille fixe (un worker par cœur par défaut) utilisé par ENV pour les naissances"""
+
+    def __init__(self, shared_memory, config, size=None, ctx=None):
+        self.shared_mem = shared_memory
+        self.config = config
+        self.ctx = ctx or mp # même contexte que les verrous de shared_memory
+        self.size = size or config.WORKER_POOL_SIZE or os.cpu_count() or 1
+        self.loads = self.ctx.Array('i', self.size, lock=False)     # écrit par chaque worker dans sa case
+        self.received = self.ctx.Array('i', self.size, lock=False)  # idem
+        self.sent = self.ctx.Array('i', self.size, lock=False)      # ordres envoyés, écrit par ENV seul
+        self.inboxes = [self.ctx.Queue() for _ in range(self.size)]
+        self.processes = []
+
+        # Lockstep : les workers et ENV se retrouvent à la barrière au départ et à la fin de chaque tick
+        self.barrier = None
+        if config.SCHEDULER == 'lockstep':
+            self.barrier = self.ctx.Barrier(self.size + 1, timeout=config.LOCKSTEP_TIMEOUT)
+
+    def start(self):
+        """Lance les workers (une seule fois, au démarrage)"""
+        for i in range(self.size):
+            p = self.ctx.Process(
+                target=worker_process,
+                args=(i, self.inboxes[i], self.loads, self.sent, self.received, self.shared_mem, self.config,
+                      self.barrier),
+                name=f"worker_{i}"
+            )
+            p.start()
+            self.processes.append(p)
+        return self.processes
+
+    def load(self, index):
+        """Charge estimée : population publiée + ordres pas encore traités"""
+        return self.loads[index] + self.sent[index] - self.received[index]
+
+    def spawn(self, entity, animal_id, state=None):
+        """Confie un nouvel animal au worker le moins chargé"""
+        index = min(range(self.size), key=self.load)
+        self.sent[index] += 1
+        self.inboxes[index].put(('SPAWN', entity, animal_id, state))
+        return index
+
+    def population(self):
+        """Nombre total d'animaux hébergés"""
+        return sum(self.loads)
+
+    def advance(self):
+        """Lockstep : un step de tous les workers (départ, puis attente de la fin du tick)"""
+        self.barrier.wait()
+        self.barrier.wait()
+
+    def stop(self):
+        """Libère les workers qui attendent à la barrière (arrêt)"""
+        if self.barrier is not None:
+            self.barrier.abort()